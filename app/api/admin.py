@@ -1,8 +1,17 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 
+from ..services.dedup import DedupService
+from ..services.impact import ImpactService
+from ..services.index_advisor import IndexAdvisorService
+from ..services.related import RelatedService
+from ..services.search_warm import SearchWarmService
+from ..services.similarity import SimilarityService
+from ..services.slow_queries import SlowQueryService
+from ..services.suggest import SuggestService
 from ..services.view_sync import ViewSyncService
+from ..utils.paper_validation import is_integer, validate_limit_param
 
 bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -46,3 +55,215 @@ def manual_sync():
         return jsonify(result), 200
     except Exception as e:
         return jsonify({"status": "error", "error": str(e), "message": "Manual sync failed"}), 500
+
+
+@bp.post("/suggest/rebuild")
+def rebuild_suggest_index():
+    """
+    POST /admin/suggest/rebuild
+    Rebuild the autocomplete index from the MongoDB papers collection.
+
+    Returns:
+        200: {
+            "status": string,
+            "indexed_papers": int,
+            "indexed_terms": int,
+            "message": string
+        }
+    """
+    result = SuggestService.rebuild_index()
+    status_code = 200 if result["status"] == "success" else 500
+    return jsonify(result), status_code
+
+
+@bp.post("/impact-now")
+def compute_impact_now():
+    """
+    POST /admin/impact-now
+    Recompute PageRank impact scores immediately instead of waiting for the scheduler.
+
+    Returns:
+        200: {
+            "status": string,
+            "scored_papers": int,
+            "citations": int,
+            "message": string
+        }
+    """
+    result = ImpactService.compute_impact_scores()
+    status_code = 500 if result["status"] == "error" else 200
+    return jsonify(result), status_code
+
+
+@bp.post("/related-now")
+def compute_related_now():
+    """
+    POST /admin/related-now
+    Recompute citation-based related papers immediately.
+
+    Returns:
+        200: {
+            "status": string,
+            "papers_with_related": int,
+            "message": string
+        }
+    """
+    result = RelatedService.compute_related_papers()
+    status_code = 500 if result["status"] == "error" else 200
+    return jsonify(result), status_code
+
+
+@bp.post("/similar-now")
+def compute_similar_now():
+    """
+    POST /admin/similar-now
+    Refit the TF-IDF model and recompute content-similar papers immediately.
+
+    Returns:
+        200: {
+            "status": string,
+            "papers": int,
+            "terms": int,
+            "message": string
+        }
+    """
+    result = SimilarityService.compute_similar_papers()
+    status_code = 500 if result["status"] == "error" else 200
+    return jsonify(result), status_code
+
+
+@bp.post("/duplicates/scan")
+def scan_duplicates():
+    """
+    POST /admin/duplicates/scan
+    Request a rescan of all papers for near-duplicates. The dedup_scan job recomputes
+    the MinHash signatures on its next run; the result is read from GET /admin/duplicates.
+
+    Returns:
+        202: {
+            "status": "queued",
+            "message": string
+        }
+    """
+    result = DedupService.request_scan()
+    status_code = 500 if result["status"] == "error" else 202
+    return jsonify(result), status_code
+
+
+@bp.get("/duplicates")
+def last_duplicate_scan():
+    """
+    GET /admin/duplicates
+    Near-duplicate clusters found by the last finished scan.
+
+    Returns:
+        200: {
+            "status": string,
+            "papers_scanned": int,
+            "clusters_found": int,
+            "clusters": [{"papers": [{"paper_id": string, "title": string}], "size": int}],
+            "message": string,
+            "finished_at": string (ISO datetime)
+        }
+        404: {"error": string} (no scan finished yet)
+    """
+    try:
+        scan = DedupService.get_last_scan()
+    except Exception:
+        return jsonify({"error": "Failed to get duplicate scan"}), 500
+    if scan is None:
+        return jsonify({"error": "No duplicate scan has finished yet"}), 404
+    return jsonify(scan), 200
+
+
+@bp.post("/search-warm-now")
+def warm_search_now():
+    """
+    POST /admin/search-warm-now
+    Warm the search cache for the most popular queries immediately, even if the
+    current search generation was already warmed.
+
+    Returns:
+        200: {
+            "status": string,
+            "warmed": int,
+            "message": string
+        }
+    """
+    result = SearchWarmService.warm_search_cache(force=True)
+    status_code = 500 if result["status"] == "error" else 200
+    return jsonify(result), status_code
+
+
+@bp.get("/slow-queries")
+def slow_queries():
+    """
+    GET /admin/slow-queries
+    Search and detail query shapes slower than SLOW_QUERY_MS, worst total time first.
+
+    Query params:
+        ?limit=int (optional, 1-100, default: 20)
+        ?hours=int (optional, only entries of the last N hours)
+
+    Returns:
+        200: {
+            "status": string,
+            "shapes": [{
+                "shape_hash": string, "kind": "search" | "detail", "collection": string,
+                "shape": object, "count": int, "total_ms": float, "avg_ms": float,
+                "max_ms": float, "max_docs_examined": int | null, "last_seen": string,
+                "plan": {"winning_plan": [string], "docs_examined": int,
+                         "keys_examined": int, "n_returned": int,
+                         "execution_ms": int, "explained_at": string} | null
+            }]
+        }
+        400: {"error": "Invalid query parameters", "details": [errors]}
+    """
+    limit = request.args.get("limit", "20")
+    hours = request.args.get("hours", "")
+
+    errors = validate_limit_param(limit, maximum=100)
+    if hours and not is_integer(hours):
+        errors.append("hours must be a positive integer")
+    if errors:
+        return jsonify({"error": "Invalid query parameters", "details": errors}), 400
+
+    result = SlowQueryService.get_worst_shapes(int(limit), int(hours) if hours else None)
+    status_code = 500 if result["status"] == "error" else 200
+    return jsonify(result), status_code
+
+
+@bp.get("/index-advice")
+def index_advice():
+    """
+    GET /admin/index-advice
+    Indexes missing for recorded papers/users/citations query shapes, ranked by the
+    time spent in those shapes, and indexes $indexStats reports as unused.
+
+    Query params:
+        ?limit=int (optional, 1-100, default: 20)
+
+    Returns:
+        200: {
+            "status": string,
+            "shapes_recorded": int,
+            "missing_indexes": [{
+                "collection": string, "keys": [[field, 1 | -1]],
+                "current_support": "none" | "partial",
+                "shapes": [{"eq": [string], "range": [string], "sort": [[field, 1 | -1]]}],
+                "executions": int, "estimated_benefit_ms": float
+            }],
+            "unused_indexes": [{"collection": string, "name": string, "keys": [[field, any]]}],
+            "message": string
+        }
+        400: {"error": "Invalid query parameters", "details": [errors]}
+    """
+    limit = request.args.get("limit", "20")
+
+    errors = validate_limit_param(limit, maximum=100)
+    if errors:
+        return jsonify({"error": "Invalid query parameters", "details": errors}), 400
+
+    result = IndexAdvisorService.get_index_advice(int(limit))
+    status_code = 500 if result["status"] == "error" else 200
+    return jsonify(result), status_code
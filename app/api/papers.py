@@ -1,15 +1,54 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from bson import ObjectId
+from flask import Blueprint, current_app, jsonify, request, url_for
 
 from ..models.paper import Paper
-from ..utils.auth import require_auth
+from ..services.citation_graph import citation_graph
+from ..services.dedup import DedupService
+from ..services.suggest import SuggestService
+from ..services.upload_queue import UploadQueueService
+from ..utils.auth import get_viewer_hash, require_auth
 from ..utils.cache import CacheService
-from ..utils.paper_validation import validate_paper_data, validate_search_params
+from ..utils.paper_validation import (
+    TRENDING_WINDOWS,
+    validate_batch_ids,
+    validate_graph_direction,
+    validate_graph_params,
+    validate_limit_param,
+    validate_page_params,
+    validate_paper_data,
+    validate_search_params,
+    validate_suggest_params,
+    validate_trending_params,
+    validate_view_series_params,
+)
 
 bp = Blueprint("papers", __name__, url_prefix="/papers")
 
 
+def _etag(*parts) -> str:
+    """Strong ETag value from a hash of JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _tagged(response, etag: str):
+    """Attach an ETag and ask clients and proxies to revalidate before reuse."""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _not_modified(etag: str, headers=None):
+    return _tagged(current_app.response_class(status=304, headers=headers), etag)
+
+
 @bp.post("/")
 @require_auth
 def upload_paper(current_user_id: str, current_user: dict):
@@ -28,11 +67,23 @@ def upload_paper(current_user_id: str, current_user: dict):
         "citations": [string] (0-5 valid paper IDs)
     }
 
+    Near-duplicates of existing papers (DEDUP_MODE) are listed in
+    "possible_duplicates" when flagging, or rejected with 409.
+
+    With UPLOAD_MODE=async the validated paper is queued instead and answered with
+    202; citation and duplicate checks then happen in the queue consumer and their
+    outcome is reported by GET /papers/uploads/<ticket_id>.
+
     Returns:
-        201: {"message": "Paper uploaded", "paper_id": string}
+        201: {"message": "Paper uploaded", "paper_id": string,
+              "possible_duplicates": [{"paper_id": string, "title": string,
+                                       "similarity": float}] (only if any)}
+        202: {"message": "Paper queued", "ticket_id": string, "paper_id": string,
+              "status_url": string} (async mode, also in the Location header)
         400: {"error": "Validation failed", "details": [errors]}
         401: {"error": "X-User-ID header is required"}
         404: {"error": "Invalid citation IDs", "details": [invalid_ids]}
+        409: {"error": "Possible duplicate paper", "duplicates": [...]}
         500: {"error": "Failed to create paper"}
     """
     try:
@@ -47,6 +98,27 @@ def upload_paper(current_user_id: str, current_user: dict):
         if errors:
             return jsonify({"error": "Validation failed", "details": errors}), 400
 
+        # Write-behind: queue the paper and let the upload consumers insert it in batches
+        if current_app.config.get("UPLOAD_MODE", "sync") == "async":
+            ticket = UploadQueueService.enqueue(data, current_user_id)
+            if ticket is None:
+                response = jsonify({"error": "Upload queue full, try again later"})
+                response.headers["Retry-After"] = str(
+                    current_app.config.get("UPLOAD_QUEUE_INTERVAL_SEC", 2)
+                )
+                return response, 503
+            status_url = url_for("papers.upload_status", ticket_id=ticket["ticket_id"])
+            response = jsonify(
+                {
+                    "message": "Paper queued",
+                    "ticket_id": ticket["ticket_id"],
+                    "paper_id": ticket["paper_id"],
+                    "status_url": status_url,
+                }
+            )
+            response.headers["Location"] = status_url
+            return response, 202
+
         # Validate citations exist in Papers collection
         citations = data.get("citations", [])
         if citations:
@@ -54,10 +126,21 @@ def upload_paper(current_user_id: str, current_user: dict):
             if invalid_citations:
                 return jsonify({"error": "Invalid citation IDs", "details": invalid_citations}), 404
 
+        # Look up near-duplicates through the LSH band index
+        duplicates = []
+        dedup_mode = current_app.config.get("DEDUP_MODE", "flag")
+        if dedup_mode != "off":
+            duplicates = DedupService.find_duplicates(data)
+            if duplicates and dedup_mode == "reject":
+                return jsonify({"error": "Possible duplicate paper", "duplicates": duplicates}), 409
+
         try:
             paper_id = Paper.create(data, current_user_id)  # Create paper in MongoDB and citations
             CacheService.invalidate_search_cache()  # Invalidate search cache since we added a new paper
-            return jsonify({"message": "Paper uploaded", "paper_id": paper_id}), 201
+            body: Dict[str, Any] = {"message": "Paper uploaded", "paper_id": paper_id}
+            if duplicates:
+                body["possible_duplicates"] = duplicates
+            return jsonify(body), 201
 
         except Exception as e:
             return jsonify({"error": "Failed to create paper"}), 500
@@ -66,6 +149,37 @@ def upload_paper(current_user_id: str, current_user: dict):
         return jsonify({"error": "Internal server error"}), 500
 
 
+@bp.get("/uploads/<ticket_id>")
+@require_auth
+def upload_status(ticket_id: str, current_user_id: str, current_user: dict):
+    """
+    GET /papers/uploads/<ticket_id>
+    Outcome of a queued (UPLOAD_MODE=async) upload of the authenticated user.
+
+    Headers: X-User-ID: <user_id>
+
+    Returns:
+        200: {"ticket_id": string, "paper_id": string,
+              "status": "queued" | "created" | "failed" | "rejected",
+              "queued_at": string, "finished_at": string (once processed),
+              "error": string, "details": [invalid citation IDs] (failed only),
+              "possible_duplicates": [{"paper_id": string, "title": string,
+                                       "similarity": float}] (if any)}
+        401: {"error": "X-User-ID header is required"}
+        404: {"error": "Upload ticket not found"}
+    """
+    try:
+        ticket = UploadQueueService.get_ticket(ticket_id)
+        if not ticket or ticket.pop("user_id") != current_user_id:
+            return jsonify({"error": "Upload ticket not found"}), 404
+        if ticket["status"] != "created":
+            ticket.pop("paper_id")
+        return jsonify(ticket), 200
+
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @bp.get("/")
 def search_papers():
     """
@@ -74,13 +188,25 @@ def search_papers():
 
     Query params:
         ?search=string (optional, default: "")
-        ?sort_by=string (optional, "publication_date" or "relevance", default: "relevance")
+        ?sort_by=string (optional, "publication_date", "relevance" or "impact",
+                         default: "relevance")
         ?order=string (optional, "asc" or "desc", default: "desc")
+        ?facets=string (optional, comma-separated subset of
+                        "keywords,journal_conference,year")
+        ?author=string (optional, exact author name)
+        ?keyword=string (optional, exact keyword)
+        ?venue=string (optional, exact journal/conference)
+        ?from=string, ?to=string (optional, ISO dates bounding publication_date)
+
+    Responses carry an ETag derived from the search cache generation and the
+    query; a matching If-None-Match is answered with 304 before any MongoDB work.
 
     Returns:
         200: {"papers": [{"id": string, "title": string, "authors": [string],
                          "publication_date": string, "journal_conference": string,
-                         "keywords": [string]}]}
+                         "keywords": [string]}],
+              "facets": {facet: [{"value": any, "count": int}]} (only if requested)}
+        304: (empty, If-None-Match matched)
         400: {"error": "Invalid query parameters", "details": [errors]}
         500: {"error": "Internal server error"}
     """
@@ -89,68 +215,620 @@ def search_papers():
         search_term = request.args.get("search", "").strip()
         sort_by = request.args.get("sort_by", "relevance")
         order = request.args.get("order", "desc")
+        facets = [f.strip() for f in request.args.get("facets", "").split(",") if f.strip()]
+        facets = list(dict.fromkeys(facets))
+        filters = {
+            name: request.args.get(name, "").strip()
+            for name in ("author", "keyword", "venue", "from", "to")
+            if request.args.get(name, "").strip()
+        }
 
         # Validate query parameters
-        errors = validate_search_params(search_term, sort_by, order)
+        errors = validate_search_params(search_term, sort_by, order, facets, filters)
         if errors:
             return jsonify({"error": "Invalid query parameters", "details": errors}), 400
 
+        # Equivalent terms ("Deep  Learning", "learning deep") share cache entries
+        stopwords_only = False
+        if search_term:
+            search_term = CacheService.canonicalize_search_term(search_term)
+            stopwords_only = not search_term
+        if not stopwords_only:
+            CacheService.record_search(search_term, filters)
+
+        # Results only change when the search cache is invalidated (new generation)
+        generation = CacheService.get_search_generation()
+        etag = _etag("search", generation, search_term, sort_by, order, facets, filters)
+        if generation and request.if_none_match.contains(etag):
+            return _not_modified(etag)
+
+        # Stop-word-only terms and searches known to match nothing skip MongoDB
+        if stopwords_only or CacheService.is_known_empty_search(search_term, filters):
+            result: Dict[str, Any] = {"papers": []}
+            if facets:
+                result["facets"] = {facet: [] for facet in facets}
+            return _tagged(jsonify(result), etag), 200
+
         # Check Redis cache first
-        cached_result = CacheService.get_cached_search(search_term, sort_by, order)
+        cached_result = CacheService.get_cached_search(search_term, sort_by, order, filters)
+        if not facets:
+            if cached_result:
+                return _tagged(jsonify(cached_result), etag), 200
+
+            # Query MongoDB
+            result = {"papers": Paper.search(search_term, sort_by, order, filters)}
+
+            # Cache the results in Redis
+            CacheService.cache_search_results(search_term, sort_by, order, result, filters)
+            if not result["papers"]:
+                CacheService.cache_empty_search(search_term, filters)
+            return _tagged(jsonify(result), etag), 200
+
+        # Facet blocks are cached per search term, independent of sort/order
+        facet_counts = CacheService.get_cached_facets(search_term, facets, filters)
+        missing_facets = [facet for facet in facets if facet not in facet_counts]
+
+        if cached_result and not missing_facets:
+            result = cached_result
+        elif missing_facets:
+            # Missing facets in one $facet aggregation, plus the listing when not cached
+            papers, computed = Paper.search_with_facets(
+                search_term,
+                sort_by,
+                order,
+                missing_facets,
+                include_papers=not cached_result,
+                filters=filters,
+            )
+            CacheService.cache_facets(search_term, computed, filters)
+            facet_counts.update(computed)
+            if cached_result:
+                result = cached_result
+            else:
+                result = {"papers": papers}
+                CacheService.cache_search_results(search_term, sort_by, order, result, filters)
+        else:
+            result = {"papers": Paper.search(search_term, sort_by, order, filters)}
+            CacheService.cache_search_results(search_term, sort_by, order, result, filters)
+
+        if not result["papers"]:
+            CacheService.cache_empty_search(search_term, filters)
+        result = {**result, "facets": {facet: facet_counts[facet] for facet in facets}}
+        return _tagged(jsonify(result), etag), 200
+
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@bp.get("/suggest")
+def suggest_papers():
+    """
+    GET /papers/suggest
+    Prefix autocomplete over paper titles and keywords, served from Redis only.
+
+    Query params:
+        ?q=string (required, prefix typed so far)
+        ?limit=int (optional, 1-20, default: 10)
+
+    Returns:
+        200: {"suggestions": [{"text": string, "type": "title" | "keyword", "score": int}]}
+        400: {"error": "Invalid query parameters", "details": [errors]}
+        500: {"error": "Internal server error"}
+    """
+    try:
+        query = request.args.get("q", "")
+        limit = request.args.get("limit", "10")
+
+        errors = validate_suggest_params(query, limit)
+        if errors:
+            return jsonify({"error": "Invalid query parameters", "details": errors}), 400
+
+        suggestions = SuggestService.suggest(query, int(limit))
+        return jsonify({"suggestions": suggestions}), 200
+
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@bp.get("/trending")
+def trending_papers():
+    """
+    GET /papers/trending
+    Most viewed papers over a recent window, from time-decayed hourly Redis buckets.
+
+    Query params:
+        ?window=string (optional, "1h", "24h" or "7d", default: "24h")
+        ?limit=int (optional, 1-50, default: 10)
+
+    Returns:
+        200: {"window": string, "papers": [{"id": string, "title": string,
+              "authors": [string], "publication_date": string,
+              "journal_conference": string, "keywords": [string], "score": float}]}
+        400: {"error": "Invalid query parameters", "details": [errors]}
+        500: {"error": "Internal server error"}
+    """
+    try:
+        window = request.args.get("window", "24h")
+        limit = request.args.get("limit", "10")
+
+        errors = validate_trending_params(window, limit)
+        if errors:
+            return jsonify({"error": "Invalid query parameters", "details": errors}), 400
+
+        cached_result = CacheService.get_cached_trending(window, int(limit))
         if cached_result:
             return jsonify(cached_result), 200
 
-        # Query MongoDB
-        papers = Paper.search(search_term, sort_by, order)
-        result = {"papers": papers}
+        ranked = CacheService.get_trending_paper_ids(TRENDING_WINDOWS[window], int(limit))
+        summaries = Paper.find_summaries_by_ids([paper_id for paper_id, _ in ranked])
 
-        # Cache the results in Redis
-        CacheService.cache_search_results(search_term, sort_by, order, result)
+        papers = [
+            {**summaries[paper_id], "score": round(score, 2)}
+            for paper_id, score in ranked
+            if paper_id in summaries
+        ]
+        result = {"window": window, "papers": papers}
 
+        CacheService.cache_trending(window, int(limit), result)
         return jsonify(result), 200
 
     except Exception as e:
         return jsonify({"error": "Internal server error"}), 500
 
 
+@bp.get("/batch")
+def paper_batch_get():
+    """
+    GET /papers/batch
+    Get the details of several papers at once (e.g. a reading list).
+
+    Query params:
+        ?ids=string (required, comma-separated paper IDs, at most 100)
+        ?prefetch=bool (optional, "true" skips view counting, default: false)
+
+    Returns:
+        200: {"papers": [paper detail, in request order], "not_found": [string]}
+        400: {"error": "Invalid query parameters", "details": [errors]}
+        500: {"error": "Internal server error"}
+    """
+    ids = [pid.strip() for pid in request.args.get("ids", "").split(",") if pid.strip()]
+    prefetch = request.args.get("prefetch", "false").lower() in ("true", "1")
+    return _paper_batch(ids, prefetch)
+
+
+@bp.post("/batch")
+def paper_batch_post():
+    """
+    POST /papers/batch
+    Same as GET /papers/batch for ID lists too long for a query string.
+
+    Body: {"ids": [string] (required, at most 100), "prefetch": bool (optional)}
+
+    Returns:
+        200: {"papers": [paper detail, in request order], "not_found": [string]}
+        400: {"error": "Invalid request body", "details": [errors]}
+        500: {"error": "Internal server error"}
+    """
+    data = request.get_json(silent=True) or {}
+    return _paper_batch(data.get("ids"), bool(data.get("prefetch", False)))
+
+
+def _paper_batch(ids, prefetch: bool):
+    """
+    Multi-get shared by GET and POST /papers/batch: one $in query for the papers,
+    one pipeline for view counts (and increments unless prefetching), one pipeline
+    for unique viewers and one aggregation for citation counts.
+    """
+    try:
+        errors = validate_batch_ids(ids)
+        if errors:
+            message = (
+                "Invalid query parameters" if request.method == "GET" else "Invalid request body"
+            )
+            return jsonify({"error": message, "details": errors}), 400
+
+        ids = list(dict.fromkeys(ids))  # drop repeated IDs, keep request order
+        papers = Paper.find_by_ids(ids)
+        found = [pid for pid in ids if pid in papers]
+
+        if found and not prefetch:
+            redis_views = CacheService.increment_paper_views_many(found)
+            CacheService.add_unique_viewer_many(found, get_viewer_hash())
+        else:
+            redis_views = CacheService.get_paper_views_many(found) if found else {}
+        unique_viewers = CacheService.get_unique_viewers_many(found) if found else {}
+        citation_counts = Paper.get_citation_counts(found)
+
+        results = [
+            _format_paper_detail(
+                papers[pid],
+                citation_counts.get(pid, 0),
+                redis_views.get(pid, 0),
+                max(papers[pid].get("unique_views", 0), unique_viewers.get(pid, 0)),
+            )
+            for pid in found
+        ]
+        not_found = [pid for pid in ids if pid not in papers]
+        return jsonify({"papers": results, "not_found": not_found}), 200
+
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @bp.get("/<paper_id>")
 def paper_detail(paper_id: str):
     """
     GET /papers/<paper_id>
     Get paper details with citation count and view tracking.
 
+    The ETag covers the paper metadata only. The volatile counters are also sent as
+    X-Views, X-Unique-Views and X-Citation-Count headers, so a client revalidating
+    with If-None-Match gets a 304 with fresh counters (the view is still counted).
+
     Returns:
         200: {"id": string, "title": string, "authors": [string], "abstract": string,
               "publication_date": string, "journal_conference": string,
-              "keywords": [string], "citation_count": int, "views": int}
+              "keywords": [string], "citation_count": int, "views": int,
+              "unique_views": int}
+        304: (empty, If-None-Match matched; counters in headers)
         404: {"error": "Paper not found"}
         500: {"error": "Internal server error"}
     """
     try:
-        paper = Paper.find_by_id(paper_id)
-        if not paper:
-            return jsonify({"error": "Paper not found"}), 404
+        # Rendered paper from the local LRU or Redis; MongoDB only on a miss
+        detail = CacheService.get_cached_paper_detail(paper_id)
+        paper = None
+        if detail is None:
+            paper = Paper.find_by_id(paper_id)
+            if not paper:
+                return jsonify({"error": "Paper not found"}), 404
+            detail = {"paper": _render_paper(paper)}
+            CacheService.cache_paper_detail(paper_id, detail)
+
+        # Count the view (and unique reader) and read live counters in one pipeline
+        live = CacheService.record_paper_detail_view(paper_id, get_viewer_hash())
+        citation_count = live["citation_count"]
+        if citation_count is None:
+            citation_count = Paper.get_citation_count(paper_id)  # Get citation count from MongoDB
+            CacheService.cache_citation_count(paper_id, citation_count)
 
-        CacheService.increment_paper_views(paper_id)  # Increment view count in Redis
-        redis_views = CacheService.get_paper_views(paper_id)  # Get current view count from Redis
-        citation_count = Paper.get_citation_count(paper_id)  # Get citation count from MongoDB
-        total_views = (
-            paper.get("views", 0) + redis_views
-        )  # Total views = MongoDB views + Redis views
-
-        result = {
-            "id": str(paper["_id"]),
-            "title": paper["title"],
-            "authors": paper["authors"],
-            "abstract": paper["abstract"],
-            "publication_date": paper["publication_date"].isoformat(),
-            "journal_conference": paper.get("journal_conference", ""),
-            "keywords": paper["keywords"],
+        # Persisted counters are cached in Redis only (never in the per-process LRU),
+        # so a sync that writes them is seen by every worker at once
+        stored = live["stored"]
+        if stored is None:
+            if paper is not None:
+                stored = {
+                    "views": paper.get("views", 0),
+                    "unique_views": paper.get("unique_views", 0),
+                }
+            else:
+                stored = Paper.get_view_counters(paper_id)
+            CacheService.cache_paper_counters(paper_id, stored)
+
+        counters = {
             "citation_count": citation_count,
-            "views": total_views,
+            "views": stored["views"] + live["views"],  # MongoDB views + pending Redis views
+            # Redis estimate, or the persisted one if the HyperLogLog was lost
+            "unique_views": max(stored["unique_views"], live["unique_views"]),
+        }
+        headers = {
+            "X-Views": str(counters["views"]),
+            "X-Unique-Views": str(counters["unique_views"]),
+            "X-Citation-Count": str(counters["citation_count"]),
         }
 
-        return jsonify(result), 200
+        etag = _etag("paper", detail["paper"])
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag, headers)
+
+        response = jsonify({**detail["paper"], **counters})
+        response.headers.update(headers)
+        return _tagged(response, etag), 200
+
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+
+def _render_paper(paper: dict) -> dict:
+    """Fields of a paper detail that never change after upload."""
+    return {
+        "id": str(paper["_id"]),
+        "title": paper["title"],
+        "authors": paper["authors"],
+        "abstract": paper["abstract"],
+        "publication_date": paper["publication_date"].isoformat(),
+        "journal_conference": paper.get("journal_conference", ""),
+        "keywords": paper["keywords"],
+    }
+
+
+def _format_paper_detail(
+    paper: dict, citation_count: int, redis_views: int, unique_views: int
+) -> dict:
+    """Paper detail response; total views = MongoDB views + pending Redis views."""
+    return {
+        **_render_paper(paper),
+        "citation_count": citation_count,
+        "views": paper.get("views", 0) + redis_views,
+        "unique_views": unique_views,
+    }
+
+
+@bp.get("/<paper_id>/views")
+def paper_view_series(paper_id: str):
+    """
+    GET /papers/<paper_id>/views
+    View counts over time, read from pre-aggregated hourly buckets in MongoDB.
+    Buckets are flushed from Redis by the view sync job, so the latest
+    VIEWS_SYNC_INTERVAL_MIN minutes may not be included yet.
+
+    Query params:
+        ?granularity=string (optional, "hour", "day", "week" or "month", default: "day")
+        ?from=string (optional, ISO date/datetime, default: 30 days before "to")
+        ?to=string (optional, ISO date/datetime, default: now; a date includes the whole day)
+
+    Returns:
+        200: {"paper_id": string, "granularity": string,
+              "series": [{"timestamp": string, "views": int}]}
+        400: {"error": "Invalid query parameters", "details": [errors]}
+        404: {"error": "Paper not found"}
+        500: {"error": "Internal server error"}
+    """
+    try:
+        granularity = request.args.get("granularity", "day")
+        start_str = request.args.get("from", "").strip()
+        end_str = request.args.get("to", "").strip()
+
+        errors = validate_view_series_params(granularity, start_str, end_str)
+        if errors:
+            return jsonify({"error": "Invalid query parameters", "details": errors}), 400
+
+        if not Paper.find_by_id(paper_id):
+            return jsonify({"error": "Paper not found"}), 404
+
+        end = datetime.utcnow()
+        if end_str:
+            end = datetime.fromisoformat(end_str)
+            if len(end_str) == 10:  # date only: include the whole day
+                end += timedelta(days=1, microseconds=-1)
+        start = datetime.fromisoformat(start_str) if start_str else end - timedelta(days=30)
+
+        series = Paper.get_view_series(paper_id, granularity, start, end)
+        return jsonify({"paper_id": paper_id, "granularity": granularity, "series": series}), 200
+
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@bp.get("/<paper_id>/graph/neighborhood")
+def paper_graph_neighborhood(paper_id: str):
+    """
+    GET /papers/<paper_id>/graph/neighborhood
+    Papers within k citation hops, answered from the in-memory citation graph.
+
+    Query params:
+        ?k=int (optional, 1-CITATION_GRAPH_MAX_HOPS, default: 2)
+        ?direction=string (optional, "out" = papers it cites, "in" = papers citing it,
+                           "both", default: "out")
+        ?limit=int (optional, 1-500, default: 100)
+
+    Returns:
+        200: {"paper_id": string, "k": int, "direction": string, "total": int,
+              "papers": [{"id": string, "title": string, ..., "distance": int}]}
+        400: {"error": "Invalid query parameters", "details": [errors]}
+        404: {"error": "Paper not found"}
+        500: {"error": "Internal server error"}
+    """
+    try:
+        k = request.args.get("k", "2")
+        direction = request.args.get("direction", "out")
+        limit = request.args.get("limit", "100")
+
+        max_hops = current_app.config.get("CITATION_GRAPH_MAX_HOPS", 3)
+        errors = validate_graph_params(direction, k, max_hops, limit)
+        if errors:
+            return jsonify({"error": "Invalid query parameters", "details": errors}), 400
+
+        if not ObjectId.is_valid(paper_id):
+            return jsonify({"error": "Paper not found"}), 404
+
+        citation_graph.ensure_loaded()
+        neighborhood = citation_graph.k_hop(paper_id, int(k), direction)
+        shown = neighborhood[: int(limit)]
+        summaries = Paper.find_summaries_by_ids([pid for pid, _ in shown])
+
+        papers = [
+            {**summaries[pid], "distance": distance} for pid, distance in shown if pid in summaries
+        ]
+        return (
+            jsonify(
+                {
+                    "paper_id": paper_id,
+                    "k": int(k),
+                    "direction": direction,
+                    "total": len(neighborhood),
+                    "papers": papers,
+                }
+            ),
+            200,
+        )
+
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@bp.get("/<paper_id>/graph/path")
+def paper_graph_path(paper_id: str):
+    """
+    GET /papers/<paper_id>/graph/path
+    Shortest citation path between two papers, answered from the in-memory citation graph.
+
+    Query params:
+        ?to=string (required, target paper ID)
+        ?direction=string (optional, "out", "in" or "both", default: "out")
+
+    Returns:
+        200: {"from": string, "to": string, "length": int,
+              "path": [{"id": string, "title": string, ...}]}
+        400: {"error": "Invalid query parameters", "details": [errors]}
+        404: {"error": "No citation path found"}
+        500: {"error": "Internal server error"}
+    """
+    try:
+        target_id = request.args.get("to", "")
+        direction = request.args.get("direction", "out")
+
+        errors = validate_graph_direction(direction)
+        if not ObjectId.is_valid(target_id):
+            errors.append("to must be a valid paper ID")
+        if errors:
+            return jsonify({"error": "Invalid query parameters", "details": errors}), 400
+
+        citation_graph.ensure_loaded()
+        path = citation_graph.shortest_path(paper_id, target_id, direction)
+        if not path:
+            return jsonify({"error": "No citation path found"}), 404
+
+        summaries = Paper.find_summaries_by_ids(path)
+        return (
+            jsonify(
+                {
+                    "from": paper_id,
+                    "to": target_id,
+                    "length": len(path) - 1,
+                    "path": [summaries.get(pid, {"id": pid}) for pid in path],
+                }
+            ),
+            200,
+        )
+
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+
+def _citation_page(paper_id: str, direction: str):
+    """Shared handler of the references and cited-by endpoints."""
+    try:
+        after = request.args.get("after", "").strip()
+        limit = request.args.get("limit", "20")
+
+        errors = validate_page_params(after, limit)
+        if errors:
+            return jsonify({"error": "Invalid query parameters", "details": errors}), 400
+
+        if not ObjectId.is_valid(paper_id):
+            return jsonify({"error": "Paper not found"}), 404
+
+        papers, next_cursor = Paper.get_citation_page(paper_id, direction, after, int(limit))
+        return jsonify({"paper_id": paper_id, "papers": papers, "next_cursor": next_cursor}), 200
+
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@bp.get("/<paper_id>/references")
+def paper_references(paper_id: str):
+    """
+    GET /papers/<paper_id>/references
+    Papers cited by this paper, keyset-paginated.
+
+    Query params:
+        ?after=string (optional, next_cursor of the previous page)
+        ?limit=int (optional, 1-100, default: 20)
+
+    Returns:
+        200: {"paper_id": string, "next_cursor": string | null,
+              "papers": [{"id": string, "title": string, "authors": [string],
+                          "publication_date": string, "journal_conference": string}]}
+        400: {"error": "Invalid query parameters", "details": [errors]}
+        404: {"error": "Paper not found"}
+        500: {"error": "Internal server error"}
+    """
+    return _citation_page(paper_id, "references")
+
+
+@bp.get("/<paper_id>/cited-by")
+def paper_cited_by(paper_id: str):
+    """
+    GET /papers/<paper_id>/cited-by
+    Papers citing this paper, keyset-paginated.
+
+    Query params:
+        ?after=string (optional, next_cursor of the previous page)
+        ?limit=int (optional, 1-100, default: 20)
+
+    Returns:
+        200: {"paper_id": string, "next_cursor": string | null,
+              "papers": [{"id": string, "title": string, "authors": [string],
+                          "publication_date": string, "journal_conference": string}]}
+        400: {"error": "Invalid query parameters", "details": [errors]}
+        404: {"error": "Paper not found"}
+        500: {"error": "Internal server error"}
+    """
+    return _citation_page(paper_id, "cited_by")
+
+
+@bp.get("/<paper_id>/related")
+def related_papers(paper_id: str):
+    """
+    GET /papers/<paper_id>/related
+    Related papers by co-citation and bibliographic coupling, precomputed by a
+    background job and served with a single indexed read.
+
+    Query params:
+        ?limit=int (optional, 1-50, default: 10)
+
+    Returns:
+        200: {"paper_id": string, "papers": [{"id": string, "title": string, "score": float}]}
+        400: {"error": "Invalid query parameters", "details": [errors]}
+        404: {"error": "Paper not found"}
+        500: {"error": "Internal server error"}
+    """
+    try:
+        limit = request.args.get("limit", "10")
+
+        errors = validate_limit_param(limit)
+        if errors:
+            return jsonify({"error": "Invalid query parameters", "details": errors}), 400
+
+        if not ObjectId.is_valid(paper_id):
+            return jsonify({"error": "Paper not found"}), 404
+
+        papers = Paper.get_related(paper_id, int(limit))
+        return jsonify({"paper_id": paper_id, "papers": papers or []}), 200
+
+    except Exception as e:
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@bp.get("/<paper_id>/similar")
+def similar_papers(paper_id: str):
+    """
+    GET /papers/<paper_id>/similar
+    Papers with similar content (TF-IDF cosine over title, abstract and keywords),
+    precomputed by a background job and extended incrementally on upload.
+
+    Query params:
+        ?limit=int (optional, 1-50, default: 10)
+
+    Returns:
+        200: {"paper_id": string, "papers": [{"id": string, "title": string, "score": float}]}
+        400: {"error": "Invalid query parameters", "details": [errors]}
+        404: {"error": "Paper not found"}
+        500: {"error": "Internal server error"}
+    """
+    try:
+        limit = request.args.get("limit", "10")
+
+        errors = validate_limit_param(limit)
+        if errors:
+            return jsonify({"error": "Invalid query parameters", "details": errors}), 400
+
+        if not ObjectId.is_valid(paper_id):
+            return jsonify({"error": "Paper not found"}), 404
+
+        papers = Paper.get_similar(paper_id, int(limit))
+        return jsonify({"paper_id": paper_id, "papers": papers or []}), 200
 
     except Exception as e:
         return jsonify({"error": "Internal server error"}), 500
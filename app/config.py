@@ -8,7 +8,138 @@ from dataclasses import dataclass
 class Config:
     APP_NAME: str = os.getenv("APP_NAME", "research-papers-manager")
 
+    # Number of reverse proxies in front of the app whose X-Forwarded-For entries are
+    # trusted (ProxyFix); 0 uses the peer address, ignoring client-supplied headers
+    TRUSTED_PROXY_COUNT: int = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+
+    # Replica-set reads: search, detail and listing reads use MONGO_READ_PREFERENCE
+    # ("primary", or e.g. "secondaryPreferred") with a staleness bound (90s minimum);
+    # MONGO_CAUSAL_READS orders a user's reads after their own writes with causal sessions
+    MONGO_READ_PREFERENCE: str = os.getenv("MONGO_READ_PREFERENCE", "primary")
+    MONGO_MAX_STALENESS_SEC: int = int(os.getenv("MONGO_MAX_STALENESS_SEC", "90"))
+    MONGO_CAUSAL_READS: bool = os.getenv("MONGO_CAUSAL_READS", "false").lower() == "true"
+
     ENABLE_SCHEDULER: bool = os.getenv("ENABLE_SCHEDULER", "true").lower() == "true"
 
     # Scheduler interval minutes for redis->mongo sync
     VIEWS_SYNC_INTERVAL_MIN: int = int(os.getenv("VIEWS_SYNC_INTERVAL_MIN", "10"))
+
+    # View counts: "counters" syncs paper_views:<id> keys, "stream" appends view events to a
+    # Redis Stream drained by consumer-group aggregators; their poll interval, batch size,
+    # idle time before a dead consumer's events are claimed, the number of applied batch
+    # IDs remembered per paper and how long logged batches (entry IDs and counts) are kept
+    VIEW_PIPELINE: str = os.getenv("VIEW_PIPELINE", "counters")
+    VIEW_EVENTS_INTERVAL_SEC: int = int(os.getenv("VIEW_EVENTS_INTERVAL_SEC", "5"))
+    VIEW_EVENTS_BATCH: int = int(os.getenv("VIEW_EVENTS_BATCH", "1000"))
+    VIEW_EVENTS_CLAIM_IDLE_MS: int = int(os.getenv("VIEW_EVENTS_CLAIM_IDLE_MS", "60000"))
+    VIEW_BATCH_HISTORY: int = int(os.getenv("VIEW_BATCH_HISTORY", "20"))
+    VIEW_BATCH_LOG_TTL_SEC: int = int(os.getenv("VIEW_BATCH_LOG_TTL_SEC", "86400"))
+
+    # Count views in a per-worker buffer flushed to Redis every VIEW_BUFFER_FLUSH_MS with
+    # one pipeline, instead of writing the counters on every view
+    VIEW_BUFFER_ENABLED: bool = os.getenv("VIEW_BUFFER_ENABLED", "false").lower() == "true"
+    VIEW_BUFFER_FLUSH_MS: int = int(os.getenv("VIEW_BUFFER_FLUSH_MS", "250"))
+
+    # Autocomplete: prefixes up to SUGGEST_PREFIX_MAX_LEN characters are answered from a
+    # ZSET of their SUGGEST_PREFIX_TOP_N most popular members; longer ones rank the first
+    # SUGGEST_MAX_CANDIDATES lexicographic matches. Bulk rebuild interval
+    SUGGEST_PREFIX_MAX_LEN: int = int(os.getenv("SUGGEST_PREFIX_MAX_LEN", "15"))
+    SUGGEST_PREFIX_TOP_N: int = int(os.getenv("SUGGEST_PREFIX_TOP_N", "25"))
+    SUGGEST_MAX_CANDIDATES: int = int(os.getenv("SUGGEST_MAX_CANDIDATES", "200"))
+    SUGGEST_REBUILD_INTERVAL_MIN: int = int(os.getenv("SUGGEST_REBUILD_INTERVAL_MIN", "60"))
+
+    # Maximum number of buckets returned per search facet
+    SEARCH_FACET_LIMIT: int = int(os.getenv("SEARCH_FACET_LIMIT", "20"))
+
+    # Search cache keys: drop text-index stop words from terms; TTL of the "no results" cache
+    SEARCH_DROP_STOPWORDS: bool = os.getenv("SEARCH_DROP_STOPWORDS", "true").lower() == "true"
+    SEARCH_NEGATIVE_TTL_SEC: int = int(os.getenv("SEARCH_NEGATIVE_TTL_SEC", "600"))
+
+    # Search cache warming: how often to check for a new (unwarmed) search generation,
+    # queries warmed per generation, popular queries tracked, MongoDB queries per second
+    # and the lock TTL that keeps other workers from warming concurrently
+    SEARCH_WARM_CHECK_SEC: int = int(os.getenv("SEARCH_WARM_CHECK_SEC", "30"))
+    SEARCH_WARM_TOP_N: int = int(os.getenv("SEARCH_WARM_TOP_N", "50"))
+    SEARCH_POPULARITY_TRACKED: int = int(os.getenv("SEARCH_POPULARITY_TRACKED", "1000"))
+    SEARCH_WARM_QPS: float = float(os.getenv("SEARCH_WARM_QPS", "5"))
+    SEARCH_WARM_LOCK_SEC: int = int(os.getenv("SEARCH_WARM_LOCK_SEC", "300"))
+
+    # Trending papers: decay half-life of hourly view buckets and response cache TTL
+    TRENDING_HALF_LIFE_HOURS: int = int(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+    TRENDING_CACHE_TTL_SEC: int = int(os.getenv("TRENDING_CACHE_TTL_SEC", "60"))
+
+    # In-memory citation graph: reload interval, delta size before CSR compaction, max hops
+    CITATION_GRAPH_REFRESH_SEC: int = int(os.getenv("CITATION_GRAPH_REFRESH_SEC", "600"))
+    CITATION_GRAPH_COMPACT_EDGES: int = int(os.getenv("CITATION_GRAPH_COMPACT_EDGES", "1024"))
+    CITATION_GRAPH_MAX_HOPS: int = int(os.getenv("CITATION_GRAPH_MAX_HOPS", "3"))
+
+    # PageRank impact scores: recompute interval and damping factor
+    IMPACT_SCORES_INTERVAL_MIN: int = int(os.getenv("IMPACT_SCORES_INTERVAL_MIN", "60"))
+    IMPACT_DAMPING: float = float(os.getenv("IMPACT_DAMPING", "0.85"))
+
+    # Related papers (co-citation + bibliographic coupling): interval, top-k kept, coupling weight
+    RELATED_PAPERS_INTERVAL_MIN: int = int(os.getenv("RELATED_PAPERS_INTERVAL_MIN", "360"))
+    RELATED_PAPERS_TOP_K: int = int(os.getenv("RELATED_PAPERS_TOP_K", "10"))
+    RELATED_COUPLING_WEIGHT: float = float(os.getenv("RELATED_COUPLING_WEIGHT", "1.0"))
+
+    # Content-similar papers (TF-IDF cosine): interval, top-k kept, score cutoff, vocabulary size,
+    # how often the embedding job checks for a new model, and how often it embeds queued uploads
+    SIMILAR_PAPERS_INTERVAL_MIN: int = int(os.getenv("SIMILAR_PAPERS_INTERVAL_MIN", "720"))
+    SIMILAR_PAPERS_TOP_K: int = int(os.getenv("SIMILAR_PAPERS_TOP_K", "10"))
+    SIMILAR_MIN_SCORE: float = float(os.getenv("SIMILAR_MIN_SCORE", "0.05"))
+    TFIDF_MAX_FEATURES: int = int(os.getenv("TFIDF_MAX_FEATURES", "20000"))
+    SIMILAR_REFRESH_SEC: int = int(os.getenv("SIMILAR_REFRESH_SEC", "600"))
+    SIMILAR_EMBED_INTERVAL_SEC: int = int(os.getenv("SIMILAR_EMBED_INTERVAL_SEC", "10"))
+
+    # Near-duplicate uploads (MinHash/LSH): "flag", "reject" or "off", estimated Jaccard
+    # threshold, signature length and LSH bands (DEDUP_NUM_PERM must be a multiple of bands)
+    DEDUP_MODE: str = os.getenv("DEDUP_MODE", "flag")
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+    DEDUP_NUM_PERM: int = int(os.getenv("DEDUP_NUM_PERM", "128"))
+    DEDUP_BANDS: int = int(os.getenv("DEDUP_BANDS", "32"))
+    # How often the dedup_scan job checks for a scan requested from the admin API
+    DEDUP_SCAN_CHECK_SEC: int = int(os.getenv("DEDUP_SCAN_CHECK_SEC", "60"))
+
+    # Paper detail cache: Redis TTL of rendered details and citation counts, size and TTL
+    # of the per-process LRU in front of Redis
+    DETAIL_CACHE_TTL_SEC: int = int(os.getenv("DETAIL_CACHE_TTL_SEC", "3600"))
+    DETAIL_LRU_SIZE: int = int(os.getenv("DETAIL_LRU_SIZE", "1024"))
+    DETAIL_LRU_TTL_SEC: int = int(os.getenv("DETAIL_LRU_TTL_SEC", "10"))
+
+    # Uploads: "sync" inserts in the request, "async" queues papers in a Redis Stream and
+    # answers 202; queue poll interval, batch size, idle time before a dead consumer's
+    # entries are claimed, queue length above which uploads get 503 and ticket TTL
+    UPLOAD_MODE: str = os.getenv("UPLOAD_MODE", "sync")
+    UPLOAD_QUEUE_INTERVAL_SEC: int = int(os.getenv("UPLOAD_QUEUE_INTERVAL_SEC", "2"))
+    UPLOAD_QUEUE_BATCH: int = int(os.getenv("UPLOAD_QUEUE_BATCH", "100"))
+    UPLOAD_QUEUE_CLAIM_IDLE_MS: int = int(os.getenv("UPLOAD_QUEUE_CLAIM_IDLE_MS", "60000"))
+    UPLOAD_QUEUE_MAXLEN: int = int(os.getenv("UPLOAD_QUEUE_MAXLEN", "100000"))
+    UPLOAD_TICKET_TTL_SEC: int = int(os.getenv("UPLOAD_TICKET_TTL_SEC", "86400"))
+
+    # Slow-query log: threshold for search/detail queries, how often queued slow queries
+    # are logged in the background, queries per run, queue cap, capped log size, and how
+    # long a shape's explain plan is reused before one of its queries is explained again
+    SLOW_QUERY_MS: int = int(os.getenv("SLOW_QUERY_MS", "200"))
+    SLOW_QUERY_EXPLAIN_INTERVAL_SEC: int = int(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL_SEC", "5"))
+    SLOW_QUERY_EXPLAIN_BATCH: int = int(os.getenv("SLOW_QUERY_EXPLAIN_BATCH", "50"))
+    SLOW_QUERY_QUEUE_MAX: int = int(os.getenv("SLOW_QUERY_QUEUE_MAX", "10000"))
+    SLOW_QUERY_LOG_MB: int = int(os.getenv("SLOW_QUERY_LOG_MB", "16"))
+    SLOW_QUERY_EXPLAIN_WINDOW_SEC: int = int(os.getenv("SLOW_QUERY_EXPLAIN_WINDOW_SEC", "600"))
+
+    # Index advisor: how often each worker and the scheduler add recorded query shapes to Redis
+    INDEX_ADVISOR_FLUSH_SEC: int = int(os.getenv("INDEX_ADVISOR_FLUSH_SEC", "30"))
+
+    # Token-bucket rate limits per endpoint class as "<tokens per second>,<burst>",
+    # applied per client IP and per X-User-ID (empty disables a class)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_SEARCH: str = os.getenv("RATE_LIMIT_SEARCH", "10,50")
+    RATE_LIMIT_SUGGEST: str = os.getenv("RATE_LIMIT_SUGGEST", "20,60")
+    RATE_LIMIT_DETAIL: str = os.getenv("RATE_LIMIT_DETAIL", "50,200")
+    RATE_LIMIT_UPLOAD: str = os.getenv("RATE_LIMIT_UPLOAD", "1,20")
+    RATE_LIMIT_AUTH: str = os.getenv("RATE_LIMIT_AUTH", "2,20")
+
+    # Load shedding: answer 503 when this worker's Mongo latency average or the
+    # cluster-wide number of in-flight limited requests passes these thresholds
+    LOAD_SHED_ENABLED: bool = os.getenv("LOAD_SHED_ENABLED", "false").lower() == "true"
+    LOAD_SHED_MONGO_LATENCY_MS: int = int(os.getenv("LOAD_SHED_MONGO_LATENCY_MS", "500"))
+    LOAD_SHED_MAX_IN_FLIGHT: int = int(os.getenv("LOAD_SHED_MAX_IN_FLIGHT", "64"))
@@ -8,27 +8,53 @@ import redis
 from flask import Flask
 from pymongo import MongoClient
 
+from .services.index_advisor import query_shapes
+from .utils.rate_limit import mongo_latency
+from .utils.read_routing import read_database
+
 
 @dataclass
 class MongoExtension:
     client: Optional[MongoClient] = None
+    pid: Optional[int] = None
 
     def init_app(self, app: Flask) -> None:
         uri = os.getenv("MONGODB_URI", "mongodb://mongo:27017")
-        self.client = MongoClient(uri)
+        self.client = MongoClient(uri, event_listeners=[mongo_latency, query_shapes])
+        self.pid = os.getpid()
         app.mongo_client = self.client  # type: ignore[attr-defined]
         app.mongo_db = self.client[os.getenv("MONGODB_DB", "research_db")]  # type: ignore[attr-defined]
+        # Search/detail reads; the primary unless MONGO_READ_PREFERENCE allows secondaries
+        app.mongo_read_db = read_database(  # type: ignore[attr-defined]
+            app.mongo_db,  # type: ignore[attr-defined]
+            app.config.get("MONGO_READ_PREFERENCE", "primary"),
+            app.config.get("MONGO_MAX_STALENESS_SEC", 90),
+        )
 
 
 @dataclass
 class RedisExtension:
     client: Optional[redis.Redis] = None
+    pid: Optional[int] = None
 
     def init_app(self, app: Flask) -> None:
         url = os.getenv("REDIS_URL", "redis://redis:6379/0")
         self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.pid = os.getpid()
         app.redis = self.client  # type: ignore[attr-defined]
 
 
 mongo_client = MongoExtension()
 redis_client = RedisExtension()
+
+
+def init_process_clients(app: Flask) -> None:
+    """
+    Re-create the MongoDB and Redis clients in a process forked after they were
+    opened (gunicorn --preload workers), so workers share no sockets or monitor
+    threads with the master. No-op in the process that created them.
+    """
+    if mongo_client.pid != os.getpid():
+        mongo_client.init_app(app)
+    if redis_client.pid != os.getpid():
+        redis_client.init_app(app)
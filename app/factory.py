@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from .config import Config
 from .extensions import mongo_client, redis_client
@@ -10,17 +11,42 @@ from .scheduler import scheduler
 def create_app() -> Flask:
     app = Flask(__name__)
     app.config.from_object(Config)
+    register_proxy_fix(app)
     register_extensions(app)
     register_indexes(app)
+    register_request_guards(app)
+    register_query_monitoring(app)
     register_blueprints(app)
     register_healthcheck(app)
     register_scheduler(app)
     return app
 
 
+def register_proxy_fix(app: Flask) -> None:
+    """Resolve remote_addr from X-Forwarded-For set by TRUSTED_PROXY_COUNT proxies only."""
+    trusted = app.config.get("TRUSTED_PROXY_COUNT", 0)
+    if trusted > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted)  # type: ignore[method-assign]
+
+
 def register_extensions(app: Flask) -> None:
+    from .utils import read_routing
+
     mongo_client.init_app(app)
     redis_client.init_app(app)
+    read_routing.init_app(app)
+
+
+def register_request_guards(app: Flask) -> None:
+    from .utils import rate_limit
+
+    rate_limit.init_app(app)
+
+
+def register_query_monitoring(app: Flask) -> None:
+    from .services import index_advisor
+
+    index_advisor.init_app(app)
 
 
 def register_blueprints(app: Flask) -> None:
@@ -57,8 +83,76 @@ def register_indexes(app: Flask) -> None:
         name="text_papers",
         default_language="english",
     )
+    # Papers: equality filter + publication_date compound indexes, so filtered and
+    # date-sorted browsing walk an index instead of sorting in memory. authors and
+    # keywords are multikey, so they cannot share one compound index.
+    db.papers.create_index([("publication_date", -1)], name="ix_publication_date")
+    db.papers.create_index(
+        [("authors", 1), ("publication_date", -1)], name="ix_authors_publication_date"
+    )
+    db.papers.create_index(
+        [("keywords", 1), ("publication_date", -1)], name="ix_keywords_publication_date"
+    )
+    db.papers.create_index(
+        [("journal_conference", 1), ("publication_date", -1)],
+        name="ix_venue_publication_date",
+    )
+    # Papers: PageRank impact score for sort_by=impact
+    db.papers.create_index([("impact_score", -1)], name="ix_impact_score")
     # Citations: index on cited_paper_id
     db.citations.create_index("cited_paper_id", name="ix_cited_paper")
+    # Citations: one edge per (citing, cited) pair; also serves "references" pages
+    remove_duplicate_citations(db)
+    db.citations.create_index(
+        [("paper_id", 1), ("cited_paper_id", 1)], unique=True, name="ux_paper_cited_paper"
+    )
+    # Citations: keyset pagination of "cited-by" pages
+    db.citations.create_index([("cited_paper_id", 1), ("paper_id", 1)], name="ix_cited_paper_paper")
+    # Paper view series: hourly view buckets flushed from Redis by the sync job
+    if "paper_view_series" not in db.list_collection_names(filter={"name": "paper_view_series"}):
+        db.create_collection(
+            "paper_view_series",
+            timeseries={"timeField": "ts", "metaField": "paper_id", "granularity": "hours"},
+        )
+    db.paper_view_series.create_index([("paper_id", 1), ("ts", 1)], name="ix_paper_ts")
+    # View event batches: entry IDs of applied batches, looked up on re-delivery
+    db.view_event_batches.create_index("entries", name="ix_entries")
+    db.view_event_batches.create_index(
+        "created_at",
+        expireAfterSeconds=app.config.get("VIEW_BATCH_LOG_TTL_SEC", 86400),
+        name="ttl_created_at",
+    )
+    # Paper signatures: multikey LSH band index for near-duplicate lookups
+    db.paper_signatures.create_index("bands", name="ix_bands")
+    # Slow-query log: capped, so old entries are dropped in insertion order
+    if "slow_queries" not in db.list_collection_names(filter={"name": "slow_queries"}):
+        db.create_collection(
+            "slow_queries",
+            capped=True,
+            size=app.config.get("SLOW_QUERY_LOG_MB", 16) * 1024 * 1024,
+        )
+
+
+def remove_duplicate_citations(db) -> None:
+    """Delete repeated (paper_id, cited_paper_id) edges so the unique index can be built."""
+    if "ux_paper_cited_paper" in db.citations.index_information():
+        return
+
+    duplicates = db.citations.aggregate(
+        [
+            {
+                "$group": {
+                    "_id": {"paper_id": "$paper_id", "cited_paper_id": "$cited_paper_id"},
+                    "ids": {"$push": "$_id"},
+                    "count": {"$sum": 1},
+                }
+            },
+            {"$match": {"count": {"$gt": 1}}},
+        ],
+        allowDiskUse=True,
+    )
+    for group in duplicates:
+        db.citations.delete_many({"_id": {"$in": group["ids"][1:]}})
 
 
 def register_healthcheck(app: Flask) -> None:
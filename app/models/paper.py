@@ -1,40 +1,71 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from bson import ObjectId
 from flask import current_app
 from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from ..services.citation_graph import citation_graph
+from ..services.dedup import DedupService
+from ..services.similarity import SimilarityService
+from ..services.slow_queries import SlowQueryService
+from ..services.suggest import SuggestService
+from ..utils.cache import CacheService
+from ..utils.read_routing import (
+    causal_session,
+    read_db,
+    routes_to_secondaries,
+    write_session,
+)
 
 
 class Paper:
     """Paper model for MongoDB operations."""
 
     @staticmethod
-    def create(data: Dict[str, Any], user_id: str) -> str:
-        """
-        Create a new paper in MongoDB.
-        Returns the paper_id (string) of created paper.
-        """
-        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
-
-        pub_date = datetime.fromisoformat(data["publication_date"])
-
-        paper_doc = {
+    def _build_paper_doc(data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        """Build the papers document of validated upload data."""
+        return {
             "title": data["title"],
             "authors": data["authors"],
             "abstract": data["abstract"],
-            "publication_date": pub_date,
+            "publication_date": datetime.fromisoformat(data["publication_date"]),
             "journal_conference": data.get("journal_conference", ""),
             "keywords": data["keywords"],
             "uploaded_by": ObjectId(user_id),
             "views": 0,
         }
 
-        result = db.papers.insert_one(paper_doc)
+    @staticmethod
+    def _index_new_paper(paper_doc: Dict[str, Any]) -> None:
+        """Register an inserted paper with autocomplete, similarity and dedup indexes."""
+        # Make the new title and keywords available to autocomplete
+        SuggestService.index_paper(paper_doc)
+
+        # Queue the new paper for embedding with the current TF-IDF model
+        SimilarityService.embed_paper(paper_doc)
+
+        # Register the MinHash signature so later near-duplicates of this paper are caught
+        DedupService.index_paper(paper_doc)
+
+    @staticmethod
+    def create(data: Dict[str, Any], user_id: str) -> str:
+        """
+        Create a new paper in MongoDB.
+        Returns the paper_id (string) of created paper.
+        """
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+
+        paper_doc = Paper._build_paper_doc(data, user_id)
+        result = db.papers.insert_one(paper_doc, session=write_session())
         paper_id = str(result.inserted_id)
 
+        Paper._index_new_paper(paper_doc)
+
         # Insert citations if any
         citations = data.get("citations", [])
         if citations:
@@ -42,11 +73,102 @@ class Paper:
 
         return paper_id
 
+    @staticmethod
+    def create_many(papers: List[Tuple[str, Dict[str, Any], str]]) -> Dict[str, str]:
+        """
+        Create several papers, given as (paper_id, data, user_id), with one insert_many
+        for the papers and one for their citations (used by the upload queue).
+
+        IDs are assigned by the caller, so a retried batch cannot insert a paper twice:
+        papers that already exist count as created and are not indexed again, while
+        their citations are re-inserted (the unique edge index drops repeats).
+        Papers citing a batch paper that failed to insert are deleted again and fail too.
+        Returns {paper_id: error message} for papers that could not be inserted.
+        """
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+
+        docs = []
+        for paper_id, data, user_id in papers:
+            doc = Paper._build_paper_doc(data, user_id)
+            doc["_id"] = ObjectId(paper_id)
+            docs.append(doc)
+
+        existing, errors = set(), {}
+        try:
+            db.papers.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                paper_id = str(docs[error["index"]]["_id"])
+                if error.get("code") == 11000:
+                    existing.add(paper_id)
+                else:
+                    errors[paper_id] = error.get("errmsg", "Insert failed")
+
+        # Papers citing a paper of the batch that could not be inserted are removed again
+        cascaded = Paper.cascade_failed_citations(
+            {paper_id: data.get("citations", []) for paper_id, data, _ in papers}, set(errors)
+        )
+        if cascaded:
+            db.papers.delete_many({"_id": {"$in": [ObjectId(pid) for pid in cascaded]}})
+            for paper_id in cascaded:
+                errors[paper_id] = "Cited paper of the same batch could not be created"
+
+        citation_docs = []
+        cited_by_paper: Dict[str, List[str]] = {}
+        for doc, (paper_id, data, _) in zip(docs, papers):
+            if paper_id in errors:
+                continue
+            cited_ids = list(dict.fromkeys(data.get("citations", [])))
+            if paper_id not in existing:
+                Paper._index_new_paper(doc)
+                cited_by_paper[paper_id] = cited_ids
+            if cited_ids:
+                citation_docs += [
+                    {"paper_id": doc["_id"], "cited_paper_id": ObjectId(cited_id)}
+                    for cited_id in cited_ids
+                ]
+
+        if citation_docs:
+            try:
+                db.citations.insert_many(citation_docs, ordered=False)
+            except BulkWriteError:
+                pass  # edges stored by an earlier attempt of the same batch
+            for paper_id, cited_ids in cited_by_paper.items():
+                if cited_ids:
+                    citation_graph.add_edges(paper_id, cited_ids)
+            CacheService.invalidate_citation_counts(
+                list(dict.fromkeys(str(doc["cited_paper_id"]) for doc in citation_docs))
+            )
+
+        return errors
+
+    @staticmethod
+    def cascade_failed_citations(citations: Dict[str, List[str]], failed: Set[str]) -> Set[str]:
+        """
+        Papers of a batch, given as {paper_id: cited IDs}, that cite a failed paper of
+        the batch directly or through other papers of the batch. `failed` itself is not
+        included in the result.
+        """
+        cascaded: Set[str] = set()
+        changed = bool(failed)
+        while changed:
+            changed = False
+            for paper_id, cited_ids in citations.items():
+                if paper_id in failed or paper_id in cascaded:
+                    continue
+                if any(cid in failed or cid in cascaded for cid in cited_ids):
+                    cascaded.add(paper_id)
+                    changed = True
+        return cascaded
+
     @staticmethod
     def _create_citations(paper_id: str, cited_paper_ids: List[str]) -> None:
         """Create citation relationships in Citations collection."""
         db: Database = current_app.mongo_db  # type: ignore[attr-defined]
 
+        # (paper_id, cited_paper_id) is unique, so drop repeated IDs first
+        cited_paper_ids = list(dict.fromkeys(cited_paper_ids))
+
         citation_docs = []
         for cited_id in cited_paper_ids:
             citation_docs.append(
@@ -54,79 +176,415 @@ class Paper:
             )
 
         if citation_docs:
-            db.citations.insert_many(citation_docs)
+            db.citations.insert_many(citation_docs, session=write_session())
+            citation_graph.add_edges(paper_id, cited_paper_ids)
+            CacheService.invalidate_citation_counts(cited_paper_ids)
 
     @staticmethod
     def find_by_id(paper_id: str) -> Optional[Dict[str, Any]]:
-        """Find paper by ObjectId. Returns paper document or None."""
-        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        """
+        Find paper by ObjectId. Returns paper document or None.
+        Read from secondaries when configured; a paper they do not have yet (just
+        uploaded) is read from the primary.
+        """
+        db = read_db()
         try:
-            return db.papers.find_one({"_id": ObjectId(paper_id)})
+            query = {"_id": ObjectId(paper_id)}
+            started = time.perf_counter()
+            paper = db.papers.find_one(query, session=causal_session())
+            SlowQueryService.record(
+                "detail",
+                {"find": "papers", "filter": query, "limit": 1},
+                started,
+                int(bool(paper)),
+                db,
+            )
+            if paper is None and routes_to_secondaries():
+                primary: Database = current_app.mongo_db  # type: ignore[attr-defined]
+                paper = primary.papers.find_one(query)
+            return paper
         except Exception:
             return None
 
     @staticmethod
-    def search(
-        search_term: str, sort_by: str = "relevance", order: str = "desc"
-    ) -> List[Dict[str, Any]]:
+    def find_by_ids(paper_ids: List[str]) -> Dict[str, Dict[str, Any]]:
         """
-        Search papers using MongoDB text search.
-        Returns list of paper documents formatted for API response.
+        Fetch several full paper documents with one $in query.
+        Returns {paper_id: document}; unknown or invalid IDs are skipped. Papers
+        missing on secondaries are looked up again on the primary, like find_by_id.
         """
-        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        db = read_db()
+
+        object_ids = [ObjectId(pid) for pid in paper_ids if ObjectId.is_valid(pid)]
+        if not object_ids:
+            return {}
+
+        query = {"_id": {"$in": object_ids}}
+        started = time.perf_counter()
+        papers = {str(doc["_id"]): doc for doc in db.papers.find(query, session=causal_session())}
+        SlowQueryService.record(
+            "detail", {"find": "papers", "filter": query}, started, len(papers), db
+        )
+
+        missing = [oid for oid in object_ids if str(oid) not in papers]
+        if missing and routes_to_secondaries():
+            primary: Database = current_app.mongo_db  # type: ignore[attr-defined]
+            for doc in primary.papers.find({"_id": {"$in": missing}}):
+                papers[str(doc["_id"])] = doc
+        return papers
 
-        # Build query
+    @staticmethod
+    def _build_search_query(
+        search_term: str, filters: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the MongoDB filter for a search term and structured filters.
+        Filters are equality matches on multikey fields plus a publication_date
+        range, so they can be served by the compound indexes in register_indexes.
+        """
+        query: Dict[str, Any] = {}
         if search_term.strip():
-            query = {"$text": {"$search": search_term}}
-        else:
-            query = {}
+            query["$text"] = {"$search": search_term}
+
+        filters = filters or {}
+        if filters.get("author"):
+            query["authors"] = filters["author"]
+        if filters.get("keyword"):
+            query["keywords"] = filters["keyword"]
+        if filters.get("venue"):
+            query["journal_conference"] = filters["venue"]
 
-        # Build sort criteria
+        date_range = {}
+        if filters.get("from"):
+            date_range["$gte"] = datetime.fromisoformat(filters["from"])
+        if filters.get("to"):
+            date_range["$lte"] = datetime.fromisoformat(filters["to"])
+        if date_range:
+            query["publication_date"] = date_range
+
+        return query
+
+    @staticmethod
+    def _build_search_sort(search_term: str, sort_by: str, order: str) -> List[Tuple[str, Any]]:
+        """Build sort criteria for a search."""
         if sort_by == "relevance" and search_term.strip():
-            sort_criteria = [("score", {"$meta": "textScore"})]
-            if order == "asc":
-                sort_criteria = [("score", {"$meta": "textScore"})]  # text score is always desc
-        else:
-            # Sort by publication_date
-            sort_direction = 1 if order == "asc" else -1
-            sort_criteria = [("publication_date", sort_direction)]
+            return [("score", {"$meta": "textScore"})]  # text score is always desc
+
+        sort_direction = 1 if order == "asc" else -1
+        if sort_by == "impact":
+            return [("impact_score", sort_direction)]
+
+        # Sort by publication_date
+        return [("publication_date", sort_direction)]
+
+    @staticmethod
+    def _format_search_result(doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a paper document for the search API response."""
+        return {
+            "id": str(doc["_id"]),
+            "title": doc["title"],
+            "authors": doc["authors"],
+            "publication_date": doc["publication_date"].isoformat(),
+            "journal_conference": doc.get("journal_conference", ""),
+            "keywords": doc["keywords"],
+        }
+
+    @staticmethod
+    def search(
+        search_term: str,
+        sort_by: str = "relevance",
+        order: str = "desc",
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search papers using MongoDB text search and optional structured filters.
+        Returns list of paper documents formatted for API response.
+        """
+        db = read_db()
+
+        query = Paper._build_search_query(search_term, filters)
+        sort_criteria = Paper._build_search_sort(search_term, sort_by, order)
 
         # Execute query
-        if search_term.strip():
-            cursor = db.papers.find(query, {"score": {"$meta": "textScore"}}).sort(sort_criteria)
-        else:
-            cursor = db.papers.find(query).sort(sort_criteria)
-
-        # Format results for API response
-        results = []
-        for doc in cursor:
-            results.append(
-                {
-                    "id": str(doc["_id"]),
-                    "title": doc["title"],
-                    "authors": doc["authors"],
-                    "publication_date": doc["publication_date"].isoformat(),
-                    "journal_conference": doc.get("journal_conference", ""),
-                    "keywords": doc["keywords"],
-                }
-            )
+        projection = {"score": {"$meta": "textScore"}} if search_term.strip() else None
+        started = time.perf_counter()
+        cursor = db.papers.find(query, projection, session=causal_session()).sort(sort_criteria)
+        papers = [Paper._format_search_result(doc) for doc in cursor]
+
+        command = {"find": "papers", "filter": query, "sort": dict(sort_criteria)}
+        if projection:
+            command["projection"] = projection
+        SlowQueryService.record("search", command, started, len(papers), db)
+        return papers
+
+    @staticmethod
+    def find_summaries_by_ids(paper_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch several papers with one $in query.
+        Returns {paper_id: search-formatted paper}; unknown or invalid IDs are skipped.
+        """
+        db = read_db()
+
+        object_ids = [ObjectId(pid) for pid in paper_ids if ObjectId.is_valid(pid)]
+        if not object_ids:
+            return {}
+
+        cursor = db.papers.find(
+            {"_id": {"$in": object_ids}}, {"abstract": 0}, session=causal_session()
+        )
+        return {str(doc["_id"]): Paper._format_search_result(doc) for doc in cursor}
+
+    @staticmethod
+    def _facet_pipeline(facet: str, limit: int) -> List[Dict[str, Any]]:
+        """Build the $facet sub-pipeline that counts values of one facet."""
+        # Most frequent values first, ties broken by value so cached blocks are stable
+        by_count = {"$sort": {"count": -1, "_id": 1}}
+        if facet == "keywords":
+            stages: List[Dict[str, Any]] = [
+                {"$unwind": "$keywords"},
+                {"$group": {"_id": "$keywords", "count": {"$sum": 1}}},
+                by_count,
+            ]
+        elif facet == "journal_conference":
+            stages = [
+                {"$match": {"journal_conference": {"$nin": ["", None]}}},
+                {"$group": {"_id": "$journal_conference", "count": {"$sum": 1}}},
+                by_count,
+            ]
+        else:  # year, newest first
+            stages = [
+                {"$group": {"_id": {"$year": "$publication_date"}, "count": {"$sum": 1}}},
+                {"$sort": {"_id": -1}},
+            ]
+        return stages + [{"$limit": limit}]
+
+    @staticmethod
+    def search_with_facets(
+        search_term: str,
+        sort_by: str,
+        order: str,
+        facets: List[str],
+        include_papers: bool = True,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
+        """
+        Search papers and count facet values.
+
+        The listing is read with a normal cursor (Paper.search) and only the facet
+        counts run in a $facet aggregation: a $facet result is a single document,
+        so an unbounded listing inside it would hit the 16MB document limit.
+        When include_papers is False only the facet blocks are computed (used when
+        the listing is already cached). Returns (papers or None, facets).
+        """
+        db = read_db()
+        limit = current_app.config.get("SEARCH_FACET_LIMIT", 20)
+
+        papers = None
+        if include_papers:
+            papers = Paper.search(search_term, sort_by, order, filters)
+        if not facets:
+            return papers, {}
 
-        return results
+        pipeline = [
+            {"$match": Paper._build_search_query(search_term, filters)},
+            {"$facet": {facet: Paper._facet_pipeline(facet, limit) for facet in facets}},
+        ]
+        started = time.perf_counter()
+        result = next(db.papers.aggregate(pipeline, session=causal_session()), {})
+        SlowQueryService.record(
+            "search",
+            {"aggregate": "papers", "pipeline": pipeline, "cursor": {}},
+            started,
+            sum(len(result.get(facet, [])) for facet in facets),
+            db,
+        )
+
+        facet_counts = {
+            facet: [
+                {"value": bucket["_id"], "count": bucket["count"]}
+                for bucket in result.get(facet, [])
+            ]
+            for facet in facets
+        }
+        return papers, facet_counts
+
+    @staticmethod
+    def get_view_counters(paper_id: str) -> Dict[str, int]:
+        """Persisted views and unique_views of a paper (zeros if it is not found)."""
+        db = read_db()
+        try:
+            paper = db.papers.find_one(
+                {"_id": ObjectId(paper_id)},
+                {"_id": 0, "views": 1, "unique_views": 1},
+                session=causal_session(),
+            )
+        except Exception:
+            paper = None
+        paper = paper or {}
+        return {"views": paper.get("views", 0), "unique_views": paper.get("unique_views", 0)}
 
     @staticmethod
     def get_citation_count(paper_id: str) -> int:
         """Get count of papers that cite this paper."""
-        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        db = read_db()
         try:
-            return db.citations.count_documents({"cited_paper_id": ObjectId(paper_id)})
+            return db.citations.count_documents(
+                {"cited_paper_id": ObjectId(paper_id)}, session=causal_session()
+            )
         except Exception:
             return 0
 
+    @staticmethod
+    def get_citation_counts(paper_ids: List[str]) -> Dict[str, int]:
+        """
+        Citation counts of several papers with one aggregation over ix_cited_paper.
+        Papers nobody cites are missing from the result.
+        """
+        db = read_db()
+
+        object_ids = [ObjectId(pid) for pid in paper_ids if ObjectId.is_valid(pid)]
+        if not object_ids:
+            return {}
+
+        try:
+            counts = db.citations.aggregate(
+                [
+                    {"$match": {"cited_paper_id": {"$in": object_ids}}},
+                    {"$group": {"_id": "$cited_paper_id", "count": {"$sum": 1}}},
+                ],
+                session=causal_session(),
+            )
+            return {str(doc["_id"]): doc["count"] for doc in counts}
+        except Exception:
+            return {}
+
+    @staticmethod
+    def get_citation_page(
+        paper_id: str, direction: str, after: Optional[str] = None, limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One keyset-paginated page of a paper's references ("references": papers it
+        cites) or citing papers ("cited_by"), joined to paper titles with one $lookup.
+
+        Edges are walked in ObjectId order of the other paper through the
+        (paper_id, cited_paper_id) / (cited_paper_id, paper_id) indexes, so each page
+        is an index range scan. Returns (papers, next cursor or None).
+        """
+        db = read_db()
+
+        if direction == "references":
+            own_field, other_field = "paper_id", "cited_paper_id"
+        else:
+            own_field, other_field = "cited_paper_id", "paper_id"
+
+        match: Dict[str, Any] = {own_field: ObjectId(paper_id)}
+        if after:
+            match[other_field] = {"$gt": ObjectId(after)}
+
+        pipeline = [
+            {"$match": match},
+            {"$sort": {other_field: 1}},
+            {"$limit": limit + 1},
+            {
+                "$lookup": {
+                    "from": "papers",
+                    "localField": other_field,
+                    "foreignField": "_id",
+                    "pipeline": [
+                        {
+                            "$project": {
+                                "title": 1,
+                                "authors": 1,
+                                "publication_date": 1,
+                                "journal_conference": 1,
+                            }
+                        }
+                    ],
+                    "as": "paper",
+                }
+            },
+            # Keep dangling edges so the cursor still advances past them
+            {"$unwind": {"path": "$paper", "preserveNullAndEmptyArrays": True}},
+        ]
+        edges = list(db.citations.aggregate(pipeline, session=causal_session()))
+
+        next_cursor = str(edges[limit - 1][other_field]) if len(edges) > limit else None
+        papers = [
+            {
+                "id": str(edge["paper"]["_id"]),
+                "title": edge["paper"]["title"],
+                "authors": edge["paper"]["authors"],
+                "publication_date": edge["paper"]["publication_date"].isoformat(),
+                "journal_conference": edge["paper"].get("journal_conference", ""),
+            }
+            for edge in edges[:limit]
+            if "paper" in edge
+        ]
+        return papers, next_cursor
+
+    @staticmethod
+    def _get_precomputed(
+        collection: str, field: str, paper_id: str, limit: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Read the first `limit` entries of a precomputed neighbour list with one _id lookup."""
+        db = read_db()
+
+        doc = db[collection].find_one({"_id": ObjectId(paper_id)}, {field: {"$slice": limit}})
+        if not doc:
+            return None
+
+        return [
+            {"id": str(item["paper_id"]), "title": item["title"], "score": item["score"]}
+            for item in doc[field]
+        ]
+
+    @staticmethod
+    def get_related(paper_id: str, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """
+        Precomputed citation-based related papers.
+        Returns None if nothing was computed for this paper.
+        """
+        return Paper._get_precomputed("related_papers", "related", paper_id, limit)
+
+    @staticmethod
+    def get_similar(paper_id: str, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """
+        Precomputed content-similar papers (TF-IDF cosine).
+        Returns None if the paper has not been vectorized yet.
+        """
+        return Paper._get_precomputed("similar_papers", "similar", paper_id, limit)
+
+    @staticmethod
+    def get_view_series(
+        paper_id: str, granularity: str, start: datetime, end: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Sum hourly view buckets of a paper from the paper_view_series collection
+        into hour/day/week/month buckets between start and end.
+        """
+        db = read_db()
+
+        pipeline = [
+            {"$match": {"paper_id": ObjectId(paper_id), "ts": {"$gte": start, "$lte": end}}},
+            {
+                "$group": {
+                    "_id": {"$dateTrunc": {"date": "$ts", "unit": granularity}},
+                    "views": {"$sum": "$views"},
+                }
+            },
+            {"$sort": {"_id": 1}},
+        ]
+        return [
+            {"timestamp": doc["_id"].isoformat(), "views": doc["views"]}
+            for doc in db.paper_view_series.aggregate(pipeline)
+        ]
+
     @staticmethod
     def validate_citations_exist(citation_ids: List[str]) -> List[str]:
         """
         Validate that all citation IDs exist in Papers collection.
-        Returns list of invalid IDs.
+        Returns list of invalid IDs. Always reads the primary, so papers uploaded
+        moments ago can be cited.
         """
         db: Database = current_app.mongo_db  # type: ignore[attr-defined]
         invalid_ids = []
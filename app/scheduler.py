@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime, timezone
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from flask import Flask
@@ -25,6 +26,136 @@ class SchedulerWrapper:
             name="Sync Paper Views from Redis to MongoDB",
         )
 
+        # Background job to rebuild the autocomplete index from MongoDB
+        self._scheduler.add_job(
+            func=self._rebuild_suggest_index_job,
+            trigger="interval",
+            minutes=app.config.get("SUGGEST_REBUILD_INTERVAL_MIN", 60),
+            id="suggest_rebuild",
+            replace_existing=True,
+            max_instances=1,
+            name="Rebuild Autocomplete Index from MongoDB",
+        )
+
+        # Background job to recompute PageRank impact scores from the citation graph;
+        # also runs right at startup so sort_by=impact works without waiting an interval
+        self._scheduler.add_job(
+            func=self._impact_scores_job,
+            trigger="interval",
+            minutes=app.config.get("IMPACT_SCORES_INTERVAL_MIN", 60),
+            next_run_time=datetime.now(timezone.utc),
+            id="impact_scores",
+            replace_existing=True,
+            max_instances=1,
+            name="Compute PageRank Impact Scores",
+        )
+
+        # Background job to precompute citation-based related papers
+        self._scheduler.add_job(
+            func=self._related_papers_job,
+            trigger="interval",
+            minutes=app.config.get("RELATED_PAPERS_INTERVAL_MIN", 360),
+            id="related_papers",
+            replace_existing=True,
+            max_instances=1,
+            name="Compute Related Papers from Citations",
+        )
+
+        # Background job to rebuild the TF-IDF model and content-similar papers
+        self._scheduler.add_job(
+            func=self._similar_papers_job,
+            trigger="interval",
+            minutes=app.config.get("SIMILAR_PAPERS_INTERVAL_MIN", 720),
+            id="similar_papers",
+            replace_existing=True,
+            max_instances=1,
+            name="Compute Content-Similar Papers",
+        )
+
+        # Background job embedding queued uploads with the stored TF-IDF model
+        self._scheduler.add_job(
+            func=self._similar_embed_job,
+            trigger="interval",
+            seconds=app.config.get("SIMILAR_EMBED_INTERVAL_SEC", 10),
+            id="similar_embed",
+            replace_existing=True,
+            max_instances=1,
+            name="Embed Uploaded Papers for Similarity",
+        )
+
+        # Background job scanning for near-duplicate papers when requested from the admin
+        # API; also runs right at startup to backfill signatures if no scan ever finished
+        self._scheduler.add_job(
+            func=self._dedup_scan_job,
+            trigger="interval",
+            seconds=app.config.get("DEDUP_SCAN_CHECK_SEC", 60),
+            next_run_time=datetime.now(timezone.utc),
+            id="dedup_scan",
+            replace_existing=True,
+            max_instances=1,
+            name="Scan for Near-Duplicate Papers",
+        )
+
+        # Background job warming popular searches once the search cache was invalidated;
+        # also runs right at startup (cold Redis after a deploy or restart)
+        self._scheduler.add_job(
+            func=self._search_warm_job,
+            trigger="interval",
+            seconds=app.config.get("SEARCH_WARM_CHECK_SEC", 30),
+            next_run_time=datetime.now(timezone.utc),
+            id="search_warm",
+            replace_existing=True,
+            max_instances=1,
+            name="Warm Search Cache for Popular Queries",
+        )
+
+        # Background job appending queued slow queries to the log, explaining a sample
+        self._scheduler.add_job(
+            func=self._slow_query_explain_job,
+            trigger="interval",
+            seconds=app.config.get("SLOW_QUERY_EXPLAIN_INTERVAL_SEC", 5),
+            id="slow_query_explain",
+            replace_existing=True,
+            max_instances=1,
+            name="Explain and Log Slow Queries",
+        )
+
+        # Background job adding this process's recorded query shapes to Redis
+        # (web workers flush on request teardown)
+        self._scheduler.add_job(
+            func=self._query_shapes_flush_job,
+            trigger="interval",
+            seconds=app.config.get("INDEX_ADVISOR_FLUSH_SEC", 30),
+            id="query_shapes_flush",
+            replace_existing=True,
+            max_instances=1,
+            name="Flush Recorded Query Shapes to Redis",
+        )
+
+        # Background job applying view events to MongoDB (stream view pipeline)
+        if app.config.get("VIEW_PIPELINE", "counters") == "stream":
+            self._scheduler.add_job(
+                func=self._view_events_job,
+                trigger="interval",
+                seconds=app.config.get("VIEW_EVENTS_INTERVAL_SEC", 5),
+                id="view_events",
+                replace_existing=True,
+                max_instances=1,
+                name="Apply View Events from Redis Stream",
+            )
+
+        # Background job inserting queued uploads in batches (write-behind upload mode)
+        if app.config.get("UPLOAD_MODE", "sync") == "async":
+            self._scheduler.add_job(
+                func=self._upload_queue_job,
+                trigger="interval",
+                seconds=app.config.get("UPLOAD_QUEUE_INTERVAL_SEC", 2),
+                id="upload_queue",
+                replace_existing=True,
+                max_instances=1,
+                name="Insert Queued Paper Uploads",
+            )
+
         # Store app context for job execution
         self._app = app
 
@@ -72,6 +203,264 @@ class SchedulerWrapper:
             except Exception as e:
                 logging.error(f"Critical error in view sync job: {str(e)}")
 
+    def _rebuild_suggest_index_job(self) -> None:
+        """
+        Background job that rebuilds the Redis autocomplete index from MongoDB.
+        Picks up view-count changes in title weights and repairs any drift from
+        incremental updates.
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for suggest rebuild job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.suggest import SuggestService
+
+                result = SuggestService.rebuild_index()
+                if result["status"] == "success":
+                    logging.info(f"Suggest index rebuilt: {result['message']}")
+                else:
+                    logging.error(f"Suggest rebuild failed: {result.get('error', 'Unknown error')}")
+
+            except Exception as e:
+                logging.error(f"Critical error in suggest rebuild job: {str(e)}")
+
+    def _impact_scores_job(self) -> None:
+        """
+        Background job that recomputes PageRank impact scores of all papers
+        from the citations collection and writes them back in batches.
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for impact scores job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.impact import ImpactService
+
+                result = ImpactService.compute_impact_scores()
+                if result["status"] == "success":
+                    logging.info(f"Impact scores computed: {result['message']}")
+                elif result["status"] == "partial_success":
+                    logging.warning(
+                        f"Impact scores partially written: {result['message']}. "
+                        f"Errors: {len(result.get('errors', []))}"
+                    )
+                else:
+                    logging.error(f"Impact scores failed: {result.get('error', 'Unknown error')}")
+
+            except Exception as e:
+                logging.error(f"Critical error in impact scores job: {str(e)}")
+
+    def _related_papers_job(self) -> None:
+        """
+        Background job that recomputes co-citation / bibliographic coupling
+        related papers and stores the top-k per paper.
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for related papers job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.related import RelatedService
+
+                result = RelatedService.compute_related_papers()
+                if result["status"] == "success":
+                    logging.info(f"Related papers computed: {result['message']}")
+                else:
+                    logging.error(f"Related papers failed: {result.get('error', 'Unknown error')}")
+
+            except Exception as e:
+                logging.error(f"Critical error in related papers job: {str(e)}")
+
+    def _similar_papers_job(self) -> None:
+        """
+        Background job that refits the TF-IDF model over all papers and stores
+        the top-k content-similar papers per paper.
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for similar papers job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.similarity import SimilarityService
+
+                result = SimilarityService.compute_similar_papers()
+                if result["status"] == "success":
+                    logging.info(f"Similar papers computed: {result['message']}")
+                else:
+                    logging.error(f"Similar papers failed: {result.get('error', 'Unknown error')}")
+
+            except Exception as e:
+                logging.error(f"Critical error in similar papers job: {str(e)}")
+
+    def _similar_embed_job(self) -> None:
+        """
+        Background job that embeds papers queued by uploads with the stored TF-IDF
+        model and links them to their nearest neighbours.
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for similar embed job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.similarity import SimilarityService
+
+                result = SimilarityService.embed_pending()
+                if result["status"] == "success":
+                    if result["embedded"]:
+                        logging.info(f"Uploads embedded: {result['message']}")
+                else:
+                    logging.error(f"Similar embed failed: {result.get('error', 'Unknown error')}")
+
+            except Exception as e:
+                logging.error(f"Critical error in similar embed job: {str(e)}")
+
+    def _dedup_scan_job(self) -> None:
+        """
+        Background job that recomputes MinHash signatures of all papers and stores the
+        near-duplicate clusters, when a scan was requested or none ever finished.
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for dedup scan job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.dedup import DedupService
+
+                result = DedupService.scan_if_needed()
+                if result["status"] == "success":
+                    if result["scanned"]:
+                        logging.info(f"Duplicate scan finished: {result['message']}")
+                else:
+                    logging.error(f"Duplicate scan failed: {result.get('error', 'Unknown error')}")
+
+            except Exception as e:
+                logging.error(f"Critical error in dedup scan job: {str(e)}")
+
+    def _search_warm_job(self) -> None:
+        """
+        Background job that precomputes the search cache entries of the most
+        popular queries when the current search generation was not warmed yet.
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for search warm job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.search_warm import SearchWarmService
+
+                result = SearchWarmService.warm_search_cache()
+                if result["status"] == "success":
+                    if result["warmed"]:
+                        logging.info(f"Search cache warmed: {result['message']}")
+                else:
+                    logging.error(f"Search warming failed: {result.get('error', 'Unknown error')}")
+
+            except Exception as e:
+                logging.error(f"Critical error in search warm job: {str(e)}")
+
+    def _slow_query_explain_job(self) -> None:
+        """
+        Background job that appends queued slow queries to the slow-query log,
+        re-running a sample of each shape with explain("executionStats").
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for slow query explain job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.slow_queries import SlowQueryService
+
+                result = SlowQueryService.process_explain_queue(
+                    self._app.config.get("SLOW_QUERY_EXPLAIN_BATCH", 50)
+                )
+                if result["status"] == "success":
+                    if result["logged"]:
+                        logging.info(f"Slow queries logged: {result['message']}")
+                else:
+                    logging.error(
+                        f"Slow query explain failed: {result.get('error', 'Unknown error')}"
+                    )
+
+            except Exception as e:
+                logging.error(f"Critical error in slow query explain job: {str(e)}")
+
+    def _query_shapes_flush_job(self) -> None:
+        """
+        Background job that adds the query shapes recorded by this process's own jobs
+        to the index advisor's Redis hashes.
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for query shapes flush job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.index_advisor import IndexAdvisorService
+
+                result = IndexAdvisorService.flush_query_shapes()
+                if result["status"] != "success":
+                    logging.error(
+                        f"Query shapes flush failed: {result.get('error', 'Unknown error')}"
+                    )
+
+            except Exception as e:
+                logging.error(f"Critical error in query shapes flush job: {str(e)}")
+
+    def _view_events_job(self) -> None:
+        """
+        Background job that drains the view-event stream as a consumer-group member:
+        events are summed per paper and applied with one bulk_write per batch.
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for view events job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.view_events import ViewEventService
+
+                result = ViewEventService.process_view_events()
+                if result["status"] == "success":
+                    if result["events"]:
+                        logging.info(f"View events applied: {result['message']}")
+                else:
+                    logging.error(f"View events failed: {result.get('error', 'Unknown error')}")
+
+            except Exception as e:
+                logging.error(f"Critical error in view events job: {str(e)}")
+
+    def _upload_queue_job(self) -> None:
+        """
+        Background job that drains the upload stream as a consumer-group member:
+        batches of queued papers are inserted with insert_many and their tickets updated.
+        """
+        if not hasattr(self, "_app"):
+            logging.error("No app context available for upload queue job")
+            return
+
+        with self._app.app_context():
+            try:
+                from .services.upload_queue import UploadQueueService
+
+                result = UploadQueueService.process_upload_queue()
+                if result["status"] == "success":
+                    if result["created"] or result["failed"]:
+                        logging.info(f"Upload queue processed: {result['message']}")
+                else:
+                    logging.error(f"Upload queue failed: {result.get('error', 'Unknown error')}")
+
+            except Exception as e:
+                logging.error(f"Critical error in upload queue job: {str(e)}")
+
     def shutdown(self) -> None:
         """Gracefully shutdown the scheduler."""
         if self._scheduler and self._scheduler.running:
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from bson import ObjectId
+from flask import Flask, current_app
+from pymongo.database import Database
+
+
+def load_citation_edges(db: Database) -> Tuple[List[ObjectId], np.ndarray, np.ndarray]:
+    """
+    Load every paper _id and citation edge as dense int arrays.
+    Returns (paper_ids, src, dst) where edge i is paper_ids[src[i]] citing
+    paper_ids[dst[i]]; edges to unknown papers are dropped.
+    """
+    paper_ids = [doc["_id"] for doc in db.papers.find({}, {"_id": 1}).batch_size(10000)]
+    index = {oid: i for i, oid in enumerate(paper_ids)}
+
+    src, dst = [], []
+    cursor = db.citations.find({}, {"_id": 0, "paper_id": 1, "cited_paper_id": 1})
+    for edge in cursor.batch_size(10000):
+        citing = index.get(edge["paper_id"])
+        cited = index.get(edge["cited_paper_id"])
+        if citing is not None and cited is not None:
+            src.append(citing)
+            dst.append(cited)
+
+    return paper_ids, np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+
+
+def build_csr(src: np.ndarray, dst: np.ndarray, num_nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Build compressed sparse row (indptr, indices) arrays for edges src -> dst."""
+    order = np.argsort(src, kind="stable")
+    indices = dst[order].astype(np.int32)
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
+    return indptr, indices
+
+
+def gather_neighbors(
+    indptr: np.ndarray, indices: np.ndarray, frontier: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collect the CSR neighbors of every node in `frontier` without a Python loop.
+    Returns (neighbors, parents) where parents[i] is the frontier node neighbors[i] came from.
+    """
+    frontier = frontier[frontier < len(indptr) - 1]  # nodes added after the last build
+    starts = indptr[frontier]
+    lengths = indptr[frontier + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty
+
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    neighbors = indices[offsets + np.arange(total)]
+    parents = np.repeat(frontier, lengths).astype(np.int32)
+    return neighbors, parents
+
+
+class CitationGraph:
+    """
+    In-memory citation graph held as forward (paper -> cited) and reverse
+    (paper -> citing) CSR adjacency over dense int node IDs.
+
+    Edges appended after the last build are kept in small per-node delta lists and
+    merged into the CSR arrays once there are more than CITATION_GRAPH_COMPACT_EDGES
+    of them. The whole graph is reloaded from MongoDB every
+    CITATION_GRAPH_REFRESH_SEC seconds to pick up edges written by other workers;
+    the reload runs in a background thread while requests keep reading the old graph.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        # Held by the one thread (re)loading the graph, so loads are never run concurrently
+        self._load_lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._id_to_idx: Dict[str, int] = {}
+        self._idx_to_id: List[str] = []
+        self._src = np.empty(0, dtype=np.int32)
+        self._dst = np.empty(0, dtype=np.int32)
+        self._forward = (np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32))
+        self._reverse = (np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32))
+        self._delta_out: Dict[int, List[int]] = {}
+        self._delta_in: Dict[int, List[int]] = {}
+        self._delta_edges = 0
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        # A forked worker may inherit the lock held, or a half-applied update, from a
+        # scheduler thread of the parent: start over with a fresh lock and reload
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._loaded_at = None
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._idx_to_id)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self._src) + self._delta_edges
+
+    def _node(self, paper_id: str) -> int:
+        idx = self._id_to_idx.get(paper_id)
+        if idx is None:
+            idx = len(self._idx_to_id)
+            self._id_to_idx[paper_id] = idx
+            self._idx_to_id.append(paper_id)
+        return idx
+
+    def _rebuild(self) -> None:
+        n = self.num_nodes
+        self._forward = build_csr(self._src, self._dst, n)
+        self._reverse = build_csr(self._dst, self._src, n)
+        self._delta_out, self._delta_in, self._delta_edges = {}, {}, 0
+
+    def load(self, db: Database) -> None:
+        """Load every edge of the citations collection and rebuild the CSR arrays."""
+        id_to_idx: Dict[str, int] = {}
+        idx_to_id: List[str] = []
+        src: List[int] = []
+        dst: List[int] = []
+
+        def node(oid: ObjectId) -> int:
+            key = str(oid)
+            idx = id_to_idx.get(key)
+            if idx is None:
+                idx = id_to_idx[key] = len(idx_to_id)
+                idx_to_id.append(key)
+            return idx
+
+        cursor = db.citations.find({}, {"_id": 0, "paper_id": 1, "cited_paper_id": 1})
+        for edge in cursor.batch_size(10000):
+            src.append(node(edge["paper_id"]))
+            dst.append(node(edge["cited_paper_id"]))
+
+        with self._lock:
+            self._id_to_idx, self._idx_to_id = id_to_idx, idx_to_id
+            self._src = np.asarray(src, dtype=np.int32)
+            self._dst = np.asarray(dst, dtype=np.int32)
+            self._rebuild()
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self) -> None:
+        """
+        Load the graph on first use, and reload it once it is older than the refresh
+        interval. Only the first load blocks (concurrent callers wait for it instead of
+        loading too); a stale graph is refreshed by one background thread and served
+        as is until the new one is swapped in.
+        """
+        if self._loaded_at is None:
+            with self._load_lock:
+                if self._loaded_at is None:
+                    self.load(current_app.mongo_db)  # type: ignore[attr-defined]
+            return
+
+        refresh = current_app.config.get("CITATION_GRAPH_REFRESH_SEC", 600)
+        if time.monotonic() - self._loaded_at > refresh and self._load_lock.acquire(blocking=False):
+            app = current_app._get_current_object()  # type: ignore[attr-defined]
+            try:
+                threading.Thread(
+                    target=self._reload, args=(app,), name="citation-graph-reload", daemon=True
+                ).start()
+            except Exception:
+                self._load_lock.release()
+                raise
+
+    def _reload(self, app: Flask) -> None:
+        """Background refresh started by ensure_loaded; the next request retries a failed one."""
+        try:
+            with app.app_context():
+                self.load(app.mongo_db)  # type: ignore[attr-defined]
+        except Exception:
+            pass
+        finally:
+            self._load_lock.release()
+
+    def add_edges(self, paper_id: str, cited_paper_ids: List[str]) -> None:
+        """Append citation edges of a newly uploaded paper (no-op until the graph is loaded)."""
+        if self._loaded_at is None:
+            return
+
+        with self._lock:
+            src = self._node(paper_id)
+            for cited_id in cited_paper_ids:
+                dst = self._node(cited_id)
+                self._delta_out.setdefault(src, []).append(dst)
+                self._delta_in.setdefault(dst, []).append(src)
+                self._delta_edges += 1
+
+            if self._delta_edges > current_app.config.get("CITATION_GRAPH_COMPACT_EDGES", 1024):
+                new_src = [s for s, targets in self._delta_out.items() for _ in targets]
+                new_dst = [d for targets in self._delta_out.values() for d in targets]
+                self._src = np.concatenate([self._src, np.asarray(new_src, dtype=np.int32)])
+                self._dst = np.concatenate([self._dst, np.asarray(new_dst, dtype=np.int32)])
+                self._rebuild()
+
+    def _expand(self, frontier: np.ndarray, direction: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Neighbors (and their parents) of a frontier following `direction`: out, in or both."""
+        parts = []
+        if direction in ("out", "both"):
+            parts.append((self._forward, self._delta_out))
+        if direction in ("in", "both"):
+            parts.append((self._reverse, self._delta_in))
+
+        neighbors, parents = [], []
+        for (indptr, indices), delta in parts:
+            nbrs, pars = gather_neighbors(indptr, indices, frontier)
+            neighbors.append(nbrs)
+            parents.append(pars)
+            for node in frontier.tolist():
+                extra = delta.get(node)
+                if extra:
+                    neighbors.append(np.asarray(extra, dtype=np.int32))
+                    parents.append(np.full(len(extra), node, dtype=np.int32))
+
+        return np.concatenate(neighbors), np.concatenate(parents)
+
+    def k_hop(self, paper_id: str, k: int, direction: str = "out") -> List[Tuple[str, int]]:
+        """
+        Papers within `k` citation hops of `paper_id`, as (paper_id, distance) pairs
+        ordered by distance. direction: "out" (cited by it), "in" (citing it) or "both".
+        """
+        with self._lock:
+            source = self._id_to_idx.get(paper_id)
+            if source is None:
+                return []
+
+            visited = np.zeros(self.num_nodes, dtype=bool)
+            visited[source] = True
+            frontier = np.asarray([source], dtype=np.int32)
+            result: List[Tuple[str, int]] = []
+
+            for depth in range(1, k + 1):
+                neighbors, _ = self._expand(frontier, direction)
+                neighbors = np.unique(neighbors)
+                frontier = neighbors[~visited[neighbors]]
+                if len(frontier) == 0:
+                    break
+                visited[frontier] = True
+                result.extend((self._idx_to_id[i], depth) for i in frontier.tolist())
+
+            return result
+
+    def shortest_path(
+        self, source_id: str, target_id: str, direction: str = "out", max_depth: int = 6
+    ) -> Optional[List[str]]:
+        """Shortest citation path from source to target as a list of paper IDs, or None."""
+        with self._lock:
+            source = self._id_to_idx.get(source_id)
+            target = self._id_to_idx.get(target_id)
+            if source is None or target is None:
+                return None
+            if source == target:
+                return [source_id]
+
+            parent = np.full(self.num_nodes, -1, dtype=np.int32)
+            parent[source] = source
+            frontier = np.asarray([source], dtype=np.int32)
+
+            for _ in range(max_depth):
+                neighbors, parents = self._expand(frontier, direction)
+                neighbors, first = np.unique(neighbors, return_index=True)
+                fresh = parent[neighbors] == -1
+                frontier = neighbors[fresh]
+                if len(frontier) == 0:
+                    return None
+                parent[frontier] = parents[first[fresh]]
+
+                if parent[target] != -1:
+                    path = [target]
+                    while path[-1] != source:
+                        path.append(int(parent[path[-1]]))
+                    return [self._idx_to_id[i] for i in reversed(path)]
+
+            return None
+
+
+citation_graph = CitationGraph()
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import hashlib
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import redis
+from bson import ObjectId
+from flask import current_app
+from pymongo import ReplaceOne
+from pymongo.database import Database
+
+from .suggest import SuggestService
+
+# Universal hashing h(x) = (a * x + b) mod p over 32-bit shingle hashes, p the smallest
+# prime above 2**32. a and b stay below 2**31 so a * x + b fits in uint64; the seed is
+# fixed so every worker (and every stored signature) uses the same permutations.
+HASH_PRIME = np.uint64(4294967311)
+MAX_PERMUTATIONS = 512
+_rng = np.random.default_rng(20240101)
+_PERM_A = _rng.integers(1, 2**31, size=MAX_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 2**31, size=MAX_PERMUTATIONS, dtype=np.uint64)
+
+# Set by POST /admin/duplicates/scan; the dedup_scan job runs the scan and clears it
+SCAN_REQUESTED_KEY = "dedup:scan_requested"
+
+
+def shingles(paper: Dict[str, Any], size: int = 3) -> List[str]:
+    """Word n-grams of a paper's normalized title and abstract."""
+    words = SuggestService.normalize(
+        f"{paper.get('title', '')} {paper.get('abstract', '')}"
+    ).split()
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i : i + size]) for i in range(len(words) - size + 1)]
+
+
+def minhash_signature(paper: Dict[str, Any], num_perm: int) -> np.ndarray:
+    """MinHash signature (num_perm uint64 values) of a paper's shingle set."""
+    hashes = np.fromiter({zlib.crc32(s.encode("utf-8")) for s in shingles(paper)}, dtype=np.uint64)
+    if len(hashes) == 0:
+        return np.full(num_perm, HASH_PRIME, dtype=np.uint64)
+
+    a, b = _PERM_A[:num_perm, None], _PERM_B[:num_perm, None]
+    return ((a * hashes[None, :] + b) % HASH_PRIME).min(axis=1)
+
+
+def lsh_bands(signature: np.ndarray, bands: int) -> List[str]:
+    """Bucket keys of a signature: one short hash per band of len(signature) / bands rows."""
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        chunk = signature[band * rows : (band + 1) * rows].tobytes()
+        keys.append(f"{band}:{hashlib.blake2b(chunk, digest_size=8).hexdigest()}")
+    return keys
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Jaccard similarity estimate: the fraction of equal MinHash values."""
+    return float(np.mean(sig_a == sig_b))
+
+
+class DedupService:
+    """
+    Near-duplicate paper detection with MinHash signatures and an LSH band index.
+
+    Signatures are stored in paper_signatures with a multikey index on their band
+    keys, so candidates of a new upload are found with one indexed $in query instead
+    of comparing against every abstract.
+    """
+
+    @staticmethod
+    def _params() -> Dict[str, Any]:
+        return {
+            "num_perm": current_app.config.get("DEDUP_NUM_PERM", 128),
+            "bands": current_app.config.get("DEDUP_BANDS", 32),
+            "threshold": current_app.config.get("DEDUP_THRESHOLD", 0.8),
+        }
+
+    @staticmethod
+    def find_duplicates(paper: Dict[str, Any], limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Existing papers whose estimated title+abstract similarity with `paper`
+        is at least DEDUP_THRESHOLD, best match first. Lookup errors never block
+        an upload, they just report no duplicates.
+        """
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        params = DedupService._params()
+
+        try:
+            signature = minhash_signature(paper, params["num_perm"])
+            candidates = db.paper_signatures.find(
+                {"bands": {"$in": lsh_bands(signature, params["bands"])}}, {"minhash": 1}
+            ).limit(1000)
+
+            scores = {}
+            for doc in candidates:
+                minhash = np.asarray(doc["minhash"], dtype=np.uint64)
+                similarity = estimate_similarity(signature, minhash)
+                if similarity >= params["threshold"]:
+                    scores[doc["_id"]] = similarity
+
+            if not scores:
+                return []
+
+            titles = {
+                doc["_id"]: doc["title"]
+                for doc in db.papers.find({"_id": {"$in": list(scores)}}, {"title": 1})
+            }
+        except Exception:
+            return []
+
+        duplicates = [
+            {"paper_id": str(oid), "title": titles[oid], "similarity": round(score, 3)}
+            for oid, score in scores.items()
+            if oid in titles
+        ]
+        duplicates.sort(key=lambda d: -d["similarity"])
+        return duplicates[:limit]
+
+    @staticmethod
+    def index_paper(paper: Dict[str, Any]) -> None:
+        """Store the MinHash signature and band keys of a newly created paper."""
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        params = DedupService._params()
+
+        try:
+            signature = minhash_signature(paper, params["num_perm"])
+            db.paper_signatures.replace_one(
+                {"_id": paper["_id"]},
+                {
+                    "minhash": signature.tolist(),
+                    "bands": lsh_bands(signature, params["bands"]),
+                    "computed_at": datetime.utcnow(),
+                },
+                upsert=True,
+            )
+        except Exception:
+            pass
+
+    @staticmethod
+    def request_scan() -> Dict[str, Any]:
+        """Ask the dedup_scan job to rescan the corpus on its next run."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            redis_client.set(SCAN_REQUESTED_KEY, 1)
+            return {
+                "status": "queued",
+                "message": "Duplicate scan requested, results at GET /admin/duplicates",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e),
+                "message": "Failed to request a duplicate scan",
+            }
+
+    @staticmethod
+    def scan_if_needed() -> Dict[str, Any]:
+        """
+        Run scan_duplicates when a scan was requested, or once when no scan ever
+        finished (to backfill signatures of papers uploaded before detection existed),
+        and store its result for GET /admin/duplicates.
+        """
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            # Cleared before scanning, so a request arriving during the scan runs another
+            requested = bool(redis_client.delete(SCAN_REQUESTED_KEY))
+            backfill = (
+                db.duplicate_scans.count_documents({"_id": "latest"}, limit=1) == 0
+                and db.papers.find_one({}, {"_id": 1}) is not None
+            )
+            if not (requested or backfill):
+                return {"status": "success", "scanned": False, "message": "No scan needed"}
+
+            result = DedupService.scan_duplicates()
+            if result["status"] == "success":
+                db.duplicate_scans.replace_one(
+                    {"_id": "latest"},
+                    {**result, "finished_at": datetime.utcnow()},
+                    upsert=True,
+                )
+            elif requested:
+                redis_client.set(SCAN_REQUESTED_KEY, 1)
+            return {**result, "scanned": True}
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "scanned": False,
+                "error": str(e),
+                "message": "Failed to check for a pending duplicate scan",
+            }
+
+    @staticmethod
+    def get_last_scan() -> Optional[Dict[str, Any]]:
+        """Result of the last successful scan, or None if none finished yet."""
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        scan = db.duplicate_scans.find_one({"_id": "latest"}, {"_id": 0})
+        if scan:
+            scan["finished_at"] = scan["finished_at"].isoformat()
+        return scan
+
+    @staticmethod
+    def scan_duplicates(batch_size: int = 1000, max_clusters: int = 100) -> Dict[str, Any]:
+        """
+        Recompute signatures of the whole corpus and group near-duplicates into clusters.
+        Runs in the dedup_scan job, see scan_if_needed.
+
+        Process:
+        1. Compute every paper's signature and upsert it into paper_signatures
+           (this also backfills papers uploaded before detection existed)
+        2. Bucket papers by band key in memory
+        3. Compare each bucket member with the bucket's first paper only and union
+           pairs above DEDUP_THRESHOLD, so large buckets stay linear
+        4. Return clusters of two or more papers, largest first
+
+        Returns dict with scan statistics and clusters.
+        """
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        params = DedupService._params()
+
+        try:
+            run_started = datetime.utcnow()
+            paper_ids: List[ObjectId] = []
+            titles: Dict[ObjectId, str] = {}
+            signatures: List[np.ndarray] = []
+            buckets: Dict[str, List[int]] = {}
+
+            ops = []
+            cursor = db.papers.find({}, {"title": 1, "abstract": 1}).batch_size(batch_size)
+            for paper in cursor:
+                signature = minhash_signature(paper, params["num_perm"])
+                bands = lsh_bands(signature, params["bands"])
+                idx = len(paper_ids)
+                paper_ids.append(paper["_id"])
+                titles[paper["_id"]] = paper["title"]
+                signatures.append(signature)
+                for band in bands:
+                    buckets.setdefault(band, []).append(idx)
+
+                ops.append(
+                    ReplaceOne(
+                        {"_id": paper["_id"]},
+                        {"minhash": signature.tolist(), "bands": bands, "computed_at": run_started},
+                        upsert=True,
+                    )
+                )
+                if len(ops) >= batch_size:
+                    db.paper_signatures.bulk_write(ops, ordered=False)
+                    ops = []
+            if ops:
+                db.paper_signatures.bulk_write(ops, ordered=False)
+
+            # Signatures of deleted papers
+            db.paper_signatures.delete_many({"computed_at": {"$lt": run_started}})
+
+            parent = list(range(len(paper_ids)))
+
+            def find(i: int) -> int:
+                while parent[i] != i:
+                    parent[i] = parent[parent[i]]
+                    i = parent[i]
+                return i
+
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                first = members[0]
+                for other in members[1:]:
+                    if find(first) == find(other):
+                        continue
+                    similarity = estimate_similarity(signatures[first], signatures[other])
+                    if similarity >= params["threshold"]:
+                        parent[find(other)] = find(first)
+
+            groups: Dict[int, List[int]] = {}
+            for i in range(len(paper_ids)):
+                groups.setdefault(find(i), []).append(i)
+
+            clusters = [
+                {
+                    "papers": [
+                        {"paper_id": str(paper_ids[i]), "title": titles[paper_ids[i]]}
+                        for i in members
+                    ],
+                    "size": len(members),
+                }
+                for members in groups.values()
+                if len(members) > 1
+            ]
+            clusters.sort(key=lambda c: -c["size"])
+
+            return {
+                "status": "success",
+                "papers_scanned": len(paper_ids),
+                "clusters_found": len(clusters),
+                "clusters": clusters[:max_clusters],
+                "message": f"Found {len(clusters)} duplicate clusters in {len(paper_ids)} papers",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "papers_scanned": 0,
+                "error": str(e),
+                "message": "Failed to scan for duplicate papers",
+            }
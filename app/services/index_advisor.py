@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import redis
+from flask import Flask, current_app
+from pymongo import monitoring
+from pymongo.database import Database
+
+# Collections whose query shapes are recorded and advised on
+ADVISED_COLLECTIONS = ("papers", "users", "citations")
+
+# Redis hashes of shape JSON -> executions / total microseconds, summed over all workers
+SHAPE_COUNT_KEY = "index_advisor:count"
+SHAPE_TIME_KEY = "index_advisor:time_us"
+
+# Distinct shapes buffered per process between flushes
+MAX_PENDING_SHAPES = 1000
+
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$exists", "$regex"}
+
+
+def filter_fields(query: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    Split the top-level fields of a filter into equality and range predicates.
+    $and branches are flattened; $or, $nor, $expr and $text filters cannot be served
+    by one ordinary index and raise ValueError.
+    """
+    equality, ranges = set(), set()
+    for field, value in query.items():
+        if field == "$and":
+            for branch in value:
+                eq, rng = filter_fields(branch)
+                equality.update(eq)
+                ranges.update(rng)
+        elif field.startswith("$"):
+            raise ValueError(field)
+        elif isinstance(value, dict) and any(op in RANGE_OPERATORS for op in value):
+            ranges.add(field)
+        else:
+            equality.add(field)
+    return sorted(equality), sorted(ranges - equality)
+
+
+def command_shape(command_name: str, command: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Normalized {collection, eq, range, sort} shape of a read or write command, or None
+    for commands and filters that no regular index could serve.
+    """
+    collection = command.get(command_name)
+    if collection not in ADVISED_COLLECTIONS:
+        return None
+
+    query: Dict[str, Any] = {}
+    sort: Dict[str, Any] = {}
+    if command_name == "find":
+        query, sort = command.get("filter", {}), command.get("sort", {})
+    elif command_name == "count":
+        query = command.get("query", {})
+    elif command_name == "findAndModify":
+        query, sort = command.get("query", {}), command.get("sort", {})
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes", [])
+        query = statements[0].get("q", {}) if statements else {}
+    elif command_name == "aggregate":
+        pipeline = command.get("pipeline", [])
+        # Only a leading $match (optionally followed by $sort) can use an index
+        if pipeline and "$match" in pipeline[0]:
+            query = pipeline[0]["$match"]
+            if len(pipeline) > 1 and "$sort" in pipeline[1]:
+                sort = pipeline[1]["$sort"]
+    else:
+        return None
+
+    try:
+        equality, ranges = filter_fields(query)
+    except (ValueError, TypeError, AttributeError):
+        return None
+    if "_id" in equality or not (equality or ranges or sort):
+        return None  # served by the _id index, or a full scan no index would help
+
+    if any(isinstance(direction, dict) for direction in sort.values()):
+        return None  # {"$meta": "textScore"} sorts
+    sort_keys = [[field, 1 if direction == 1 else -1] for field, direction in sort.items()]
+    return {"collection": collection, "eq": equality, "range": ranges, "sort": sort_keys}
+
+
+class QueryShapeRecorder(monitoring.CommandListener):
+    """
+    Command listener counting executions and time per normalized query shape.
+    Shapes are buffered per process and added to Redis hashes by flush(), so the
+    advice covers every worker.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[Any, int], str] = {}
+        self._pending: Dict[str, List[int]] = {}
+        self._flushed_at = time.monotonic()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        # Shapes buffered before a fork are flushed by the parent
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._pending = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        shape = command_shape(event.command_name, event.command)
+        if shape is not None:
+            with self._lock:
+                self._in_flight[(event.connection_id, event.request_id)] = json.dumps(shape)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event)
+
+    def _finish(self, event: Any) -> None:
+        with self._lock:
+            shape = self._in_flight.pop((event.connection_id, event.request_id), None)
+            if shape is None:
+                return
+            if shape not in self._pending and len(self._pending) >= MAX_PENDING_SHAPES:
+                return
+            stats = self._pending.setdefault(shape, [0, 0])
+            stats[0] += 1
+            stats[1] += event.duration_micros
+
+    def flush(self, redis_client: redis.Redis, min_interval_sec: float = 0) -> int:
+        """
+        Add buffered shape statistics to Redis, at most every `min_interval_sec`.
+        Returns the number of shapes flushed.
+        """
+        if time.monotonic() - self._flushed_at < min_interval_sec:
+            return 0
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return 0
+
+        pipe = redis_client.pipeline(transaction=False)
+        for shape, (count, duration_us) in pending.items():
+            pipe.hincrby(SHAPE_COUNT_KEY, shape, count)
+            pipe.hincrby(SHAPE_TIME_KEY, shape, duration_us)
+        pipe.execute()
+        return len(pending)
+
+
+query_shapes = QueryShapeRecorder()
+
+
+def index_serves(index_keys: List[Tuple[str, Any]], shape: Dict[str, Any]) -> str:
+    """
+    How well an index serves a shape: "full" when its leading keys are the equality
+    fields followed by the sort (in either direction) or, without a sort, a range
+    field; "partial" when it only covers equality or range fields as a prefix and the
+    rest is filtered or sorted in memory; "none" otherwise.
+    """
+    keys = [field for field, _ in index_keys]
+    directions = [direction for _, direction in index_keys]
+    equality, sort = shape["eq"], shape["sort"]
+
+    n_eq = len(equality)
+    if set(keys[:n_eq]) != set(equality):
+        return "partial" if keys[0] in equality or keys[0] in shape["range"] else "none"
+    if not sort:
+        if not shape["range"] or (len(keys) > n_eq and keys[n_eq] in shape["range"]):
+            return "full"
+        return "partial" if equality else "none"
+
+    sort_fields = [field for field, _ in sort]
+    if keys[n_eq : n_eq + len(sort)] != sort_fields:
+        return "partial" if equality else "none"
+    index_dirs = directions[n_eq : n_eq + len(sort)]
+    wanted = [direction for _, direction in sort]
+    if index_dirs == wanted or index_dirs == [-d for d in wanted]:
+        return "full"
+    return "partial"
+
+
+def suggested_index(shape: Dict[str, Any]) -> List[List[Any]]:
+    """Equality, sort, range (ESR) key order for a shape."""
+    keys: List[List[Any]] = [[field, 1] for field in shape["eq"]]
+    keys += [list(item) for item in shape["sort"]]
+    used = {field for field, _ in keys}
+    keys += [[field, 1] for field in shape["range"] if field not in used]
+    return keys
+
+
+class IndexAdvisorService:
+    """Service comparing recorded query shapes with existing indexes and their usage."""
+
+    @staticmethod
+    def _index_usage(db: Database, collection: str) -> Dict[str, Optional[int]]:
+        """Operations per index since server start from $indexStats (None if unavailable)."""
+        try:
+            return {
+                stats["name"]: stats["accesses"]["ops"]
+                for stats in db[collection].aggregate([{"$indexStats": {}}])
+            }
+        except Exception:
+            return {}
+
+    @staticmethod
+    def flush_query_shapes() -> Dict[str, Any]:
+        """
+        Add this process's buffered query shapes to Redis. Request teardown flushes the
+        web workers; this covers processes without requests, like the scheduler.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            flushed = query_shapes.flush(redis_client)
+            return {
+                "status": "success",
+                "flushed": flushed,
+                "message": f"Flushed {flushed} query shapes",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e),
+                "message": "Failed to flush query shapes",
+            }
+
+    @staticmethod
+    def get_index_advice(limit: int = 20) -> Dict[str, Any]:
+        """
+        Report indexes to add and indexes that look unused.
+
+        Process:
+        1. Flush this worker's buffered shapes and load the shapes of all workers
+        2. Match every shape against the indexes of its collection
+        3. Group shapes without full support by suggested ESR index; the estimated
+           benefit is the time spent in those shapes
+        4. List non-unique indexes that $indexStats reports with zero operations and
+           no recorded shape uses
+
+        Returns dict with missing and unused indexes.
+        """
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            query_shapes.flush(redis_client)
+            counts: Dict[str, str] = redis_client.hgetall(SHAPE_COUNT_KEY)  # type: ignore
+            times: Dict[str, str] = redis_client.hgetall(SHAPE_TIME_KEY)  # type: ignore
+
+            indexes = {
+                collection: db[collection].index_information() for collection in ADVISED_COLLECTIONS
+            }
+            used_indexes = set()
+            missing: Dict[str, Dict[str, Any]] = {}
+
+            for shape_json, count in counts.items():
+                shape = json.loads(shape_json)
+                collection = shape["collection"]
+                total_ms = int(times.get(shape_json, 0)) / 1000
+
+                support = "none"
+                for name, info in indexes[collection].items():
+                    if name == "_id_" or any(isinstance(d, str) for _, d in info["key"]):
+                        continue  # text, hashed and geo indexes
+                    serves = index_serves(info["key"], shape)
+                    if serves != "none":
+                        used_indexes.add((collection, name))
+                    if serves == "full" or (serves == "partial" and support == "none"):
+                        support = serves
+                if support == "full":
+                    continue
+
+                keys = suggested_index(shape)
+                advice_key = json.dumps([collection, keys])
+                advice = missing.setdefault(
+                    advice_key,
+                    {
+                        "collection": collection,
+                        "keys": keys,
+                        "current_support": support,
+                        "shapes": [],
+                        "executions": 0,
+                        "estimated_benefit_ms": 0.0,
+                    },
+                )
+                advice["shapes"].append(
+                    {"eq": shape["eq"], "range": shape["range"], "sort": shape["sort"]}
+                )
+                advice["executions"] += int(count)
+                advice["estimated_benefit_ms"] += total_ms
+
+            unused = []
+            for collection in ADVISED_COLLECTIONS:
+                usage = IndexAdvisorService._index_usage(db, collection)
+                for name, info in indexes[collection].items():
+                    if name == "_id_" or info.get("unique"):
+                        continue  # unique indexes enforce constraints even when unread
+                    ops = usage.get(name)
+                    if ops == 0 and (collection, name) not in used_indexes:
+                        unused.append({"collection": collection, "name": name, "keys": info["key"]})
+
+            missing_list = sorted(missing.values(), key=lambda a: -a["estimated_benefit_ms"])
+            for advice in missing_list:
+                advice["estimated_benefit_ms"] = round(advice["estimated_benefit_ms"], 1)
+
+            return {
+                "status": "success",
+                "shapes_recorded": len(counts),
+                "missing_indexes": missing_list[:limit],
+                "unused_indexes": unused,
+                "message": f"{len(missing_list)} missing and {len(unused)} unused indexes",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e),
+                "message": "Failed to compute index advice",
+            }
+
+
+def init_app(app: Flask) -> None:
+    """Flush recorded query shapes to Redis after requests, at most every few seconds."""
+
+    @app.teardown_request
+    def flush_query_shapes(exc=None):
+        try:
+            query_shapes.flush(
+                current_app.redis,  # type: ignore[attr-defined]
+                current_app.config.get("INDEX_ADVISOR_FLUSH_SEC", 30),
+            )
+        except Exception:
+            pass
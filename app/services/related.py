@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from flask import current_app
+from pymongo import ReplaceOne
+from pymongo.database import Database
+
+from .citation_graph import load_citation_edges
+
+
+def top_k_per_row(matrix: sp.csr_matrix, k: int) -> List[List[Tuple[int, float]]]:
+    """Return the k largest (column, value) entries of every row of a CSR matrix."""
+    rows = []
+    indptr = np.asarray(matrix.indptr)
+    for i in range(len(indptr) - 1):
+        start, end = indptr[i], indptr[i + 1]
+        cols = np.asarray(matrix.indices[start:end])
+        vals = np.asarray(matrix.data[start:end], dtype=np.float64)
+        if len(vals) > k:
+            keep = np.argpartition(-vals, k - 1)[:k]
+            cols, vals = cols[keep], vals[keep]
+        order = np.lexsort((cols, -vals))  # highest score first, ties by column
+        rows.append([(int(cols[j]), float(vals[j])) for j in order])
+    return rows
+
+
+class RelatedService:
+    """Service precomputing citation-based related papers (co-citation + bibliographic coupling)."""
+
+    @staticmethod
+    def compute_related_papers(block_size: int = 2000) -> Dict[str, Any]:
+        """
+        Precompute the top-k related papers of every paper into related_papers.
+
+        With A the citing x cited adjacency matrix:
+        - co-citation   A.T @ A: how often two papers are cited together
+        - coupling      A @ A.T: how many references two papers share
+        The weighted sum is computed in row blocks of `block_size` papers to bound
+        memory, and only the top RELATED_PAPERS_TOP_K entries per paper are kept.
+        Documents from previous runs that were not rewritten are deleted.
+
+        Returns dict with job statistics.
+        """
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        top_k = current_app.config.get("RELATED_PAPERS_TOP_K", 10)
+        coupling_weight = current_app.config.get("RELATED_COUPLING_WEIGHT", 1.0)
+
+        try:
+            run_started = datetime.utcnow()
+            paper_ids, src, dst = load_citation_edges(db)
+            n = len(paper_ids)
+            if n == 0 or len(src) == 0:
+                return {
+                    "status": "success",
+                    "papers_with_related": 0,
+                    "message": "No citations to compute related papers from",
+                }
+
+            adjacency = sp.csr_matrix(
+                (np.ones(len(src), dtype=np.float64), (src, dst)), shape=(n, n)
+            )
+            adjacency.data[:] = 1.0  # repeated edges count once
+            adjacency_t = adjacency.T.tocsr()
+
+            titles = {
+                doc["_id"]: doc["title"]
+                for doc in db.papers.find({}, {"title": 1}).batch_size(10000)
+            }
+
+            written = 0
+            for start in range(0, n, block_size):
+                end = min(start + block_size, n)
+                cocitation = adjacency_t[start:end] @ adjacency
+                coupling = adjacency[start:end] @ adjacency_t
+                scores = (cocitation + coupling_weight * coupling).tocoo()
+                keep = scores.row + start != scores.col  # a paper is not related to itself
+                scores = sp.csr_matrix(
+                    (scores.data[keep], (scores.row[keep], scores.col[keep])), shape=scores.shape
+                )
+
+                ops = []
+                for offset, related in enumerate(top_k_per_row(scores, top_k)):
+                    if not related:
+                        continue
+                    paper_id = paper_ids[start + offset]
+                    ops.append(
+                        ReplaceOne(
+                            {"_id": paper_id},
+                            {
+                                "related": [
+                                    {
+                                        "paper_id": paper_ids[col],
+                                        "title": titles.get(paper_ids[col], ""),
+                                        "score": round(score, 4),
+                                    }
+                                    for col, score in related
+                                ],
+                                "computed_at": run_started,
+                            },
+                            upsert=True,
+                        )
+                    )
+
+                if ops:
+                    db.related_papers.bulk_write(ops, ordered=False)
+                    written += len(ops)
+
+            # Papers that lost all their related papers since the last run
+            db.related_papers.delete_many({"computed_at": {"$lt": run_started}})
+
+            return {
+                "status": "success",
+                "papers_with_related": written,
+                "message": f"Computed related papers for {written} of {n} papers",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "papers_with_related": 0,
+                "error": str(e),
+                "message": "Failed to compute related papers",
+            }
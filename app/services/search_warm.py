@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import time
+from itertools import product
+from typing import Any, Dict
+
+import redis
+from flask import current_app
+
+from ..models.paper import Paper
+from ..utils.cache import SEARCH_WARMED_GENERATION_KEY, CacheService
+from ..utils.paper_validation import SEARCH_ORDERS, SEARCH_SORT_FIELDS
+from ..utils.rate_limit import cluster_mongo_latency_ms
+
+# Held while a worker warms, so several workers do not warm the same generation
+SEARCH_WARM_LOCK_KEY = "search_warm:lock"
+
+
+class SearchWarmService:
+    """Service precomputing the search cache entries of the most popular queries."""
+
+    @staticmethod
+    def warm_search_cache(force: bool = False) -> Dict[str, Any]:
+        """
+        Warm the search cache for the current search generation.
+
+        Process:
+        1. Skip if this generation was already warmed (unless forced) or another
+           worker holds the warm lock
+        2. Take the SEARCH_WARM_TOP_N most requested canonical searches
+        3. Run every sort/order variant that is not cached yet, at most
+           SEARCH_WARM_QPS MongoDB queries per second
+        4. Stop early when the cache is invalidated again (the next run warms the
+           new generation) or when the MongoDB latency reported by the serving
+           workers exceeds LOAD_SHED_MONGO_LATENCY_MS
+
+        Returns dict with warming statistics.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        top_n = current_app.config.get("SEARCH_WARM_TOP_N", 50)
+        interval = 1.0 / current_app.config.get("SEARCH_WARM_QPS", 5.0)
+        max_latency = current_app.config.get("LOAD_SHED_MONGO_LATENCY_MS", 500)
+
+        try:
+            generation = CacheService.get_search_generation()
+            if not force and redis_client.get(SEARCH_WARMED_GENERATION_KEY) == generation:
+                return {
+                    "status": "success",
+                    "warmed": 0,
+                    "message": "Search cache already warm for this generation",
+                }
+            lock_ttl = current_app.config.get("SEARCH_WARM_LOCK_SEC", 300)
+            lock_token = CacheService.acquire_lock(SEARCH_WARM_LOCK_KEY, lock_ttl)
+            if lock_token is None:
+                return {
+                    "status": "success",
+                    "warmed": 0,
+                    "message": "Search cache is being warmed by another worker",
+                }
+
+            warmed = 0
+            stopped = ""
+            try:
+                for search_term, filters in CacheService.get_popular_searches(top_n):
+                    if stopped:
+                        break
+                    if CacheService.is_known_empty_search(search_term, filters):
+                        continue
+
+                    for sort_by, order in product(SEARCH_SORT_FIELDS, SEARCH_ORDERS):
+                        if CacheService.get_search_generation() != generation:
+                            stopped = "search cache invalidated"
+                        elif cluster_mongo_latency_ms(redis_client) > max_latency:
+                            stopped = "MongoDB latency too high"
+                        if stopped:
+                            break
+                        if CacheService.get_cached_search(search_term, sort_by, order, filters):
+                            continue
+
+                        started = time.monotonic()
+                        result = {"papers": Paper.search(search_term, sort_by, order, filters)}
+                        CacheService.cache_search_results(
+                            search_term, sort_by, order, result, filters
+                        )
+                        warmed += 1
+                        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+                        # No results for one variant means none for the others
+                        if not result["papers"]:
+                            CacheService.cache_empty_search(search_term, filters)
+                            break
+
+                if not stopped:
+                    redis_client.set(SEARCH_WARMED_GENERATION_KEY, generation)
+            finally:
+                CacheService.release_lock(SEARCH_WARM_LOCK_KEY, lock_token)
+
+            return {
+                "status": "success",
+                "warmed": warmed,
+                "message": f"Warmed {warmed} search cache entries"
+                + (f", stopped early: {stopped}" if stopped else ""),
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "warmed": 0,
+                "error": str(e),
+                "message": "Failed to warm search cache",
+            }
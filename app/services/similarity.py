@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import redis
+import scipy.sparse as sp
+from bson import ObjectId
+from flask import current_app
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.database import Database
+
+from .related import top_k_per_row
+
+# Set of uploaded paper IDs waiting to be embedded by the similar_embed job
+PENDING_KEY = "similar:pending"
+
+STOPWORDS = frozenset(
+    """a an and are as at be by for from has have in into is it its of on or our that the
+    their this to was we were which with using based via new these than can also""".split()
+)
+
+
+def tokenize(paper: Dict[str, Any]) -> List[str]:
+    """Tokens of a paper's title, abstract and keywords; title and keywords count twice."""
+    keywords = " ".join(paper.get("keywords", []))
+    text = " ".join([paper.get("title", "")] * 2 + [paper.get("abstract", "")] + [keywords] * 2)
+    return [t for t in re.findall(r"[a-z0-9]{2,}", text.lower()) if t not in STOPWORDS]
+
+
+def term_vector(tokens: List[str], vocabulary: Dict[str, int], idf: np.ndarray) -> sp.csr_matrix:
+    """L2-normalized sublinear TF-IDF row vector of a token list (unknown terms ignored)."""
+    counts = Counter(t for t in tokens if t in vocabulary)
+    indices = np.fromiter((vocabulary[t] for t in counts), dtype=np.int32, count=len(counts))
+    values = np.fromiter((1.0 + np.log(c) for c in counts.values()), dtype=np.float32)
+    values *= idf[indices]
+    norm = np.linalg.norm(values)
+    if norm > 0:
+        values /= norm
+    order = np.argsort(indices)
+    return sp.csr_matrix((values[order], indices[order], [0, len(indices)]), shape=(1, len(idf)))
+
+
+def fit_tfidf(
+    documents: List[List[str]], max_features: int, min_df: int = 2, max_df_ratio: float = 0.5
+) -> Tuple[Dict[str, int], np.ndarray, sp.csr_matrix]:
+    """
+    Fit a vocabulary and IDF weights on tokenized documents and return
+    (vocabulary, idf, L2-normalized TF-IDF matrix with one row per document).
+    """
+    n = len(documents)
+    df = Counter(t for tokens in documents for t in set(tokens))
+    max_df = max(min_df, int(max_df_ratio * n))
+    terms = [t for t, c in df.items() if min_df <= c <= max_df]
+    terms = sorted(terms, key=lambda t: (-df[t], t))[:max_features]
+    vocabulary = {t: i for i, t in enumerate(sorted(terms))}
+    idf = np.array([np.log((1 + n) / (1 + df[t])) + 1.0 for t in sorted(terms)], dtype=np.float32)
+
+    rows = [term_vector(tokens, vocabulary, idf) for tokens in documents]
+    # csr_matrix() around vstack only narrows its type; CSR input is not copied
+    matrix = sp.csr_matrix(sp.vstack(rows, format="csr")) if rows else sp.csr_matrix((0, len(idf)))
+    return vocabulary, idf, matrix
+
+
+def encode_vector(row: sp.csr_matrix) -> Dict[str, List[Any]]:
+    return {"indices": row.indices.tolist(), "values": [round(float(v), 6) for v in row.data]}
+
+
+class SimilarityIndex:
+    """
+    In-process copy of the TF-IDF model and paper vectors stored by the batch job,
+    used by the similar_embed job to embed new uploads without a full recompute.
+    Once loaded, the stored model is checked for changes at most every
+    SIMILAR_REFRESH_SEC seconds. Only vectors built with the loaded model (their
+    `model` field equals its built_at) are loaded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._checked_at: Optional[float] = None
+        self._built_at: Optional[datetime] = None
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.empty(0, dtype=np.float32)
+        self.paper_ids: List[ObjectId] = []
+        self.matrix = sp.csr_matrix((0, 0), dtype=np.float32)
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        # Fresh lock in forked workers; the inherited copy is re-checked on next use
+        self._lock = threading.RLock()
+        self._checked_at = None
+
+    @property
+    def built_at(self) -> Optional[datetime]:
+        """Version of the loaded model."""
+        return self._built_at
+
+    def ensure_loaded(self, db: Database) -> bool:
+        """Load or refresh the model and vectors; returns False if no model was built yet."""
+        refresh = current_app.config.get("SIMILAR_REFRESH_SEC", 600)
+        if self._checked_at is not None and time.monotonic() - self._checked_at < refresh:
+            return True
+
+        with self._lock:
+            model = db.tfidf_model.find_one({"_id": "current"}, {"built_at": 1})
+            if not model:
+                return False
+            self._checked_at = time.monotonic()
+            if model["built_at"] == self._built_at:
+                return True
+
+            model = db.tfidf_model.find_one({"_id": "current"})
+            if not model:
+                return False
+            self.vocabulary = {t: i for i, t in enumerate(model["terms"])}
+            self.idf = np.asarray(model["idf"], dtype=np.float32)
+
+            # Vectors of another model may index terms beyond this vocabulary
+            paper_ids, indptr, indices, values = [], [0], [], []
+            vectors = db.similar_papers.find({"model": model["built_at"]}, {"vector": 1})
+            for doc in vectors.batch_size(5000):
+                paper_ids.append(doc["_id"])
+                indices.extend(doc["vector"]["indices"])
+                values.extend(doc["vector"]["values"])
+                indptr.append(len(indices))
+
+            self.paper_ids = paper_ids
+            self.matrix = sp.csr_matrix(
+                (np.asarray(values, dtype=np.float32), np.asarray(indices, dtype=np.int32), indptr),
+                shape=(len(paper_ids), len(self.idf)),
+            )
+            self._built_at = model["built_at"]
+            return True
+
+    def invalidate(self) -> None:
+        """Force a check for a new model on next use."""
+        self._checked_at = None
+
+    def snapshot(self) -> Tuple[List[ObjectId], sp.csr_matrix]:
+        """Paper IDs and vectors, consistent with each other."""
+        with self._lock:
+            return list(self.paper_ids), self.matrix
+
+    def add_many(self, paper_ids: List[ObjectId], rows: sp.csr_matrix) -> None:
+        """Append the vectors of a batch of embedded papers with one vstack."""
+        with self._lock:
+            self.paper_ids.extend(paper_ids)
+            self.matrix = sp.csr_matrix(sp.vstack([self.matrix, rows], format="csr"))
+
+
+similarity_index = SimilarityIndex()
+
+
+class SimilarityService:
+    """Service computing content-similar papers with sparse TF-IDF cosine similarity."""
+
+    @staticmethod
+    def _similar_entries(
+        neighbors: List[Tuple[int, float]], paper_ids: List[ObjectId], titles: Dict[Any, str]
+    ) -> List[Dict[str, Any]]:
+        return [
+            {
+                "paper_id": paper_ids[col],
+                "title": titles.get(paper_ids[col], ""),
+                "score": round(score, 4),
+            }
+            for col, score in neighbors
+        ]
+
+    @staticmethod
+    def compute_similar_papers(block_size: int = 500) -> Dict[str, Any]:
+        """
+        Rebuild the TF-IDF model and the top-k similar papers of every paper.
+
+        Process:
+        1. Tokenize title/abstract/keywords of all papers and fit vocabulary + IDF
+        2. Build the L2-normalized sparse TF-IDF matrix X
+        3. Compute cosine similarities X[block] @ X.T one block of rows at a time
+           and keep the top SIMILAR_PAPERS_TOP_K above SIMILAR_MIN_SCORE
+        4. Upsert each paper's vector and neighbours into similar_papers with
+           bulk_write, then store the model for incremental embedding
+        5. Delete vectors of other models (deleted papers, or uploads embedded with
+           the previous model while this ran) and queue the latter for embedding
+
+        Returns dict with job statistics.
+        """
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        top_k = current_app.config.get("SIMILAR_PAPERS_TOP_K", 10)
+        min_score = current_app.config.get("SIMILAR_MIN_SCORE", 0.05)
+        max_features = current_app.config.get("TFIDF_MAX_FEATURES", 20000)
+
+        try:
+            run_started = datetime.utcnow()
+            papers = list(
+                db.papers.find({}, {"title": 1, "abstract": 1, "keywords": 1}).batch_size(5000)
+            )
+            if not papers:
+                return {"status": "success", "papers": 0, "message": "No papers to vectorize"}
+
+            paper_ids = [paper["_id"] for paper in papers]
+            titles = {paper["_id"]: paper["title"] for paper in papers}
+            vocabulary, idf, matrix = fit_tfidf([tokenize(p) for p in papers], max_features)
+            del papers
+
+            matrix_t = matrix.T.tocsr()
+            n = len(paper_ids)
+            for start in range(0, n, block_size):
+                end = min(start + block_size, n)
+                scores = (matrix[start:end] @ matrix_t).tocoo()
+                keep = (scores.row + start != scores.col) & (scores.data >= min_score)
+                scores = sp.csr_matrix(
+                    (scores.data[keep], (scores.row[keep], scores.col[keep])), shape=scores.shape
+                )
+
+                ops = []
+                for offset, neighbors in enumerate(top_k_per_row(scores, top_k)):
+                    i = start + offset
+                    ops.append(
+                        ReplaceOne(
+                            {"_id": paper_ids[i]},
+                            {
+                                "similar": SimilarityService._similar_entries(
+                                    neighbors, paper_ids, titles
+                                ),
+                                "vector": encode_vector(matrix[i]),
+                                "model": run_started,
+                                "computed_at": run_started,
+                            },
+                            upsert=True,
+                        )
+                    )
+                db.similar_papers.bulk_write(ops, ordered=False)
+
+            db.tfidf_model.replace_one(
+                {"_id": "current"},
+                {
+                    "terms": sorted(vocabulary, key=vocabulary.__getitem__),
+                    "idf": idf.tolist(),
+                    "built_at": run_started,
+                },
+                upsert=True,
+            )
+            similarity_index.invalidate()
+
+            stale = [
+                doc["_id"]
+                for doc in db.similar_papers.find({"model": {"$ne": run_started}}, {"_id": 1})
+            ]
+            if stale:
+                db.similar_papers.delete_many({"_id": {"$in": stale}})
+                SimilarityService._queue(stale)
+
+            return {
+                "status": "success",
+                "papers": n,
+                "terms": len(vocabulary),
+                "message": f"Vectorized {n} papers over {len(vocabulary)} terms",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "papers": 0,
+                "error": str(e),
+                "message": "Failed to compute similar papers",
+            }
+
+    @staticmethod
+    def _queue(paper_ids: List[ObjectId]) -> None:
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        try:
+            redis_client.sadd(PENDING_KEY, *[str(pid) for pid in paper_ids])
+        except Exception:
+            pass
+
+    @staticmethod
+    def embed_paper(paper: Dict[str, Any]) -> None:
+        """
+        Queue a newly created paper for the similar_embed job, which embeds it with
+        the stored model. Uploads queued before the first model is built are covered
+        by the batch job.
+        """
+        SimilarityService._queue([paper["_id"]])
+
+    @staticmethod
+    def embed_pending(batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Embed queued uploads with the stored model.
+
+        Process:
+        1. Take up to `batch_size` paper IDs from similar:pending
+        2. Build their TF-IDF rows and score them against the loaded vectors and
+           each other with two sparse products
+        3. Store each paper's vector and top-k neighbours, and $push it into the
+           neighbours' lists where it ranks in their top-k, with one bulk_write
+        4. Append the rows to the in-process matrix with one vstack and remove the
+           IDs from the queue, unless a new model was stored meanwhile (they are
+           then embedded again with it)
+
+        Papers that already have a vector of the current model are skipped.
+        Returns dict with processing statistics.
+        """
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        top_k = current_app.config.get("SIMILAR_PAPERS_TOP_K", 10)
+        min_score = current_app.config.get("SIMILAR_MIN_SCORE", 0.05)
+
+        try:
+            if not similarity_index.ensure_loaded(db):
+                return {"status": "success", "embedded": 0, "message": "No model built yet"}
+
+            queued = redis_client.srandmember(PENDING_KEY, batch_size)
+            if not queued:
+                return {"status": "success", "embedded": 0, "message": "No papers queued"}
+
+            model = similarity_index.built_at
+            object_ids = [ObjectId(pid) for pid in queued if ObjectId.is_valid(pid)]
+            current = {
+                doc["_id"]
+                for doc in db.similar_papers.find(
+                    {"_id": {"$in": object_ids}, "model": model}, {"_id": 1}
+                )
+            }
+            papers = [
+                paper
+                for paper in db.papers.find(
+                    {"_id": {"$in": object_ids}}, {"title": 1, "abstract": 1, "keywords": 1}
+                )
+                if paper["_id"] not in current
+            ]
+
+            if papers:
+                vocabulary, idf = similarity_index.vocabulary, similarity_index.idf
+                vectors = [term_vector(tokenize(p), vocabulary, idf) for p in papers]
+                rows = sp.csr_matrix(sp.vstack(vectors, format="csr"))
+                known_ids, matrix = similarity_index.snapshot()
+                candidate_ids = known_ids + [paper["_id"] for paper in papers]
+                # Columns: loaded papers, then this batch (minus each paper itself)
+                scores = sp.hstack([rows @ matrix.T, rows @ rows.T], format="csr").tocoo()
+                keep = (scores.col != scores.row + len(known_ids)) & (scores.data >= min_score)
+                scores = sp.csr_matrix(
+                    (scores.data[keep], (scores.row[keep], scores.col[keep])), shape=scores.shape
+                )
+                top = top_k_per_row(scores, top_k)
+
+                neighbor_ids = {candidate_ids[col] for neighbors in top for col, _ in neighbors}
+                titles = {paper["_id"]: paper["title"] for paper in papers}
+                titles.update(
+                    (doc["_id"], doc["title"])
+                    for doc in db.papers.find({"_id": {"$in": list(neighbor_ids)}}, {"title": 1})
+                )
+
+                ops: List[Any] = []
+                for offset, (paper, neighbors) in enumerate(zip(papers, top)):
+                    ops.append(
+                        ReplaceOne(
+                            {"_id": paper["_id"]},
+                            {
+                                "similar": SimilarityService._similar_entries(
+                                    neighbors, candidate_ids, titles
+                                ),
+                                "vector": encode_vector(rows[offset]),
+                                "model": model,
+                                "computed_at": datetime.utcnow(),
+                            },
+                            upsert=True,
+                        )
+                    )
+                    entry = {"paper_id": paper["_id"], "title": paper["title"]}
+                    for col, score in neighbors:
+                        if col >= len(known_ids):
+                            continue  # batch neighbours get this paper from their own list
+                        ops.append(
+                            UpdateOne(
+                                {"_id": candidate_ids[col]},
+                                {
+                                    "$push": {
+                                        "similar": {
+                                            "$each": [{**entry, "score": round(score, 4)}],
+                                            "$sort": {"score": -1},
+                                            "$slice": top_k,
+                                        }
+                                    }
+                                },
+                            )
+                        )
+                db.similar_papers.bulk_write(ops, ordered=False)
+
+            stored = db.tfidf_model.find_one({"_id": "current"}, {"built_at": 1})
+            if stored and stored["built_at"] != model:
+                similarity_index.invalidate()
+                return {
+                    "status": "success",
+                    "embedded": 0,
+                    "message": "Model changed while embedding, retrying with the new model",
+                }
+
+            if papers:
+                similarity_index.add_many([paper["_id"] for paper in papers], rows)
+            redis_client.srem(PENDING_KEY, *queued)
+
+            return {
+                "status": "success",
+                "embedded": len(papers),
+                "message": f"Embedded {len(papers)} of {len(queued)} queued papers",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "embedded": 0,
+                "error": str(e),
+                "message": "Failed to embed queued papers",
+            }
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import redis
+from bson import json_util
+from flask import current_app
+from pymongo.database import Database
+
+# Slow queries waiting to be explained and logged (JSON, newest first), capped at
+# SLOW_QUERY_QUEUE_MAX entries
+SLOW_QUERY_QUEUE_KEY = "slow_query:queue"
+
+
+def query_shape(value: Any) -> Any:
+    """
+    Shape of a filter, sort or pipeline: operators and field names are kept, literal
+    values are replaced by 1 and arrays of literals by [1], so the same search with
+    different terms, authors or dates shares one shape. Arrays of documents (pipeline
+    stages, $or branches) keep every element.
+    """
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(item, dict) for item in value):
+            return [query_shape(item) for item in value]
+        return [1] if value else []
+    return 1
+
+
+def _find_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """The queryPlanner/executionStats part of a find or aggregate explain output."""
+    if "queryPlanner" in explain:
+        return explain
+    for stage in explain.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"]
+    return {}
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Stage names of a winning plan from the root down, e.g. ["FETCH", "IXSCAN ix_x"]."""
+    stages = []
+    while plan:
+        plan = plan.get("queryPlan", plan)
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage = f"{stage} {plan['indexName']}"
+        stages.append(stage)
+        children = plan.get("inputStages") or [plan.get("inputStage") or {}]
+        plan = children[0]
+    return stages
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact, JSON-safe summary of an executionStats explain."""
+    plan = _find_plan(explain)
+    stats = plan.get("executionStats", {})
+    return {
+        "winning_plan": _plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {})),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "n_returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis"),
+    }
+
+
+class SlowQueryService:
+    """
+    Slow-query log for search and detail queries.
+
+    Queries slower than SLOW_QUERY_MS are queued in Redis by the request. The
+    slow_query_explain job appends them to the capped slow_queries collection with their
+    shape and duration. Explains are sampled per shape: one query of a shape is re-run
+    with explain("executionStats") on the database handle it used (so secondary reads
+    are explained on secondaries) at most every SLOW_QUERY_EXPLAIN_WINDOW_SEC, and its
+    plan summary is kept in slow_query_plans. The other queries of the shape are logged
+    with the documents examined of that sampled plan.
+    """
+
+    @staticmethod
+    def record(
+        kind: str, command: Dict[str, Any], started: float, n_returned: int, db: Database
+    ) -> None:
+        """
+        Queue a query for the slow-query log if it ran for longer than SLOW_QUERY_MS.
+
+        `command` is the equivalent find/aggregate command document (used for the shape
+        and the explain), `started` its time.perf_counter() start and `db` the handle it
+        ran on. Never raises.
+        """
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < current_app.config.get("SLOW_QUERY_MS", 200):
+            return
+
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        queue_max = current_app.config.get("SLOW_QUERY_QUEUE_MAX", 10000)
+        try:
+            entry = json_util.dumps(
+                {
+                    "ts": datetime.utcnow(),
+                    "kind": kind,
+                    "command": command,
+                    "duration_ms": round(duration_ms, 1),
+                    "n_returned": n_returned,
+                    "primary": db is current_app.mongo_db,  # type: ignore[attr-defined]
+                }
+            )
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.lpush(SLOW_QUERY_QUEUE_KEY, entry)
+            pipe.ltrim(SLOW_QUERY_QUEUE_KEY, 0, queue_max - 1)
+            pipe.execute()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _explain(command: Dict[str, Any], primary: bool) -> Optional[Dict[str, Any]]:
+        """Plan summary of a command, explained with the read preference it ran with."""
+        app = current_app
+        db: Database = app.mongo_db if primary else app.mongo_read_db  # type: ignore[attr-defined]
+        try:
+            explain = db.command(
+                {"explain": command, "verbosity": "executionStats"},
+                read_preference=db.read_preference,
+            )
+        except Exception:
+            return None
+        return summarize_explain(explain)
+
+    @staticmethod
+    def process_explain_queue(batch_size: int = 50) -> Dict[str, Any]:
+        """
+        Log queued slow queries, oldest first, explaining a sample of them.
+
+        Process:
+        1. Pop up to `batch_size` entries from the slow_query:queue list
+        2. Load the latest plan of every shape in the batch from slow_query_plans
+        3. Re-run the first query of each shape whose plan is missing or older than
+           SLOW_QUERY_EXPLAIN_WINDOW_SEC with explain("executionStats") on the primary
+           or the read handle
+        4. Append all of them to slow_queries with insert_many, with the docs_examined
+           of their shape's latest plan (null while no explain of the shape succeeded)
+           and whether they were explained themselves
+        5. Replace the plan summary of every explained shape in slow_query_plans
+
+        Returns dict with processing statistics.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+
+        window = timedelta(seconds=current_app.config.get("SLOW_QUERY_EXPLAIN_WINDOW_SEC", 600))
+
+        try:
+            raw = redis_client.rpop(SLOW_QUERY_QUEUE_KEY, batch_size) or []
+            batch = []
+            for item in raw:  # type: ignore[union-attr]
+                queued = json_util.loads(item)
+                name, collection = next(iter(queued["command"].items()))
+                shape = query_shape(
+                    {key: value for key, value in queued["command"].items() if key != name}
+                )
+                shape_hash = hashlib.sha1(
+                    json.dumps([queued["kind"], collection, shape], sort_keys=True).encode("utf-8")
+                ).hexdigest()[:16]
+                batch.append((queued, collection, shape, shape_hash))
+
+            latest = {
+                doc["_id"]: doc
+                for doc in db.slow_query_plans.find(
+                    {"_id": {"$in": list({shape_hash for *_, shape_hash in batch})}},
+                    {"docs_examined": 1, "explained_at": 1},
+                )
+            }
+            entries, plans, sampled = [], {}, set()
+            for queued, collection, shape, shape_hash in batch:
+                plan = plans.get(shape_hash) or latest.get(shape_hash)
+                explain = None
+                stale = not plan or datetime.utcnow() - plan["explained_at"] >= window
+                if stale and shape_hash not in sampled:
+                    sampled.add(shape_hash)  # one attempt per shape, even if it fails
+                    explain = SlowQueryService._explain(queued["command"], queued["primary"])
+                    if explain:
+                        plan = plans[shape_hash] = {
+                            **explain,
+                            "kind": queued["kind"],
+                            "explained_at": datetime.utcnow(),
+                        }
+
+                entries.append(
+                    {
+                        "ts": queued["ts"],
+                        "kind": queued["kind"],
+                        "collection": collection,
+                        "shape_hash": shape_hash,
+                        "shape": json.dumps(shape, sort_keys=True),
+                        "duration_ms": queued["duration_ms"],
+                        "n_returned": queued["n_returned"],
+                        "docs_examined": plan["docs_examined"] if plan else None,
+                        "explained": explain is not None,
+                    }
+                )
+
+            if entries:
+                db.slow_queries.insert_many(entries, ordered=False)
+            for shape_hash, plan in plans.items():
+                db.slow_query_plans.replace_one({"_id": shape_hash}, plan, upsert=True)
+
+            return {
+                "status": "success",
+                "logged": len(entries),
+                "explained": len(plans),
+                "message": f"Logged {len(entries)} slow queries, explained {len(plans)}",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "logged": 0,
+                "error": str(e),
+                "message": "Failed to process slow-query queue",
+            }
+
+    @staticmethod
+    def get_worst_shapes(limit: int = 20, hours: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Query shapes of the slow-query log ranked by total time spent, with their
+        latest sampled plan. `hours` restricts the log to recent entries.
+        """
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+
+        try:
+            pipeline: List[Dict[str, Any]] = []
+            if hours:
+                since = datetime.utcnow() - timedelta(hours=hours)
+                pipeline.append({"$match": {"ts": {"$gte": since}}})
+            pipeline += [
+                {
+                    "$group": {
+                        "_id": "$shape_hash",
+                        "kind": {"$first": "$kind"},
+                        "collection": {"$first": "$collection"},
+                        "shape": {"$first": "$shape"},
+                        "count": {"$sum": 1},
+                        "total_ms": {"$sum": "$duration_ms"},
+                        "max_ms": {"$max": "$duration_ms"},
+                        "max_docs_examined": {"$max": "$docs_examined"},
+                        "last_seen": {"$max": "$ts"},
+                    }
+                },
+                {"$sort": {"total_ms": -1}},
+                {"$limit": limit},
+            ]
+            groups = list(db.slow_queries.aggregate(pipeline))
+            plans = {
+                doc["_id"]: doc
+                for doc in db.slow_query_plans.find({"_id": {"$in": [g["_id"] for g in groups]}})
+            }
+
+            shapes = []
+            for group in groups:
+                plan = plans.get(group["_id"])
+                plan_summary = None
+                if plan:
+                    plan_summary = {
+                        "winning_plan": plan["winning_plan"],
+                        "docs_examined": plan["docs_examined"],
+                        "keys_examined": plan["keys_examined"],
+                        "n_returned": plan["n_returned"],
+                        "execution_ms": plan["execution_ms"],
+                        "explained_at": plan["explained_at"].isoformat(),
+                    }
+                shapes.append(
+                    {
+                        "shape_hash": group["_id"],
+                        "kind": group["kind"],
+                        "collection": group["collection"],
+                        "shape": json.loads(group["shape"]),
+                        "count": group["count"],
+                        "total_ms": round(group["total_ms"], 1),
+                        "avg_ms": round(group["total_ms"] / group["count"], 1),
+                        "max_ms": group["max_ms"],
+                        "max_docs_examined": group["max_docs_examined"],
+                        "last_seen": group["last_seen"].isoformat(),
+                        "plan": plan_summary,
+                    }
+                )
+
+            return {"status": "success", "shapes": shapes}
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "shapes": [],
+                "error": str(e),
+                "message": "Failed to read slow-query log",
+            }
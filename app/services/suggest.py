@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import heapq
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis
+from flask import current_app
+from pymongo.database import Database
+
+# Members of the lex index are "<normalized>\x1f<kind>\x1f<display>" so that
+# ZRANGEBYLEX can match on the normalized prefix while keeping the original text.
+SEPARATOR = "\x1f"
+LEX_MAX = chr(0x10FFFF)
+
+INDEX_KEY = "suggest:index"
+WEIGHTS_KEY = "suggest:weights"
+
+# Per-prefix ZSETs of the most popular members (score = weight) for prefixes up to
+# SUGGEST_PREFIX_MAX_LEN characters; longer prefixes fall back to the lex index
+PREFIX_KEY = "suggest:prefix:"
+
+
+class SuggestService:
+    """Prefix autocomplete over paper titles and keywords backed by Redis."""
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace."""
+        text = re.sub(r"[^\w\s]", " ", text.lower())
+        return " ".join(text.split())
+
+    @staticmethod
+    def _member(kind: str, text: str) -> str:
+        normalized = SuggestService.normalize(text)
+        if not normalized:
+            return ""
+        display = " ".join(text.split()).replace(SEPARATOR, " ")
+        return f"{normalized}{SEPARATOR}{kind}{SEPARATOR}{display}"
+
+    @staticmethod
+    def _paper_entries(paper: Dict[str, Any]) -> Dict[str, int]:
+        """Map index members of a paper to their popularity weight."""
+        entries: Dict[str, int] = {}
+        title = SuggestService._member("title", paper.get("title", ""))
+        if title:
+            entries[title] = 1 + int(paper.get("views", 0) or 0)
+        for keyword in paper.get("keywords", []):
+            member = SuggestService._member("keyword", keyword)
+            if member:
+                entries[member] = 1
+        return entries
+
+    @staticmethod
+    def _prefixes(member: str) -> List[str]:
+        """Prefixes of a member's normalized text that get a top-N ZSET."""
+        normalized = member.split(SEPARATOR, 1)[0]
+        max_len = current_app.config.get("SUGGEST_PREFIX_MAX_LEN", 15)
+        return [normalized[:n] for n in range(1, min(len(normalized), max_len) + 1)]
+
+    @staticmethod
+    def index_paper(paper: Dict[str, Any]) -> None:
+        """
+        Add a newly created paper's title and keywords to the index, and put them with
+        their new weight into the top-N ZSET of each of their prefixes.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        top_n = current_app.config.get("SUGGEST_PREFIX_TOP_N", 25)
+
+        entries = SuggestService._paper_entries(paper)
+        if not entries:
+            return
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.zadd(INDEX_KEY, {member: 0 for member in entries})
+            for member, weight in entries.items():
+                pipe.hincrby(WEIGHTS_KEY, member, weight)
+            weights = pipe.execute()[1:]
+
+            pipe = redis_client.pipeline(transaction=False)
+            for member, weight in zip(entries, weights):
+                for prefix in SuggestService._prefixes(member):
+                    pipe.zadd(f"{PREFIX_KEY}{prefix}", {member: int(weight)})
+                    pipe.zremrangebyrank(f"{PREFIX_KEY}{prefix}", 0, -(top_n + 1))
+            pipe.execute()
+        except Exception:
+            pass
+
+    @staticmethod
+    def suggest(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return up to `limit` titles/keywords starting with `query`, most popular first."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        prefix = SuggestService.normalize(query)
+        if not prefix:
+            return []
+
+        if len(prefix) <= current_app.config.get("SUGGEST_PREFIX_MAX_LEN", 15):
+            try:
+                ranked = redis_client.zrevrange(
+                    f"{PREFIX_KEY}{prefix}", 0, limit - 1, withscores=True
+                )
+            except Exception:
+                return []
+            return SuggestService._format(ranked)  # type: ignore[arg-type]
+
+        # Long prefixes match few members, so ranking the first candidates is exact enough
+        max_candidates = current_app.config.get("SUGGEST_MAX_CANDIDATES", 200)
+        try:
+            members: List[str] = redis_client.zrangebylex(  # type: ignore[assignment]
+                INDEX_KEY, f"[{prefix}", f"[{prefix}{LEX_MAX}", start=0, num=max_candidates
+            )
+            if not members:
+                return []
+            weights: List[Optional[str]] = redis_client.hmget(  # type: ignore[assignment]
+                WEIGHTS_KEY, members
+            )
+        except Exception:
+            return []
+
+        ranked = sorted(zip(members, weights), key=lambda item: int(item[1] or 0), reverse=True)
+        return SuggestService._format(ranked[:limit])
+
+    @staticmethod
+    def _format(ranked: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        suggestions = []
+        for member, weight in ranked:
+            _, kind, display = member.split(SEPARATOR, 2)
+            suggestions.append({"text": display, "type": kind, "score": int(weight or 0)})
+        return suggestions
+
+    @staticmethod
+    def rebuild_index() -> Dict[str, Any]:
+        """
+        Rebuild the suggest index from the MongoDB papers collection.
+
+        The new index is written to temporary keys and swapped in with RENAME,
+        so readers never observe a partially built index. Each prefix ZSET is
+        replaced in one MULTI; prefixes that no longer match anything are deleted.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+
+        tmp_index = f"{INDEX_KEY}:rebuild"
+        tmp_weights = f"{WEIGHTS_KEY}:rebuild"
+        batch_size = 1000
+
+        try:
+            redis_client.delete(tmp_index, tmp_weights)
+
+            cursor = db.papers.find({}, {"title": 1, "keywords": 1, "views": 1})
+            weights: Dict[str, int] = {}
+            papers = 0
+            for paper in cursor:
+                papers += 1
+                for member, weight in SuggestService._paper_entries(paper).items():
+                    weights[member] = weights.get(member, 0) + weight
+
+            for chunk in SuggestService._chunks(list(weights.items()), batch_size):
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.zadd(tmp_index, {member: 0 for member, _ in chunk})
+                pipe.hset(tmp_weights, mapping=dict(chunk))
+                pipe.execute()
+
+            # Top-N members per prefix, kept as min-heaps of (weight, member)
+            top_n = current_app.config.get("SUGGEST_PREFIX_TOP_N", 25)
+            top: Dict[str, List[Tuple[int, str]]] = {}
+            for member, weight in weights.items():
+                for prefix in SuggestService._prefixes(member):
+                    heap = top.setdefault(prefix, [])
+                    if len(heap) < top_n:
+                        heapq.heappush(heap, (weight, member))
+                    elif (weight, member) > heap[0]:
+                        heapq.heapreplace(heap, (weight, member))
+
+            for chunk in SuggestService._chunks(list(top.items()), batch_size):
+                pipe = redis_client.pipeline(transaction=True)
+                for prefix, heap in chunk:
+                    pipe.delete(f"{PREFIX_KEY}{prefix}")
+                    pipe.zadd(f"{PREFIX_KEY}{prefix}", {member: w for w, member in heap})
+                pipe.execute()
+
+            stale = [
+                key
+                for key in redis_client.scan_iter(match=f"{PREFIX_KEY}*", count=1000)
+                if key[len(PREFIX_KEY) :] not in top
+            ]
+            for chunk in SuggestService._chunks(stale, batch_size):
+                redis_client.delete(*chunk)
+
+            pipe = redis_client.pipeline(transaction=True)
+            if weights:
+                pipe.rename(tmp_index, INDEX_KEY)
+                pipe.rename(tmp_weights, WEIGHTS_KEY)
+            else:
+                pipe.delete(INDEX_KEY, WEIGHTS_KEY)
+            pipe.execute()
+
+            return {
+                "status": "success",
+                "indexed_papers": papers,
+                "indexed_terms": len(weights),
+                "message": f"Indexed {len(weights)} terms from {papers} papers",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "indexed_papers": 0,
+                "indexed_terms": 0,
+                "error": str(e),
+                "message": "Failed to rebuild suggest index",
+            }
+
+    @staticmethod
+    def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+        for start in range(0, len(items), size):
+            yield items[start : start + size]
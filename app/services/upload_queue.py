@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import redis
+from bson import ObjectId
+from flask import current_app
+
+from ..models.paper import Paper
+from ..utils.cache import CacheService
+from .dedup import DedupService, estimate_similarity, minhash_signature
+
+UPLOAD_STREAM_KEY = "upload_queue"
+UPLOAD_GROUP = "upload_workers"
+
+
+def _ticket_key(ticket_id: str) -> str:
+    return f"upload_ticket:{ticket_id}"
+
+
+class UploadQueueService:
+    """
+    Write-behind paper uploads through a Redis Stream.
+
+    The endpoint appends validated papers to the upload_queue stream and answers 202
+    with a ticket. Consumers of the upload_workers group insert them in batches with
+    one insert_many and one search cache invalidation per batch, and record the
+    outcome in the ticket hash. Paper IDs are assigned at enqueue time, so a batch
+    re-delivered after a consumer crash cannot create duplicates.
+    """
+
+    @staticmethod
+    def enqueue(data: Dict[str, Any], user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Queue validated paper data; returns the new ticket, or None when UPLOAD_QUEUE_MAXLEN
+        entries are already waiting. The stream is never trimmed, since that would drop
+        uploads that were already accepted.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        ttl = current_app.config.get("UPLOAD_TICKET_TTL_SEC", 86400)
+
+        if redis_client.xlen(UPLOAD_STREAM_KEY) >= current_app.config.get(
+            "UPLOAD_QUEUE_MAXLEN", 100000
+        ):
+            return None
+
+        ticket = {
+            "ticket_id": uuid.uuid4().hex,
+            "paper_id": str(ObjectId()),
+            "user_id": user_id,
+            "status": "queued",
+            "queued_at": datetime.utcnow().isoformat(),
+        }
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.hset(_ticket_key(ticket["ticket_id"]), mapping=ticket)
+        pipe.expire(_ticket_key(ticket["ticket_id"]), ttl)
+        pipe.xadd(
+            UPLOAD_STREAM_KEY,
+            {
+                "ticket_id": ticket["ticket_id"],
+                "paper_id": ticket["paper_id"],
+                "user_id": user_id,
+                "paper": json.dumps(data),
+            },
+        )
+        pipe.execute()
+        return ticket
+
+    @staticmethod
+    def get_ticket(ticket_id: str) -> Optional[Dict[str, Any]]:
+        """Ticket fields (JSON-decoded details), or None if unknown or expired."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        ticket: Dict[str, Any] = redis_client.hgetall(_ticket_key(ticket_id))  # type: ignore
+        if not ticket:
+            return None
+        for field in ("details", "possible_duplicates"):
+            if field in ticket:
+                ticket[field] = json.loads(ticket[field])
+        return ticket
+
+    @staticmethod
+    def _read_batch(redis_client: redis.Redis, consumer: str, batch_size: int) -> List[Any]:
+        """Entries left pending by dead consumers first, then new entries."""
+        idle_ms = current_app.config.get("UPLOAD_QUEUE_CLAIM_IDLE_MS", 60000)
+        claimed = redis_client.xautoclaim(
+            UPLOAD_STREAM_KEY, UPLOAD_GROUP, consumer, idle_ms, count=batch_size
+        )
+        # Skip deleted entries
+        entries = [entry for entry in claimed[1] if entry[1]]  # type: ignore[index]
+        if len(entries) < batch_size:
+            response = redis_client.xreadgroup(
+                UPLOAD_GROUP, consumer, {UPLOAD_STREAM_KEY: ">"}, count=batch_size - len(entries)
+            )
+            if response:
+                entries += response[0][1]  # type: ignore[index]
+        return entries
+
+    @staticmethod
+    def _check_batch(
+        entries: List[Tuple[str, Dict[str, str]]],
+    ) -> Tuple[List[Tuple[str, Dict[str, Any], str]], Dict[str, Dict[str, Any]]]:
+        """
+        Check citations and near-duplicates of queued papers, which the endpoint skips
+        to stay off MongoDB. Papers are also compared with the papers queued before them
+        in the same batch. Citations may point to papers of the same batch, as long as
+        those are created too.
+        Returns (papers to create, {ticket_id: outcome ticket fields}).
+        """
+        parsed = [(fields, json.loads(fields["paper"])) for _, fields in entries]
+        batch_ids = {fields["paper_id"] for fields, _ in parsed}
+        cited = {cid for _, data in parsed for cid in data.get("citations", [])} - batch_ids
+        invalid = set(Paper.validate_citations_exist(sorted(cited))) if cited else set()
+        dedup_mode = current_app.config.get("DEDUP_MODE", "flag")
+        params = DedupService._params()
+
+        accepted, outcomes = [], {}
+        signatures: List[Tuple[Dict[str, Any], np.ndarray]] = []
+        for fields, data in parsed:
+            ticket_id = fields["ticket_id"]
+            invalid_citations = [cid for cid in data.get("citations", []) if cid in invalid]
+            if invalid_citations:
+                outcomes[ticket_id] = {
+                    "status": "failed",
+                    "error": "Invalid citation IDs",
+                    "details": json.dumps(invalid_citations),
+                }
+                continue
+
+            duplicates = []
+            if dedup_mode != "off":
+                # A re-delivered paper that was already inserted matches itself
+                duplicates = [
+                    duplicate
+                    for duplicate in DedupService.find_duplicates(data)
+                    if duplicate["paper_id"] != fields["paper_id"]
+                ]
+                signature = minhash_signature(data, params["num_perm"])
+                for earlier_fields, earlier_signature in signatures:
+                    similarity = estimate_similarity(signature, earlier_signature)
+                    if similarity >= params["threshold"]:
+                        duplicates.append(
+                            {
+                                "paper_id": earlier_fields["paper_id"],
+                                "title": earlier_fields["title"],
+                                "similarity": round(similarity, 3),
+                            }
+                        )
+                duplicates.sort(key=lambda d: -d["similarity"])
+            if duplicates and dedup_mode == "reject":
+                outcomes[ticket_id] = {
+                    "status": "rejected",
+                    "error": "Possible duplicate paper",
+                    "possible_duplicates": json.dumps(duplicates[:5]),
+                }
+                continue
+
+            outcomes[ticket_id] = {"status": "created"}
+            if duplicates:
+                outcomes[ticket_id]["possible_duplicates"] = json.dumps(duplicates[:5])
+            if dedup_mode != "off":
+                signatures.append(
+                    ({"paper_id": fields["paper_id"], "title": data["title"]}, signature)
+                )
+            accepted.append((fields, data))
+
+        # A citation of a batch paper that is not created is invalid too, which may in
+        # turn drop papers citing the citing paper
+        dropped = Paper.cascade_failed_citations(
+            {fields["paper_id"]: data.get("citations", []) for fields, data in accepted},
+            batch_ids - {fields["paper_id"] for fields, _ in accepted},
+        )
+        created_ids = {fields["paper_id"] for fields, _ in accepted} - dropped
+        papers = []
+        for fields, data in accepted:
+            if fields["paper_id"] in dropped:
+                outcomes[fields["ticket_id"]] = {
+                    "status": "failed",
+                    "error": "Invalid citation IDs",
+                    "details": json.dumps(
+                        [
+                            cid
+                            for cid in data.get("citations", [])
+                            if cid in batch_ids and cid not in created_ids
+                        ]
+                    ),
+                }
+                continue
+            papers.append((fields["paper_id"], data, fields["user_id"]))
+        return papers, outcomes
+
+    @staticmethod
+    def process_upload_queue(max_batches: int = 10) -> Dict[str, Any]:
+        """
+        Drain the upload stream as a member of the upload_workers consumer group.
+
+        Process (per batch of UPLOAD_QUEUE_BATCH entries):
+        1. Claim entries idle for UPLOAD_QUEUE_CLAIM_IDLE_MS (dead consumers), then
+           read new ones
+        2. Check citations and near-duplicates of the whole batch
+        3. Insert papers and citations with Paper.create_many
+        4. Invalidate the search cache once, update tickets, XACK and XDEL the entries
+
+        Returns dict with queue statistics.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        batch_size = current_app.config.get("UPLOAD_QUEUE_BATCH", 100)
+        ttl = current_app.config.get("UPLOAD_TICKET_TTL_SEC", 86400)
+        consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+        try:
+            try:
+                redis_client.xgroup_create(UPLOAD_STREAM_KEY, UPLOAD_GROUP, id="0", mkstream=True)
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+            created = failed = 0
+            for _ in range(max_batches):
+                entries = UploadQueueService._read_batch(redis_client, consumer, batch_size)
+                if not entries:
+                    break
+
+                papers, outcomes = UploadQueueService._check_batch(entries)
+                errors = Paper.create_many(papers) if papers else {}
+                if len(errors) < len(papers):
+                    CacheService.invalidate_search_cache()
+
+                finished_at = datetime.utcnow().isoformat()
+                pipe = redis_client.pipeline(transaction=False)
+                for entry_id, fields in entries:
+                    outcome = outcomes[fields["ticket_id"]]
+                    if fields["paper_id"] in errors:
+                        outcome = {"status": "failed", "error": "Failed to create paper"}
+                    if outcome["status"] == "created":
+                        created += 1
+                    else:
+                        failed += 1
+                    key = _ticket_key(fields["ticket_id"])
+                    pipe.hset(key, mapping={**outcome, "finished_at": finished_at})
+                    pipe.expire(key, ttl)
+                    pipe.xack(UPLOAD_STREAM_KEY, UPLOAD_GROUP, entry_id)
+                    pipe.xdel(UPLOAD_STREAM_KEY, entry_id)
+                pipe.execute()
+
+                if len(entries) < batch_size:
+                    break
+
+            return {
+                "status": "success",
+                "created": created,
+                "failed": failed,
+                "message": f"Created {created} queued papers, {failed} failed or rejected",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "created": 0,
+                "error": str(e),
+                "message": "Failed to process upload queue",
+            }
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+import socket
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import redis
+from bson import ObjectId
+from flask import current_app
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+from ..utils.cache import VIEW_EVENTS_STREAM_KEY, CacheService
+
+VIEW_EVENTS_GROUP = "view_aggregators"
+
+
+class ViewEventService:
+    """
+    Consumer-group aggregation of the view-event stream (VIEW_PIPELINE=stream).
+
+    Each batch of events is summed per paper in memory and applied with one
+    bulk_write. Before that, the batch's entry IDs and per-paper counts are stored in
+    view_event_batches, and every update is guarded by the batch ID: a paper remembers
+    the last VIEW_BATCH_HISTORY batches applied to it. An entry re-delivered after a
+    failure before XACK, in whatever batch it ends up in, re-applies its logged batch
+    instead of being counted again. Acking the entries and lowering the pending-view
+    counters happen in one MULTI.
+    """
+
+    @staticmethod
+    def _read_batch(redis_client: redis.Redis, consumer: str, batch_size: int) -> List[Any]:
+        """This consumer's unacked entries first, then entries of dead consumers, then new ones."""
+        pending = redis_client.xreadgroup(
+            VIEW_EVENTS_GROUP, consumer, {VIEW_EVENTS_STREAM_KEY: "0"}, count=batch_size
+        )
+        pending_entries = pending[0][1] if pending else []  # type: ignore[index]
+        entries = [entry for entry in pending_entries if entry[1]]
+        if entries:
+            return entries
+
+        idle_ms = current_app.config.get("VIEW_EVENTS_CLAIM_IDLE_MS", 60000)
+        claimed = redis_client.xautoclaim(
+            VIEW_EVENTS_STREAM_KEY, VIEW_EVENTS_GROUP, consumer, idle_ms, count=batch_size
+        )
+        # Skip deleted entries
+        entries = [entry for entry in claimed[1] if entry[1]]  # type: ignore[index]
+        if entries:
+            return entries
+
+        response = redis_client.xreadgroup(
+            VIEW_EVENTS_GROUP, consumer, {VIEW_EVENTS_STREAM_KEY: ">"}, count=batch_size
+        )
+        return response[0][1] if response else []  # type: ignore[index]
+
+    @staticmethod
+    def _count_views(entries: List[Tuple[str, Dict[str, str]]]) -> Counter:
+        """Views per paper ID in these entries."""
+        counts: Counter = Counter()
+        for _, fields in entries:
+            if ObjectId.is_valid(fields.get("p", "")):
+                counts[fields["p"]] += int(fields.get("n", 1))
+        return counts
+
+    @staticmethod
+    def _log_batch(db: Database, entries: List[Tuple[str, Dict[str, str]]]) -> List[Dict[str, Any]]:
+        """
+        Logged batches to apply for these entries: the batches that already logged
+        some of them (re-deliveries), plus a new batch logged with the rest.
+        """
+        entry_ids = [entry_id for entry_id, _ in entries]
+        batches = list(
+            db.view_event_batches.find({"entries": {"$in": entry_ids}}, {"entries": 1, "counts": 1})
+        )
+        logged = {entry_id for batch in batches for entry_id in batch["entries"]}
+
+        new_entries = [entry for entry in entries if entry[0] not in logged]
+        if new_entries:
+            batch = {
+                "_id": f"{new_entries[0][0]}-{new_entries[-1][0]}",
+                "entries": [entry_id for entry_id, _ in new_entries],
+                "counts": dict(ViewEventService._count_views(new_entries)),
+                "created_at": datetime.utcnow(),
+            }
+            # Upsert: consumers racing on the same claimed entries log the same batch
+            db.view_event_batches.replace_one({"_id": batch["_id"]}, batch, upsert=True)
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def process_view_events(max_batches: int = 20) -> Dict[str, Any]:
+        """
+        Apply view events to MongoDB as a member of the view_aggregators group.
+
+        Process (per batch of VIEW_EVENTS_BATCH entries):
+        1. Read this consumer's pending entries, claimed entries of consumers idle
+           for VIEW_EVENTS_CLAIM_IDLE_MS, or new entries
+        2. Sum views per paper and log the batch (entry IDs and counts); entries
+           already logged by an earlier delivery select their logged batch instead
+        3. $inc views with bulk_write, skipping papers that already applied the batch
+        4. Invalidate cached details, then XACK/XDEL the entries and DECRBY the
+           pending-view counters in one MULTI
+
+        Returns dict with processing statistics.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+        batch_size = current_app.config.get("VIEW_EVENTS_BATCH", 1000)
+        history = current_app.config.get("VIEW_BATCH_HISTORY", 20)
+        consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+        try:
+            try:
+                redis_client.xgroup_create(
+                    VIEW_EVENTS_STREAM_KEY, VIEW_EVENTS_GROUP, id="0", mkstream=True
+                )
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+            events = views = 0
+            papers = set()
+            for _ in range(max_batches):
+                entries = ViewEventService._read_batch(redis_client, consumer, batch_size)
+                if not entries:
+                    break
+
+                batches = ViewEventService._log_batch(db, entries)
+                ops = [
+                    UpdateOne(
+                        {"_id": ObjectId(paper_id), "applied_view_batches": {"$ne": batch["_id"]}},
+                        {
+                            "$inc": {"views": count},
+                            "$push": {
+                                "applied_view_batches": {
+                                    "$each": [batch["_id"]],
+                                    "$slice": -history,
+                                }
+                            },
+                        },
+                    )
+                    for batch in batches
+                    for paper_id, count in batch["counts"].items()
+                ]
+                if ops:
+                    db.papers.bulk_write(ops, ordered=False)
+                    CacheService.invalidate_paper_counters(
+                        list({paper_id for batch in batches for paper_id in batch["counts"]})
+                    )
+
+                # Every delivered event raised paper_views:<id> once, applied before or not
+                counts = ViewEventService._count_views(entries)
+                entry_ids = [entry_id for entry_id, _ in entries]
+                pipe = redis_client.pipeline(transaction=True)
+                for paper_id, count in counts.items():
+                    pipe.decrby(f"paper_views:{paper_id}", count)
+                pipe.xack(VIEW_EVENTS_STREAM_KEY, VIEW_EVENTS_GROUP, *entry_ids)
+                pipe.xdel(VIEW_EVENTS_STREAM_KEY, *entry_ids)
+                pipe.execute()
+
+                events += len(entries)
+                papers.update(counts)
+                views += sum(counts.values())
+                if len(entries) < batch_size:
+                    break
+
+            return {
+                "status": "success",
+                "events": events,
+                "papers": len(papers),
+                "views": views,
+                "message": f"Applied {views} views to {len(papers)} papers from {events} events",
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "events": 0,
+                "error": str(e),
+                "message": "Failed to process view events",
+            }
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import uuid
+from datetime import datetime, timezone
 from typing import Any, Dict, List
 
 import redis
 from bson import ObjectId
 from flask import current_app
+from pymongo import InsertOne, UpdateOne
 from pymongo.database import Database
 
+from ..utils.cache import UNIQUE_VIEWERS_DIRTY_KEY, CacheService
+
+FLUSHING_SUFFIX = ":flushing"
+# Field of a :flushing hash holding the ID its points are written with
+FLUSH_ID_FIELD = "_flush_id"
+
 
 class ViewSyncService:
     """Service to sync paper view counts from Redis to MongoDB."""
@@ -22,26 +31,53 @@ class ViewSyncService:
         3. Update MongoDB papers collection with $inc
         4. Reset Redis key to 0
 
+        With VIEW_PIPELINE=stream, steps 1-4 are skipped: view counts are applied by the
+        view-event consumers (ViewEventService); the series and unique-view rollups still run.
+
         Returns dict with sync statistics.
         """
         redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
         db: Database = current_app.mongo_db  # type: ignore[attr-defined]
 
         try:
+            # Roll hourly view buckets up into the time-series collection
+            series = ViewSyncService.flush_view_buckets()
+            # Persist unique-viewer HyperLogLog estimates
+            unique = ViewSyncService.sync_unique_views()
+
+            if current_app.config.get("VIEW_PIPELINE", "counters") == "stream":
+                # Views reach MongoDB through the view-event consumers (ViewEventService)
+                return {
+                    "status": (
+                        "success" if not series["errors"] + unique["errors"] else "partial_success"
+                    ),
+                    "synced_papers": 0,
+                    "total_views_synced": 0,
+                    "series_points_flushed": series["points"],
+                    "unique_views_synced": unique["papers"],
+                    "errors": series["errors"] + unique["errors"],
+                    "message": "View counts are applied from the view-event stream",
+                }
+
             # Get all paper_views:* keys
             view_keys = redis_client.keys("paper_views:*")
 
             if not view_keys:
                 return {
-                    "status": "success",
+                    "status": (
+                        "success" if not series["errors"] + unique["errors"] else "partial_success"
+                    ),
                     "synced_papers": 0,
                     "total_views_synced": 0,
+                    "series_points_flushed": series["points"],
+                    "unique_views_synced": unique["papers"],
+                    "errors": series["errors"] + unique["errors"],
                     "message": "No paper views to sync",
                 }
 
             synced_count = 0
             total_views = 0
-            errors = []
+            errors = series["errors"] + unique["errors"]
 
             for key in view_keys: # type: ignore
                 try:
@@ -62,6 +98,7 @@ class ViewSyncService:
 
                     if result.matched_count > 0:
                         redis_client.set(key, 0)
+                        CacheService.invalidate_paper_counters([paper_id])
                         synced_count += 1
                         total_views += view_count
                     else:
@@ -75,6 +112,8 @@ class ViewSyncService:
                 "status": "success" if not errors else "partial_success",
                 "synced_papers": synced_count,
                 "total_views_synced": total_views,
+                "series_points_flushed": series["points"],
+                "unique_views_synced": unique["papers"],
                 "errors": errors,
                 "message": f"Synced {synced_count} papers with {total_views} total views",
             }
@@ -88,6 +127,123 @@ class ViewSyncService:
                 "message": "Failed to sync paper views",
             }
 
+    @staticmethod
+    def flush_view_buckets(batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Flush hourly view buckets (view_buckets:<YYYYMMDDHH> hashes of paper_id -> count)
+        into the paper_view_series time-series collection.
+
+        Each hash is first renamed to <key>:flushing so new views land in a fresh
+        hash, then written with unordered bulk inserts and deleted. A leftover
+        :flushing hash from a failed run is flushed before its hour is renamed again.
+
+        Time-series collections have no unique index to upsert against, so every point
+        carries the flush ID stored in its :flushing hash. Flushing a leftover skips
+        the papers already written with that ID, so a failure between the inserts and
+        the delete does not count those views twice.
+
+        Returns dict with the number of points written and any errors.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+
+        points = 0
+        errors = []
+
+        keys = sorted(
+            redis_client.scan_iter(match="view_buckets:*", count=1000),
+            key=lambda k: not k.endswith(FLUSHING_SUFFIX),  # leftovers first
+        )
+        for key in keys:
+            try:
+                if key.endswith(FLUSHING_SUFFIX):
+                    flushing_key = key
+                else:
+                    flushing_key = f"{key}{FLUSHING_SUFFIX}"
+                    if not redis_client.renamenx(key, flushing_key):
+                        continue  # previous flush still pending for this hour
+
+                hour_str = flushing_key.split(":")[1]
+                hour = datetime.strptime(hour_str, "%Y%m%d%H").replace(tzinfo=timezone.utc)
+
+                redis_client.hsetnx(flushing_key, FLUSH_ID_FIELD, uuid.uuid4().hex)
+                flush_id = redis_client.hget(flushing_key, FLUSH_ID_FIELD)
+                written = set()
+                if key.endswith(FLUSHING_SUFFIX):
+                    written = set(
+                        db.paper_view_series.distinct(
+                            "paper_id", {"ts": hour, "flush_id": flush_id}
+                        )
+                    )
+
+                ops = []
+                for paper_id, count in redis_client.hscan_iter(flushing_key, count=batch_size):
+                    if not ObjectId.is_valid(paper_id) or ObjectId(paper_id) in written:
+                        continue
+                    if int(count) > 0:
+                        point = {"ts": hour, "paper_id": ObjectId(paper_id), "views": int(count)}
+                        ops.append(InsertOne({**point, "flush_id": flush_id}))
+                    if len(ops) >= batch_size:
+                        db.paper_view_series.bulk_write(ops, ordered=False)
+                        points += len(ops)
+                        ops = []
+
+                if ops:
+                    db.paper_view_series.bulk_write(ops, ordered=False)
+                    points += len(ops)
+
+                redis_client.delete(flushing_key)
+
+            except Exception as e:
+                errors.append(f"Error flushing {key}: {str(e)}")
+                continue
+
+        return {"points": points, "errors": errors}
+
+    @staticmethod
+    def sync_unique_views(batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Persist unique-viewer estimates (PFCOUNT of paper_viewers:<id>) to the
+        unique_views field of papers whose HyperLogLog changed since the last sync.
+        Estimates are written with batched bulk_write and the papers are removed
+        from the dirty set only after their batch was written.
+
+        Returns dict with the number of papers updated and any errors.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        db: Database = current_app.mongo_db  # type: ignore[attr-defined]
+
+        dirty_key = UNIQUE_VIEWERS_DIRTY_KEY
+        papers = 0
+        errors = []
+
+        paper_ids = [pid for pid in redis_client.sscan_iter(dirty_key, count=1000)]
+        for start in range(0, len(paper_ids), batch_size):
+            batch = paper_ids[start : start + batch_size]
+            try:
+                pipe = redis_client.pipeline(transaction=False)
+                for paper_id in batch:
+                    pipe.pfcount(f"paper_viewers:{paper_id}")
+                counts = pipe.execute()
+
+                ops = [
+                    UpdateOne({"_id": ObjectId(paper_id)}, {"$set": {"unique_views": int(count)}})
+                    for paper_id, count in zip(batch, counts)
+                    if ObjectId.is_valid(paper_id)
+                ]
+                if ops:
+                    db.papers.bulk_write(ops, ordered=False)
+                    CacheService.invalidate_paper_counters(batch)
+                    papers += len(ops)
+
+                redis_client.srem(dirty_key, *batch)
+
+            except Exception as e:
+                errors.append(f"Error syncing unique views: {str(e)}")
+                continue
+
+        return {"papers": papers, "errors": errors}
+
     @staticmethod
     def get_all_paper_views_keys() -> List[str]:
         """Get all paper_views:* keys from Redis for monitoring."""
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 from functools import wraps
 from typing import Optional
 
@@ -13,6 +14,27 @@ def get_user_id_from_header() -> Optional[str]:
     return request.headers.get("X-User-ID")
 
 
+def get_client_ip() -> str:
+    """
+    Client IP as resolved by ProxyFix: X-Forwarded-For is only honoured for the
+    TRUSTED_PROXY_COUNT proxies in front of the app, so clients cannot spoof it.
+    """
+    return request.remote_addr or ""
+
+
+def get_viewer_hash() -> str:
+    """
+    Hash the identity of the current viewer for unique-view counting: the
+    X-User-ID header when present, otherwise client IP plus user agent.
+    """
+    user_id = get_user_id_from_header()
+    if user_id:
+        identity = f"user:{user_id}"
+    else:
+        identity = f"anon:{get_client_ip()}:{request.headers.get('User-Agent', '')}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+
 def require_auth(f):
     """Decorator to require valid X-User-ID header."""
 
@@ -1,29 +1,279 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
 import json
-from typing import Any, Dict, Optional
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 import redis
-from flask import current_app
+from flask import Flask, current_app
+
+# Hourly trending buckets must outlive the longest trending window (7d) plus one hour
+TRENDING_BUCKET_TTL = (7 * 24 + 2) * 3600
+
+# Safety net for hourly view-series hashes in case the sync job stops running
+VIEW_BUCKET_TTL = 7 * 24 * 3600
+
+# Set of paper IDs whose unique-viewer HyperLogLog changed since the last sync
+UNIQUE_VIEWERS_DIRTY_KEY = "paper_viewers:dirty"
+
+# Stream of view events ({"p": paper_id}, plus "n": views when a flushed view buffer
+# batched several) consumed by the view-event aggregators when VIEW_PIPELINE is "stream"
+VIEW_EVENTS_STREAM_KEY = "view_events"
+
+# English stop words ignored by the MongoDB text index, so dropping them from a
+# search term does not change its $text results
+SEARCH_STOPWORDS = frozenset(
+    """a about above after again against all am an and any are as at be because been
+    before being below between both but by can could did do does doing down during each
+    few for from further had has have having he her here hers herself him himself his how
+    i if in into is it its itself just me more most my myself no nor not of off on once
+    only or other our ours ourselves out over own same she should so some such than that
+    the their theirs them themselves then there these they this those through to too under
+    until up very was we were what when where which while who whom why will with would you
+    your yours yourself yourselves""".split()
+)
+
+# Bumped on every search cache invalidation; search ETags are derived from it.
+# Kept outside the search:* namespace so invalidation does not delete it.
+SEARCH_GENERATION_KEY = "search_generation"
+
+# Request counts of canonical searches (JSON [term, filters]) used to pick what to warm,
+# and the last search generation the warmer completed. Also outside search:*.
+SEARCH_POPULARITY_KEY = "search_popularity"
+SEARCH_WARMED_GENERATION_KEY = "search_warm:generation"
+
+# Fraction of record_search calls that also trim the popularity set; between trims new
+# queries get time to accumulate counts
+SEARCH_POPULARITY_TRIM_RATE = 0.01
+
+# Deletes a lock key only while it still holds the caller's token, so a holder whose
+# lock expired cannot release a lock another process took over since
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LocalLRUCache:
+    """Small thread-safe per-process LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class ViewCounterBuffer:
+    """
+    Thread-safe per-process buffer of paper views. Views are counted in memory and
+    written to Redis by a daemon thread every VIEW_BUFFER_FLUSH_MS (and at exit) with
+    one pipeline of INCRBY/ZINCRBY/HINCRBY per buffered paper, so a hot paper costs one
+    write per worker and interval instead of one per view. Views being flushed still
+    count as pending until the pipeline succeeded; a failed flush keeps them buffered.
+    There is one buffer per process (view_counter_buffer).
+    """
+
+    def __init__(self) -> None:
+        self.interval = 0.25
+        self._app: Optional[Flask] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._flushing: Dict[str, int] = {}
+        self._pid: Optional[int] = None
+        os.register_at_fork(after_in_child=self._after_fork)
+        atexit.register(self.flush)
+
+    def _after_fork(self) -> None:
+        # Views counted before the fork belong to (and are flushed by) the parent
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._counts = {}
+        self._flushing = {}
+
+    def start(self, app: Flask) -> None:
+        """Start the flush thread for `app` in this process (again in a forked child)."""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._app = app
+            self.interval = app.config.get("VIEW_BUFFER_FLUSH_MS", 250) / 1000
+            threading.Thread(target=self._run, name="view-counter-flush", daemon=True).start()
+            self._pid = os.getpid()
+
+    def add(self, paper_ids: List[str]) -> Dict[str, int]:
+        """Count one view of each paper; returns their pending (unflushed) views."""
+        with self._lock:
+            for paper_id in paper_ids:
+                self._counts[paper_id] = self._counts.get(paper_id, 0) + 1
+            return {
+                paper_id: self._counts[paper_id] + self._flushing.get(paper_id, 0)
+                for paper_id in paper_ids
+            }
+
+    def pending(self, paper_ids: List[str]) -> Dict[str, int]:
+        """Views of the papers counted in this process but not yet in Redis."""
+        with self._lock:
+            return {
+                paper_id: self._counts.get(paper_id, 0) + self._flushing.get(paper_id, 0)
+                for paper_id in paper_ids
+            }
+
+    def flush(self) -> int:
+        """Write buffered views to Redis; returns the number of views written."""
+        with self._flush_lock:
+            with self._lock:
+                self._flushing, self._counts = self._counts, {}
+            if not self._flushing or self._app is None:
+                return 0
+
+            written = 0
+            try:
+                with self._app.app_context():
+                    redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+                    now = datetime.now(timezone.utc)
+                    pipe = redis_client.pipeline(transaction=False)
+                    for paper_id, count in self._flushing.items():
+                        CacheService._queue_paper_view(pipe, paper_id, now, count)
+                    pipe.execute()
+                written = sum(self._flushing.values())
+            except Exception:
+                pass
+
+            # One step, so readers never see failed views both buffered and flushing
+            with self._lock:
+                if not written:
+                    for paper_id, count in self._flushing.items():
+                        self._counts[paper_id] = self._counts.get(paper_id, 0) + count
+                self._flushing = {}
+            return written
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+
+view_counter_buffer = ViewCounterBuffer()
 
 
 class CacheService:
     """Redis caching service for search results and username management."""
 
     @staticmethod
-    def _get_search_key(search_term: str, sort_by: str, order: str) -> str:
+    def canonicalize_search_term(search_term: str) -> str:
+        """
+        Canonical form of a $text search term, so equivalent queries share one cache
+        entry: lowercase, collapsed whitespace and, since $text ORs its terms, deduped
+        and sorted tokens (stop words dropped with SEARCH_DROP_STOPWORDS). Terms with
+        quoted phrases or negated "-word" terms are only lowercased and collapsed, as
+        $text does not treat those like plain words.
+        """
+        term = " ".join(search_term.lower().split())
+        if '"' in term or any(token.startswith("-") for token in term.split()):
+            return term
+
+        tokens = set(term.split())
+        if current_app.config.get("SEARCH_DROP_STOPWORDS", True):
+            tokens -= SEARCH_STOPWORDS
+        return " ".join(sorted(tokens))
+
+    @staticmethod
+    def _search_hash(search_term: str, filters: Optional[Dict[str, str]] = None) -> str:
+        """Fixed-length hash of a canonical search term and its structured filters."""
+        clean_filters = sorted((name, value) for name, value in (filters or {}).items() if value)
+        payload = json.dumps([search_term, clean_filters], separators=(",", ":"))
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+
+    @staticmethod
+    def _get_search_key(
+        search_term: str, sort_by: str, order: str, filters: Optional[Dict[str, str]] = None
+    ) -> str:
         """Generate Redis key for search cache."""
-        clean_term = search_term.strip().replace(" ", "_").replace(":", "_")
-        if not clean_term:
-            clean_term = "all"
-        return f"search:{clean_term}:{sort_by}:{order}"
+        search_hash = CacheService._search_hash(search_term, filters)
+        return f"search:{search_hash}:{sort_by}:{order}"
+
+    @staticmethod
+    def _get_facet_key(
+        search_term: str, facet: str, filters: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Generate Redis key for a facet block (independent of sort/order)."""
+        search_hash = CacheService._search_hash(search_term, filters)
+        return f"search:{search_hash}:facet:{facet}"
+
+    @staticmethod
+    def is_known_empty_search(search_term: str, filters: Optional[Dict[str, str]] = None) -> bool:
+        """Whether the search is in the negative cache (matched no papers, whatever the sort)."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        key = f"search:{CacheService._search_hash(search_term, filters)}:empty"
+        try:
+            return bool(redis_client.exists(key))
+        except Exception:
+            return False
 
     @staticmethod
-    def get_cached_search(search_term: str, sort_by: str, order: str) -> Optional[Dict[str, Any]]:
+    def cache_empty_search(search_term: str, filters: Optional[Dict[str, str]] = None) -> None:
+        """Remember a search without results (SEARCH_NEGATIVE_TTL_SEC, cleared on upload)."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        key = f"search:{CacheService._search_hash(search_term, filters)}:empty"
+        ttl = current_app.config.get("SEARCH_NEGATIVE_TTL_SEC", 600)
+        try:
+            redis_client.setex(key, ttl, 1)
+        except Exception:
+            pass
+
+    @staticmethod
+    def get_cached_search(
+        search_term: str, sort_by: str, order: str, filters: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, Any]]:
         """Get cached search results from Redis."""
         redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
 
-        key = CacheService._get_search_key(search_term, sort_by, order)
+        key = CacheService._get_search_key(search_term, sort_by, order, filters)
         cached_data = redis_client.get(key)
 
         if cached_data:
@@ -36,41 +286,417 @@ class CacheService:
 
     @staticmethod
     def cache_search_results(
-        search_term: str, sort_by: str, order: str, results: Dict[str, Any]
+        search_term: str,
+        sort_by: str,
+        order: str,
+        results: Dict[str, Any],
+        filters: Optional[Dict[str, str]] = None,
     ) -> None:
         """Cache search results in Redis with 5 minute TTL."""
         redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
 
-        key = CacheService._get_search_key(search_term, sort_by, order)
+        key = CacheService._get_search_key(search_term, sort_by, order, filters)
 
         try:
             redis_client.setex(key, 300, json.dumps(results))  # Cache for 300 seconds (5 minutes)
         except Exception:
             pass
 
+    @staticmethod
+    def get_cached_facets(
+        search_term: str, facets: List[str], filters: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Get cached facet blocks from Redis. Missing facets are left out of the result."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        keys = [CacheService._get_facet_key(search_term, facet, filters) for facet in facets]
+        try:
+            values = redis_client.mget(keys)
+        except Exception:
+            return {}
+
+        cached = {}
+        for facet, value in zip(facets, values):  # type: ignore[arg-type]
+            if value:
+                try:
+                    cached[facet] = json.loads(value)
+                except json.JSONDecodeError:
+                    continue
+        return cached
+
+    @staticmethod
+    def cache_facets(
+        search_term: str, facet_counts: Dict[str, Any], filters: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Cache each facet block separately in Redis with 5 minute TTL."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for facet, counts in facet_counts.items():
+                key = CacheService._get_facet_key(search_term, facet, filters)
+                pipe.setex(key, 300, json.dumps(counts))
+            pipe.execute()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _get_trending_bucket_key(hour: datetime) -> str:
+        """Generate Redis key for the hourly trending bucket containing `hour` (UTC)."""
+        return f"trending:{hour.strftime('%Y%m%d%H')}"
+
+    @staticmethod
+    def _get_view_bucket_key(hour: datetime) -> str:
+        """Generate Redis key for the hourly view-series hash containing `hour` (UTC)."""
+        return f"view_buckets:{hour.strftime('%Y%m%d%H')}"
+
+    @staticmethod
+    def _queue_paper_view(pipe: Any, paper_id: str, now: datetime, count: int = 1) -> None:
+        """
+        Queue the commands recording `count` views of a paper; INCRBY is queued first.
+        paper_views:<id> counts views not yet in MongoDB. With VIEW_PIPELINE=stream
+        the views are also appended to the view-event stream, which then is what gets
+        persisted, and the counter only serves reads until the event is applied. The
+        stream is not trimmed: events are deleted once applied, and dropping unapplied
+        ones would leave their counters raised for good.
+        """
+        bucket_key = CacheService._get_trending_bucket_key(now)
+        series_key = CacheService._get_view_bucket_key(now)
+        pipe.incrby(f"paper_views:{paper_id}", count)
+        pipe.zincrby(bucket_key, count, paper_id)
+        pipe.expire(bucket_key, TRENDING_BUCKET_TTL)
+        pipe.hincrby(series_key, paper_id, count)
+        pipe.expire(series_key, VIEW_BUCKET_TTL)
+        if current_app.config.get("VIEW_PIPELINE", "counters") == "stream":
+            pipe.xadd(
+                VIEW_EVENTS_STREAM_KEY,
+                {"p": paper_id} if count == 1 else {"p": paper_id, "n": count},
+            )
+
+    @staticmethod
+    def _view_buffer() -> Optional[ViewCounterBuffer]:
+        """The process's view buffer when VIEW_BUFFER_ENABLED, started on first use."""
+        if not current_app.config.get("VIEW_BUFFER_ENABLED", False):
+            return None
+        view_counter_buffer.start(current_app._get_current_object())  # type: ignore[attr-defined]
+        return view_counter_buffer
+
     @staticmethod
     def increment_paper_views(paper_id: str) -> int:
-        """Increment paper view count in Redis and return current count."""
+        """
+        Increment paper view count in Redis and return current count.
+        The view is also added to the current hourly trending bucket and to the
+        hourly view-series hash that the sync job flushes to MongoDB. With the view
+        buffer enabled the view is counted locally and flushed later.
+        """
         redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
 
-        key = f"paper_views:{paper_id}"
+        buffer = CacheService._view_buffer()
+        if buffer is not None:
+            return CacheService.get_paper_views_many([paper_id], buffer.add([paper_id])).get(
+                paper_id, 0
+            )
+
         try:
-            return redis_client.incr(key)  # type: ignore
+            pipe = redis_client.pipeline(transaction=False)
+            CacheService._queue_paper_view(pipe, paper_id, datetime.now(timezone.utc))
+            return pipe.execute()[0]  # type: ignore
         except Exception:
             return 0
 
+    @staticmethod
+    def increment_paper_views_many(paper_ids: List[str]) -> Dict[str, int]:
+        """Record one view of each paper in a single pipeline and return the current counts."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        buffer = CacheService._view_buffer()
+        if buffer is not None:
+            return CacheService.get_paper_views_many(paper_ids, buffer.add(paper_ids))
+
+        now = datetime.now(timezone.utc)
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for paper_id in paper_ids:
+                CacheService._queue_paper_view(pipe, paper_id, now)
+            results = pipe.execute()
+            commands_per_view = len(results) // len(paper_ids)
+            return {
+                paper_id: int(results[i * commands_per_view])
+                for i, paper_id in enumerate(paper_ids)
+            }
+        except Exception:
+            return {}
+
+    @staticmethod
+    def get_trending_paper_ids(window_hours: int, limit: int) -> List[Tuple[str, float]]:
+        """
+        Merge the hourly buckets covering the last `window_hours` hours with
+        ZUNIONSTORE and return the top `limit` (paper_id, score) pairs.
+
+        Older buckets are weighted down exponentially (TRENDING_HALF_LIFE_HOURS), and
+        the oldest bucket only counts for the part of its hour still inside the window.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        half_life = current_app.config.get("TRENDING_HALF_LIFE_HOURS", 24)
+
+        now = datetime.now(timezone.utc)
+        elapsed = (now.minute * 60 + now.second) / 3600
+        weights = {}
+        for age in range(window_hours + 1):
+            bucket_key = CacheService._get_trending_bucket_key(now - timedelta(hours=age))
+            weight = 0.5 ** (age / half_life)
+            if age == window_hours:
+                weight *= 1 - elapsed  # sliding window edge
+            if weight > 0:
+                weights[bucket_key] = weight
+
+        union_key = f"trending:union:{window_hours}h"
+        try:
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.zunionstore(union_key, weights)
+            pipe.zrevrange(union_key, 0, limit - 1, withscores=True)
+            pipe.delete(union_key)
+            return pipe.execute()[1]  # type: ignore
+        except Exception:
+            return []
+
+    @staticmethod
+    def get_cached_trending(window: str, limit: int) -> Optional[Dict[str, Any]]:
+        """Get a cached trending response from Redis."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            cached_data = redis_client.get(f"trending:cache:{window}:{limit}")
+            return json.loads(cached_data) if cached_data else None  # type: ignore
+        except Exception:
+            return None
+
+    @staticmethod
+    def cache_trending(window: str, limit: int, result: Dict[str, Any]) -> None:
+        """Cache a trending response briefly (TRENDING_CACHE_TTL_SEC)."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        ttl = current_app.config.get("TRENDING_CACHE_TTL_SEC", 60)
+        try:
+            redis_client.setex(f"trending:cache:{window}:{limit}", ttl, json.dumps(result))
+        except Exception:
+            pass
+
     @staticmethod
     def get_paper_views(paper_id: str) -> int:
-        """Get current paper view count from Redis."""
+        """Get current paper view count from Redis, plus this worker's buffered views."""
+        return CacheService.get_paper_views_many([paper_id]).get(paper_id, 0)
+
+    @staticmethod
+    def get_paper_views_many(
+        paper_ids: List[str], buffered: Optional[Dict[str, int]] = None
+    ) -> Dict[str, int]:
+        """
+        Get current Redis view counts of several papers with one MGET, plus views
+        still in this worker's buffer (`buffered`, if the caller already has them).
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        if buffered is None:
+            buffer = CacheService._view_buffer()
+            buffered = buffer.pending(paper_ids) if buffer is not None else {}
+        try:
+            values = redis_client.mget([f"paper_views:{paper_id}" for paper_id in paper_ids])
+        except Exception:
+            values = [None] * len(paper_ids)
+        return {
+            paper_id: (int(value) if value else 0) + buffered.get(paper_id, 0)
+            for paper_id, value in zip(paper_ids, values)  # type: ignore[arg-type]
+        }
+
+    @staticmethod
+    def add_unique_viewer(paper_id: str, viewer_hash: str) -> None:
+        """
+        Add a hashed viewer identity to the paper's HyperLogLog (~12KB worst case per
+        paper) and mark the paper so the sync job persists its estimate.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.pfadd(f"paper_viewers:{paper_id}", viewer_hash)
+            pipe.sadd(UNIQUE_VIEWERS_DIRTY_KEY, paper_id)
+            pipe.execute()
+        except Exception:
+            pass
+
+    @staticmethod
+    def get_unique_viewers(paper_id: str) -> int:
+        """Get the estimated number of unique viewers of a paper from Redis."""
         redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
 
-        key = f"paper_views:{paper_id}"
         try:
-            views = redis_client.get(key)
-            return int(views) if views else 0  # type: ignore
+            return int(redis_client.pfcount(f"paper_viewers:{paper_id}"))  # type: ignore
         except Exception:
             return 0
 
+    @staticmethod
+    def add_unique_viewer_many(paper_ids: List[str], viewer_hash: str) -> None:
+        """Add a viewer to the HyperLogLogs of several papers in one pipeline."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for paper_id in paper_ids:
+                pipe.pfadd(f"paper_viewers:{paper_id}", viewer_hash)
+            pipe.sadd(UNIQUE_VIEWERS_DIRTY_KEY, *paper_ids)
+            pipe.execute()
+        except Exception:
+            pass
+
+    @staticmethod
+    def get_unique_viewers_many(paper_ids: List[str]) -> Dict[str, int]:
+        """Get unique-viewer estimates of several papers with pipelined PFCOUNTs."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for paper_id in paper_ids:
+                pipe.pfcount(f"paper_viewers:{paper_id}")
+            return {paper_id: int(count) for paper_id, count in zip(paper_ids, pipe.execute())}
+        except Exception:
+            return {}
+
+    @staticmethod
+    def _detail_lru() -> LocalLRUCache:
+        """The per-process LRU of rendered paper details, created on first use."""
+        lru = current_app.extensions.get("paper_detail_lru")
+        if lru is None:
+            lru = current_app.extensions.setdefault(
+                "paper_detail_lru",
+                LocalLRUCache(
+                    current_app.config.get("DETAIL_LRU_SIZE", 1024),
+                    current_app.config.get("DETAIL_LRU_TTL_SEC", 10),
+                ),
+            )
+        return lru
+
+    @staticmethod
+    def get_cached_paper_detail(paper_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a rendered paper detail from the per-process LRU, falling back to Redis
+        (and filling the LRU on a Redis hit). Details only hold fields that never
+        change after upload; counters are cached separately (cache_paper_counters).
+        """
+        lru = CacheService._detail_lru()
+        detail = lru.get(paper_id)
+        if detail is not None:
+            return detail
+
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        try:
+            cached_data = redis_client.get(f"paper_detail:{paper_id}")
+            if not cached_data:
+                return None
+            detail = json.loads(cached_data)  # type: ignore
+        except Exception:
+            return None
+
+        lru.set(paper_id, detail)
+        return detail
+
+    @staticmethod
+    def cache_paper_detail(paper_id: str, detail: Dict[str, Any]) -> None:
+        """Cache a rendered paper detail in Redis (DETAIL_CACHE_TTL_SEC) and the local LRU."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        CacheService._detail_lru().set(paper_id, detail)
+        ttl = current_app.config.get("DETAIL_CACHE_TTL_SEC", 3600)
+        try:
+            redis_client.setex(f"paper_detail:{paper_id}", ttl, json.dumps(detail))
+        except Exception:
+            pass
+
+    @staticmethod
+    def cache_paper_counters(paper_id: str, counters: Dict[str, int]) -> None:
+        """Cache a paper's persisted views/unique_views until the sync jobs change them."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        ttl = current_app.config.get("DETAIL_CACHE_TTL_SEC", 3600)
+        try:
+            redis_client.setex(f"paper_counters:{paper_id}", ttl, json.dumps(counters))
+        except Exception:
+            pass
+
+    @staticmethod
+    def invalidate_paper_counters(paper_ids: List[str]) -> None:
+        """
+        Drop cached persisted counters of papers whose views or unique_views were
+        written to MongoDB. They live in Redis only, so every worker sees the change.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        if not paper_ids:
+            return
+        try:
+            redis_client.delete(*[f"paper_counters:{paper_id}" for paper_id in paper_ids])
+        except Exception:
+            pass
+
+    @staticmethod
+    def record_paper_detail_view(paper_id: str, viewer_hash: str) -> Dict[str, Any]:
+        """
+        Count a detail view and read the live counters in one pipeline. With the view
+        buffer enabled the view is counted locally and the pipeline only reads the
+        paper's Redis views.
+        Returns {"views": pending Redis views, "unique_views": HyperLogLog estimate,
+        "citation_count": cached count or None if it has to be recounted,
+        "stored": cached persisted counters or None if they have to be read}.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        buffer = CacheService._view_buffer()
+        buffered = buffer.add([paper_id])[paper_id] if buffer is not None else 0
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            if buffer is None:
+                CacheService._queue_paper_view(pipe, paper_id, datetime.now(timezone.utc))
+            else:
+                pipe.get(f"paper_views:{paper_id}")
+            pipe.pfadd(f"paper_viewers:{paper_id}", viewer_hash)
+            pipe.sadd(UNIQUE_VIEWERS_DIRTY_KEY, paper_id)
+            pipe.pfcount(f"paper_viewers:{paper_id}")
+            pipe.get(f"paper_citations:{paper_id}")
+            pipe.get(f"paper_counters:{paper_id}")
+            results = pipe.execute()
+            citation_count, stored = results[-2], results[-1]
+            return {
+                "views": int(results[0] or 0) + buffered,
+                "unique_views": int(results[-3]),
+                "citation_count": int(citation_count) if citation_count is not None else None,
+                "stored": json.loads(stored) if stored else None,  # type: ignore[arg-type]
+            }
+        except Exception:
+            return {"views": buffered, "unique_views": 0, "citation_count": None, "stored": None}
+
+    @staticmethod
+    def cache_citation_count(paper_id: str, count: int) -> None:
+        """Cache a paper's citation count until one of its citations changes."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        ttl = current_app.config.get("DETAIL_CACHE_TTL_SEC", 3600)
+        try:
+            redis_client.setex(f"paper_citations:{paper_id}", ttl, count)
+        except Exception:
+            pass
+
+    @staticmethod
+    def invalidate_citation_counts(paper_ids: List[str]) -> None:
+        """Drop cached citation counts of papers that just gained citations."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        if not paper_ids:
+            return
+        try:
+            redis_client.delete(*[f"paper_citations:{paper_id}" for paper_id in paper_ids])
+        except Exception:
+            pass
+
     @staticmethod
     def is_username_taken(username: str) -> bool:
         """Check if username exists in Redis cache."""
@@ -91,6 +717,83 @@ class CacheService:
         except Exception:
             pass
 
+    @staticmethod
+    def get_search_generation() -> str:
+        """
+        Current search generation. Initialized to a time-based value when missing
+        (e.g. after a Redis flush), so ETags issued before can never match again.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            generation = redis_client.get(SEARCH_GENERATION_KEY)
+            if generation is None:
+                redis_client.set(SEARCH_GENERATION_KEY, time.time_ns(), nx=True)
+                generation = redis_client.get(SEARCH_GENERATION_KEY)
+            return str(generation)
+        except Exception:
+            return ""
+
+    @staticmethod
+    def record_search(search_term: str, filters: Optional[Dict[str, str]] = None) -> None:
+        """
+        Count a request for a canonical search in the popularity sorted set. A sample
+        of SEARCH_POPULARITY_TRIM_RATE calls trims the set to its
+        SEARCH_POPULARITY_TRACKED most popular members, which bounds its size.
+        """
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        clean_filters = {name: value for name, value in sorted((filters or {}).items()) if value}
+        member = json.dumps([search_term, clean_filters], separators=(",", ":"))
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.zincrby(SEARCH_POPULARITY_KEY, 1, member)
+            if random.random() < SEARCH_POPULARITY_TRIM_RATE:
+                keep = current_app.config.get("SEARCH_POPULARITY_TRACKED", 1000)
+                pipe.zremrangebyrank(SEARCH_POPULARITY_KEY, 0, -keep - 1)
+            pipe.execute()
+        except Exception:
+            pass
+
+    @staticmethod
+    def get_popular_searches(limit: int) -> List[Tuple[str, Dict[str, str]]]:
+        """The `limit` most requested searches as (term, filters), most popular first."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        try:
+            members = redis_client.zrevrange(SEARCH_POPULARITY_KEY, 0, limit - 1)
+        except Exception:
+            return []
+
+        searches = []
+        for member in members:  # type: ignore[union-attr]
+            search_term, filters = json.loads(member)
+            searches.append((search_term, filters))
+        return searches
+
+    @staticmethod
+    def acquire_lock(key: str, ttl: int) -> Optional[str]:
+        """Take a Redis lock for `ttl` seconds; returns the owner token, or None if it is held."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        token = uuid.uuid4().hex
+        return token if redis_client.set(key, token, nx=True, ex=ttl) else None
+
+    @staticmethod
+    def release_lock(key: str, token: str) -> bool:
+        """Release a lock taken with acquire_lock, unless it expired and was taken over."""
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        script = current_app.extensions.get("release_lock_script")
+        if script is None:
+            script = current_app.extensions.setdefault(
+                "release_lock_script", redis_client.register_script(RELEASE_LOCK_SCRIPT)
+            )
+        try:
+            return bool(script(keys=[key], args=[token]))
+        except Exception:
+            return False
+
     @staticmethod
     def invalidate_search_cache() -> None:
         """Invalidate all search cache entries (called when new papers are added)."""
@@ -100,5 +803,7 @@ class CacheService:
             search_keys = redis_client.keys("search:*")
             if search_keys:
                 redis_client.delete(*search_keys)  # type: ignore
+            # Bump after deleting, so a new generation is never paired with stale results
+            redis_client.incr(SEARCH_GENERATION_KEY)
         except Exception:
             pass
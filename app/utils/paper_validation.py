@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import re
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 
+def is_integer(value: str) -> bool:
+    """Whether a query parameter is a non-negative integer (str.isdigit also accepts "²")."""
+    return re.fullmatch(r"[0-9]+", value) is not None
+
+
 def validate_title(title: str) -> Optional[str]:
     """Validate paper title: required, max 200 chars."""
     if not title or not title.strip():
@@ -134,14 +139,177 @@ def validate_paper_data(data: Dict[str, Any]) -> List[str]:
     return errors
 
 
-def validate_search_params(search: str, sort_by: str, order: str) -> List[str]:
+SEARCH_SORT_FIELDS = ["publication_date", "relevance", "impact"]
+
+SEARCH_ORDERS = ["asc", "desc"]
+
+SEARCH_FACETS = ["keywords", "journal_conference", "year"]
+
+
+SEARCH_FILTER_LIMITS = {"author": 100, "keyword": 50, "venue": 200}
+
+
+def validate_search_filters(filters: Dict[str, str]) -> List[str]:
+    """Validate structured search filters (author, keyword, venue, from, to)."""
+    errors = []
+
+    for name, max_length in SEARCH_FILTER_LIMITS.items():
+        value = filters.get(name, "")
+        if len(value) > max_length:
+            errors.append(f"{name} must be at most {max_length} characters")
+
+    dates = {}
+    for name in ("from", "to"):
+        value = filters.get(name, "")
+        if not value:
+            continue
+        try:
+            date = datetime.fromisoformat(value)
+        except ValueError:
+            errors.append(f"{name} must be in ISO format (YYYY-MM-DD)")
+            continue
+        # Dates with an offset are compared in UTC, like the naive UTC dates stored
+        if date.tzinfo is not None:
+            date = date.astimezone(timezone.utc).replace(tzinfo=None)
+        dates[name] = date
+
+    if "from" in dates and "to" in dates and dates["from"] > dates["to"]:
+        errors.append("from must not be after to")
+
+    return errors
+
+
+def validate_search_params(
+    search: str,
+    sort_by: str,
+    order: str,
+    facets: Optional[List[str]] = None,
+    filters: Optional[Dict[str, str]] = None,
+) -> List[str]:
     """Validate search query parameters."""
     errors = []
 
-    if sort_by not in ["publication_date", "relevance"]:
-        errors.append("sort_by must be 'publication_date' or 'relevance'")
+    if sort_by not in SEARCH_SORT_FIELDS:
+        errors.append("sort_by must be 'publication_date', 'relevance' or 'impact'")
 
-    if order not in ["asc", "desc"]:
+    if order not in SEARCH_ORDERS:
         errors.append("order must be 'asc' or 'desc'")
 
+    for facet in facets or []:
+        if facet not in SEARCH_FACETS:
+            errors.append(f"facets must be a comma-separated subset of {', '.join(SEARCH_FACETS)}")
+            break
+
+    errors.extend(validate_search_filters(filters or {}))
+
+    return errors
+
+
+def validate_suggest_params(query: str, limit: str) -> List[str]:
+    """Validate autocomplete query parameters."""
+    errors = []
+
+    if not query or not query.strip():
+        errors.append("q is required")
+    elif len(query) > 200:
+        errors.append("q must be at most 200 characters")
+
+    if not is_integer(limit) or not 1 <= int(limit) <= 20:
+        errors.append("limit must be an integer between 1 and 20")
+
+    return errors
+
+
+TRENDING_WINDOWS = {"1h": 1, "24h": 24, "7d": 168}
+
+
+def validate_trending_params(window: str, limit: str) -> List[str]:
+    """Validate trending query parameters."""
+    errors = []
+
+    if window not in TRENDING_WINDOWS:
+        errors.append(f"window must be one of {', '.join(TRENDING_WINDOWS)}")
+
+    if not is_integer(limit) or not 1 <= int(limit) <= 50:
+        errors.append("limit must be an integer between 1 and 50")
+
+    return errors
+
+
+VIEW_SERIES_GRANULARITIES = ["hour", "day", "week", "month"]
+
+
+def validate_view_series_params(granularity: str, start: str, end: str) -> List[str]:
+    """Validate view time series query parameters."""
+    errors = []
+
+    if granularity not in VIEW_SERIES_GRANULARITIES:
+        errors.append(f"granularity must be one of {', '.join(VIEW_SERIES_GRANULARITIES)}")
+
+    errors.extend(validate_search_filters({"from": start, "to": end}))
+
+    return errors
+
+
+GRAPH_DIRECTIONS = ["out", "in", "both"]
+
+
+def validate_graph_direction(direction: str) -> List[str]:
+    """Validate the direction of a citation graph traversal."""
+    if direction not in GRAPH_DIRECTIONS:
+        return [f"direction must be one of {', '.join(GRAPH_DIRECTIONS)}"]
+    return []
+
+
+def validate_graph_params(direction: str, k: str, max_hops: int, limit: str = "100") -> List[str]:
+    """Validate citation graph query parameters."""
+    errors = validate_graph_direction(direction)
+
+    if not is_integer(k) or not 1 <= int(k) <= max_hops:
+        errors.append(f"k must be an integer between 1 and {max_hops}")
+
+    if not is_integer(limit) or not 1 <= int(limit) <= 500:
+        errors.append("limit must be an integer between 1 and 500")
+
+    return errors
+
+
+def validate_page_params(after: str, limit: str) -> List[str]:
+    """Validate keyset pagination parameters."""
+    errors = []
+
+    if after and not re.match(r"^[0-9a-fA-F]{24}$", after):
+        errors.append("after must be a cursor returned by a previous page")
+
+    if not is_integer(limit) or not 1 <= int(limit) <= 100:
+        errors.append("limit must be an integer between 1 and 100")
+
+    return errors
+
+
+def validate_limit_param(limit: str, maximum: int = 50) -> List[str]:
+    """Validate a plain limit query parameter."""
+    errors = []
+
+    if not is_integer(limit) or not 1 <= int(limit) <= maximum:
+        errors.append(f"limit must be an integer between 1 and {maximum}")
+
+    return errors
+
+
+# Maximum number of papers fetched by one multi-get request
+BATCH_MAX_IDS = 100
+
+
+def validate_batch_ids(ids: Any) -> List[str]:
+    """Validate the ID list of a multi-get request (malformed IDs are reported as not found)."""
+    errors = []
+
+    if not isinstance(ids, list) or not ids:
+        errors.append("ids must be a non-empty list of paper IDs")
+    elif not all(isinstance(pid, str) for pid in ids):
+        errors.append("ids must be strings")
+    elif len(ids) > BATCH_MAX_IDS:
+        errors.append(f"At most {BATCH_MAX_IDS} ids can be requested at once")
+
     return errors
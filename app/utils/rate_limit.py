@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import math
+import os
+import socket
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import redis
+from bson import ObjectId
+from flask import Flask, current_app, g, jsonify, request
+from pymongo import monitoring
+
+from .auth import get_client_ip
+
+# Endpoint -> budget class. Endpoints not listed here are neither limited nor shed.
+ENDPOINT_CLASSES = {
+    "papers.search_papers": "search",
+    "papers.suggest_papers": "suggest",
+    "papers.paper_detail": "detail",
+    "papers.paper_batch_get": "detail",
+    "papers.paper_batch_post": "detail",
+    "papers.upload_paper": "upload",
+    "papers.upload_status": "detail",
+    "auth.signup": "auth",
+    "auth.login": "auth",
+}
+
+INFLIGHT_KEY = "inflight_requests"
+
+# Hash of "<latency ms>:<unix time>" per serving process (host-pid), so processes that
+# serve no requests (the scheduler) can see MongoDB latency. Reports are written at most
+# every LATENCY_REPORT_INTERVAL_SEC and ignored once older than LATENCY_REPORT_MAX_AGE_SEC.
+MONGO_LATENCY_KEY = "mongo_latency"
+LATENCY_REPORT_INTERVAL_SEC = 1.0
+LATENCY_REPORT_MAX_AGE_SEC = 10.0
+
+# Requests older than this are assumed dead (worker killed) and no longer counted in flight
+INFLIGHT_STALE_SEC = 60
+
+# Atomic token bucket over one or more keys (per-IP and per-user). Tokens are refilled
+# from the elapsed time since the last update using the Redis server clock, and taken
+# from every bucket only if all of them can pay. Returns {allowed, retry_after_ms}.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local rate = tonumber(ARGV[1]) / 1000
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local ttl = math.ceil(burst / rate)
+
+local tokens = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    available = math.min(burst, available + math.max(0, now - updated) * rate)
+    tokens[i] = available
+    if available < cost then
+        wait = math.max(wait, math.ceil((cost - available) / rate))
+    end
+end
+
+if wait > 0 then
+    return {0, wait}
+end
+
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, 'tokens', tostring(tokens[i] - cost), 'ts', now)
+    redis.call('PEXPIRE', key, ttl)
+end
+return {1, 0}
+"""
+
+
+class MongoLatencyMonitor(monitoring.CommandListener):
+    """
+    Per-process exponentially weighted moving average of MongoDB command latency.
+    The average decays towards zero while no commands run, so shedding requests
+    (and with them Mongo traffic) cannot keep the process shedding forever.
+    """
+
+    def __init__(self, alpha: float = 0.2, half_life_sec: float = 5.0) -> None:
+        self.alpha = alpha
+        self.half_life_sec = half_life_sec
+        self._ewma_ms = 0.0
+        self._updated_at = time.monotonic()
+        self._reported_at = 0.0
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._record(event.duration_micros / 1000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._record(event.duration_micros / 1000)
+
+    def _record(self, duration_ms: float) -> None:
+        self._ewma_ms = self.alpha * duration_ms + (1 - self.alpha) * self.latency_ms()
+        self._updated_at = time.monotonic()
+
+    def latency_ms(self) -> float:
+        idle = time.monotonic() - self._updated_at
+        return self._ewma_ms * 0.5 ** (idle / self.half_life_sec)
+
+    def report(self, redis_client: redis.Redis) -> None:
+        """Publish this process's average to Redis, at most every LATENCY_REPORT_INTERVAL_SEC."""
+        now = time.monotonic()
+        if now - self._reported_at < LATENCY_REPORT_INTERVAL_SEC:
+            return
+        self._reported_at = now
+        redis_client.hset(
+            MONGO_LATENCY_KEY,
+            f"{socket.gethostname()}-{os.getpid()}",
+            f"{self.latency_ms():.3f}:{time.time():.3f}",
+        )
+
+
+mongo_latency = MongoLatencyMonitor()
+
+
+def cluster_mongo_latency_ms(redis_client: redis.Redis) -> float:
+    """
+    Highest MongoDB latency average recently reported by the serving processes
+    (0 when none reported). Reports of processes gone quiet are dropped.
+    """
+    now = time.time()
+    worst = 0.0
+    stale = []
+    reports: Dict[str, str] = redis_client.hgetall(MONGO_LATENCY_KEY)  # type: ignore[assignment]
+    for process, report in reports.items():
+        latency, reported_at = (float(part) for part in report.split(":"))
+        if now - reported_at > LATENCY_REPORT_MAX_AGE_SEC:
+            stale.append(process)
+        else:
+            worst = max(worst, latency)
+    if stale:
+        redis_client.hdel(MONGO_LATENCY_KEY, *stale)
+    return worst
+
+
+def parse_budget(value: str) -> Tuple[float, float]:
+    """
+    Parse a "<tokens per second>,<burst>" budget. Both must be positive (the token
+    bucket script divides by the rate) and a burst must hold at least one token.
+    """
+    rate, burst = (float(part) for part in value.split(","))
+    if not rate > 0 or not burst >= 1:
+        raise ValueError(f"Invalid rate limit budget {value!r}: need rate > 0 and burst >= 1")
+    return rate, burst
+
+
+def _bucket_keys(endpoint_class: str) -> List[str]:
+    """
+    Per-IP bucket, plus a per-user bucket when a well-formed X-User-ID is sent. The IP
+    is the proxy-resolved remote address, so X-Forwarded-For cannot be used to switch buckets.
+    """
+    keys = [f"ratelimit:{endpoint_class}:ip:{get_client_ip()}"]
+    user_id = request.headers.get("X-User-ID", "")
+    if ObjectId.is_valid(user_id):
+        keys.append(f"ratelimit:{endpoint_class}:user:{user_id}")
+    return keys
+
+
+def _take_token(redis_client: redis.Redis, endpoint_class: str) -> Optional[int]:
+    """Take one token; returns None if allowed, else milliseconds until a retry can pass."""
+    script = current_app.extensions.get("rate_limit_script")
+    if script is None:
+        script = current_app.extensions.setdefault(
+            "rate_limit_script", redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        )
+
+    budget = current_app.config.get(f"RATE_LIMIT_{endpoint_class.upper()}", "")
+    if not budget:
+        return None
+    rate, burst = parse_budget(budget)
+
+    allowed, retry_after_ms = script(keys=_bucket_keys(endpoint_class), args=[rate, burst, 1])
+    return None if allowed else int(retry_after_ms)
+
+
+def _overloaded(redis_client: redis.Redis) -> bool:
+    """
+    Check the load-shedding thresholds: the Mongo latency average of this process, and
+    the number of limited requests in flight across all workers (tracked in a ZSET so
+    requests of killed workers age out). Registers the current request as in flight.
+    """
+    max_latency = current_app.config.get("LOAD_SHED_MONGO_LATENCY_MS", 500)
+    if mongo_latency.latency_ms() > max_latency:
+        return True
+
+    now = time.time()
+    request_id = uuid.uuid4().hex
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zremrangebyscore(INFLIGHT_KEY, "-inf", now - INFLIGHT_STALE_SEC)
+    pipe.zadd(INFLIGHT_KEY, {request_id: now})
+    pipe.zcard(INFLIGHT_KEY)
+    in_flight = pipe.execute()[-1]
+    g.inflight_request_id = request_id
+
+    return in_flight > current_app.config.get("LOAD_SHED_MAX_IN_FLIGHT", 64)
+
+
+def init_app(app: Flask) -> None:
+    """Register per-endpoint-class rate limiting and load shedding on the app."""
+    # Fail at startup on a malformed budget instead of failing open on every request
+    for endpoint_class in set(ENDPOINT_CLASSES.values()):
+        budget = app.config.get(f"RATE_LIMIT_{endpoint_class.upper()}", "")
+        if budget:
+            parse_budget(budget)
+
+    @app.before_request
+    def guard_request():
+        endpoint_class = ENDPOINT_CLASSES.get(request.endpoint or "")
+        if endpoint_class is None:
+            return None
+
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+
+        # Redis problems must not take the API down: fail open
+        try:
+            if current_app.config.get("LOAD_SHED_ENABLED", False) and _overloaded(redis_client):
+                response = jsonify({"error": "Service overloaded, try again later"})
+                response.headers["Retry-After"] = "1"
+                return response, 503
+
+            if current_app.config.get("RATE_LIMIT_ENABLED", True):
+                retry_after_ms = _take_token(redis_client, endpoint_class)
+                if retry_after_ms is not None:
+                    retry_after = max(1, math.ceil(retry_after_ms / 1000))
+                    response = jsonify({"error": "Too many requests", "retry_after": retry_after})
+                    response.headers["Retry-After"] = str(retry_after)
+                    return response, 429
+        except Exception:
+            pass
+
+        return None
+
+    @app.teardown_request
+    def release_request(exc=None):
+        redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+        try:
+            mongo_latency.report(redis_client)
+            request_id = g.pop("inflight_request_id", None)
+            if request_id is not None:
+                redis_client.zrem(INFLIGHT_KEY, request_id)
+        except Exception:
+            pass
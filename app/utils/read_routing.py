@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import redis
+from bson import json_util
+from flask import Flask, current_app, g, has_request_context, request
+from pymongo import read_preferences
+from pymongo.client_session import ClientSession
+from pymongo.database import Database
+
+# Secondary-capable modes accepted by MONGO_READ_PREFERENCE ("primary" routes nothing)
+READ_PREFERENCES = {
+    "primaryPreferred": read_preferences.PrimaryPreferred,
+    "secondary": read_preferences.Secondary,
+    "secondaryPreferred": read_preferences.SecondaryPreferred,
+    "nearest": read_preferences.Nearest,
+}
+
+
+def read_database(db: Database, mode: str, max_staleness_sec: int) -> Database:
+    """
+    Handle of `db` for search, detail and listing reads. Other modes than "primary"
+    may be served by secondaries lagging at most `max_staleness_sec` (90s minimum).
+    """
+    if mode == "primary":
+        return db
+    if mode not in READ_PREFERENCES:
+        raise ValueError(f"Unknown MONGO_READ_PREFERENCE: {mode}")
+    return db.with_options(read_preference=READ_PREFERENCES[mode](max_staleness=max_staleness_sec))
+
+
+def read_db() -> Database:
+    """Database handle for reads that tolerate replication lag."""
+    return current_app.mongo_read_db  # type: ignore[attr-defined]
+
+
+def routes_to_secondaries() -> bool:
+    return current_app.mongo_read_db is not current_app.mongo_db  # type: ignore[attr-defined]
+
+
+def _causal_key(user_id: str) -> str:
+    return f"causal:{user_id}"
+
+
+def causal_session() -> Optional[ClientSession]:
+    """
+    The request's causally consistent session when MONGO_CAUSAL_READS is on and reads
+    may go to secondaries, else None. It starts from the cluster and operation time of
+    the user's last write (kept in Redis), so secondary reads of the same user wait
+    until that write has replicated.
+    """
+    if not has_request_context() or not current_app.config.get("MONGO_CAUSAL_READS", False):
+        return None
+    if not routes_to_secondaries():
+        return None
+
+    session = g.get("mongo_session")
+    if session is None:
+        session = current_app.mongo_client.start_session(  # type: ignore[attr-defined]
+            causal_consistency=True
+        )
+        g.mongo_session = session
+        user_id = request.headers.get("X-User-ID")
+        if user_id:
+            redis_client: redis.Redis = current_app.redis  # type: ignore[attr-defined]
+            try:
+                saved = redis_client.get(_causal_key(user_id))
+                if saved:
+                    times = json_util.loads(saved)  # type: ignore[arg-type]
+                    session.advance_cluster_time(times["cluster_time"])
+                    session.advance_operation_time(times["operation_time"])
+            except Exception:
+                pass
+    return session
+
+
+def write_session() -> Optional[ClientSession]:
+    """causal_session() for writes; the user's later reads are ordered after them."""
+    session = causal_session()
+    if session is not None:
+        g.mongo_session_wrote = True
+    return session
+
+
+def init_app(app: Flask) -> None:
+    """Remember the operation time of a request's writes for the user's later reads."""
+
+    @app.teardown_request
+    def end_causal_session(exc=None):
+        session = g.pop("mongo_session", None)
+        if session is None:
+            return
+        try:
+            user_id = request.headers.get("X-User-ID")
+            if g.pop("mongo_session_wrote", False) and user_id and session.operation_time:
+                # Past the staleness bound secondaries have caught up anyway
+                current_app.redis.setex(  # type: ignore[attr-defined]
+                    _causal_key(user_id),
+                    current_app.config.get("MONGO_MAX_STALENESS_SEC", 90),
+                    json_util.dumps(
+                        {
+                            "cluster_time": session.cluster_time,
+                            "operation_time": session.operation_time,
+                        }
+                    ),
+                )
+        except Exception:
+            pass
+        finally:
+            session.end_session()
@@ -0,0 +1,50 @@
+"""
+Gunicorn hooks. With --preload the app is created once in the master: indexes are
+ensured there, and workers share the loaded code copy-on-write. Each worker then opens
+its own MongoDB and Redis clients.
+
+Background jobs run in a dedicated child process (scheduler_main.py) started once the
+master is ready, never in the master (which only supervises workers) or in a worker.
+"""
+
+import os
+import subprocess
+import sys
+
+from dotenv import load_dotenv  # type: ignore
+
+# Load .env first, so ENABLE_SCHEDULER set only there is honoured (wsgi.py loads it too,
+# but only once the app is imported, after the flag below is overridden)
+load_dotenv()
+
+# Read before the app is loaded: the master and workers must not start the scheduler
+run_scheduler = os.getenv("ENABLE_SCHEDULER", "true").lower() == "true"
+os.environ["ENABLE_SCHEDULER"] = "false"
+
+
+def when_ready(server):
+    if not run_scheduler:
+        return
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scheduler_main.py")
+    server.scheduler_process = subprocess.Popen(
+        [sys.executable, script], env={**os.environ, "ENABLE_SCHEDULER": "true"}
+    )
+    server.log.info("Started scheduler process %s", server.scheduler_process.pid)
+
+
+def on_exit(server):
+    process = getattr(server, "scheduler_process", None)
+    if process is None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def post_fork(server, worker):
+    from app.extensions import init_process_clients
+    from wsgi import app
+
+    init_process_clients(app)
@@ -0,0 +1,32 @@
+from dotenv import load_dotenv  # type: ignore
+import os
+import signal
+import threading
+
+# Load .env before the app reads its configuration
+load_dotenv()
+
+from app import create_app  # noqa: E402
+from app.scheduler import scheduler  # noqa: E402
+
+# Dedicated scheduler process. gunicorn.conf.py starts it from the master's when_ready
+# hook, so background jobs run neither in the master nor in a request-serving worker.
+# It can also run on its own: python scheduler_main.py
+
+
+def main() -> None:
+    app = create_app()
+    if not app.config.get("ENABLE_SCHEDULER", True):
+        print("[scheduler] ENABLE_SCHEDULER is false, no jobs to run")
+        return
+    print(f"[scheduler] Running jobs for app={app.config.get('APP_NAME')} pid={os.getpid()}")
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    stopped.wait()
+    scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
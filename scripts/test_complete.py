@@ -10,6 +10,7 @@ import time
 import sys
 import random
 import string
+import uuid
 from typing import Dict, Any, Tuple, List
 
 # Configuration
@@ -286,6 +287,102 @@ def test_paper_upload(user_id: str) -> Tuple[bool, str]:
         log_test("Paper Upload", False, f"Error: {e}")
         return False, ""
 
+def test_duplicate_paper_upload(user_id: str) -> bool:
+    """Test that re-uploading the same paper is flagged (or rejected) as a near-duplicate"""
+    try:
+        paper_data = {
+            "title": f"Test Paper: Advanced Machine Learning Techniques {TEST_ID}",
+            "authors": ["Dr. Test Author"],
+            "abstract": "This is a comprehensive test paper abstract describing advanced machine learning techniques and their applications in various domains. The paper covers novel approaches to computer vision, natural language processing, and reinforcement learning.",
+            "publication_date": "2024-01-15",
+            "keywords": ["machine learning", "test"],
+            "citations": []
+        }
+        response = requests.post(
+            f"{BASE_URL}/papers/", json=paper_data, headers={"X-User-ID": user_id}, timeout=10
+        )
+        data = response.json()
+        if response.status_code == 201:
+            duplicates = data.get("possible_duplicates", [])
+        else:
+            duplicates = data.get("duplicates", [])
+        success = response.status_code in (201, 409) and len(duplicates) > 0
+        log_test("Duplicate Paper Upload", success, f"Status: {response.status_code}, {len(duplicates)} duplicates")
+        return success
+
+    except Exception as e:
+        log_test("Duplicate Paper Upload", False, f"Error: {e}")
+        return False
+
+def test_upload_ticket_not_found(user_id: str) -> bool:
+    """Test that unknown upload tickets are not found"""
+    try:
+        headers = {"X-User-ID": user_id}
+        response = requests.get(f"{BASE_URL}/papers/uploads/{uuid.uuid4().hex}", headers=headers, timeout=10)
+        success = response.status_code == 404
+
+        log_test("Upload Ticket Not Found", success, f"Status: {response.status_code}")
+        return success
+
+    except Exception as e:
+        log_test("Upload Ticket Not Found", False, f"Error: {e}")
+        return False
+
+def test_async_upload_flow(user_id: str) -> bool:
+    """Test a queued upload (UPLOAD_MODE=async): 202, ticket becomes created, paper is readable"""
+    try:
+        headers = {"X-User-ID": user_id}
+        paper_data = {
+            "title": f"Queued Paper on Write-Behind Uploads {TEST_ID}",
+            "authors": ["Dr. Queue Tester"],
+            "abstract": f"Queued upload {TEST_ID} checking that the upload consumers insert papers in batches.",
+            "publication_date": "2024-02-01",
+            "keywords": ["queue", "test"],
+            "citations": [],
+        }
+        response = requests.post(
+            f"{BASE_URL}/papers/", json=paper_data, headers=headers, timeout=10
+        )
+        if response.status_code == 201:
+            log_test(
+                "Async Upload Flow", True, "Server runs UPLOAD_MODE=sync (201), queue not in use"
+            )
+            return True
+        if response.status_code != 202:
+            log_test("Async Upload Flow", False, f"Status: {response.status_code}")
+            return False
+
+        queued = response.json()
+        ticket = {}
+        deadline = time.time() + 20
+        while time.time() < deadline:
+            ticket = requests.get(
+                f"{BASE_URL}{queued['status_url']}", headers=headers, timeout=10
+            ).json()
+            if ticket.get("status") != "queued":
+                break
+            time.sleep(0.5)
+
+        detail = requests.get(f"{BASE_URL}/papers/{queued['paper_id']}", timeout=10)
+        success = (
+            response.headers.get("Location") == queued["status_url"]
+            and ticket.get("status") == "created"
+            and ticket.get("paper_id") == queued["paper_id"]
+            and detail.status_code == 200
+            and detail.json().get("id") == queued["paper_id"]
+        )
+        log_test(
+            "Async Upload Flow",
+            success,
+            f"Ticket status: {ticket.get('status')}, detail status: {detail.status_code}",
+        )
+        return success
+
+    except Exception as e:
+        log_test("Async Upload Flow", False, f"Error: {e}")
+        return False
+
+
 def test_paper_upload_without_auth() -> bool:
     """Test paper upload without authentication"""
     try:
@@ -359,6 +456,17 @@ def test_paper_search() -> bool:
         else:
             log_test("Paper Search (Sorted)", False, f"Status: {response.status_code}")
             return False
+
+        # Test 4: Search sorted by PageRank impact
+        response = requests.get(f"{BASE_URL}/papers/?sort_by=impact", timeout=10)
+        success = response.status_code == 200
+
+        if success:
+            papers = response.json().get("papers", [])
+            log_test("Paper Search (Impact)", True, f"Found {len(papers)} papers sorted by impact")
+        else:
+            log_test("Paper Search (Impact)", False, f"Status: {response.status_code}")
+            return False
             
         return True
         
@@ -366,6 +474,91 @@ def test_paper_search() -> bool:
         log_test("Paper Search", False, f"Error: {e}")
         return False
 
+def test_paper_search_facets() -> bool:
+    """Test facet counts returned alongside search results"""
+    try:
+        response = requests.get(
+            f"{BASE_URL}/papers/?sort_by=publication_date&facets=keywords,journal_conference,year",
+            timeout=10,
+        )
+        success = response.status_code == 200
+
+        if success:
+            facets = response.json().get("facets", {})
+            success = set(facets) == {"keywords", "journal_conference", "year"}
+            log_test("Paper Search (Facets)", success,
+                    f"Keywords: {len(facets.get('keywords', []))}, Years: {len(facets.get('year', []))}")
+        else:
+            log_test("Paper Search (Facets)", False, f"Status: {response.status_code}")
+
+        return success
+
+    except Exception as e:
+        log_test("Paper Search (Facets)", False, f"Error: {e}")
+        return False
+
+def test_paper_search_filters() -> bool:
+    """Test structured search filters"""
+    try:
+        response = requests.get(
+            f"{BASE_URL}/papers/?keyword=machine+learning&from=2020-01-01&sort_by=publication_date",
+            timeout=10,
+        )
+        success = response.status_code == 200
+
+        if not success:
+            log_test("Paper Search (Filters)", False, f"Status: {response.status_code}")
+            return False
+
+        papers = response.json().get("papers", [])
+        success = all(
+            "machine learning" in p["keywords"] and p["publication_date"] >= "2020-01-01"
+            for p in papers
+        )
+        log_test("Paper Search (Filters)", success, f"Found {len(papers)} matching papers")
+
+        # Inverted date range should be rejected
+        response = requests.get(f"{BASE_URL}/papers/?from=2024-01-01&to=2020-01-01", timeout=10)
+        range_ok = response.status_code == 400
+        log_test("Paper Search (Filter Validation)", range_ok, f"Status: {response.status_code}")
+
+        # A date with an offset is compared with a plain date in UTC instead of failing
+        mixed = requests.get(f"{BASE_URL}/papers/", params={"from": "2020-01-01T00:00:00+02:00", "to": "2024-01-01"}, timeout=10)
+        mixed_inverted = requests.get(f"{BASE_URL}/papers/", params={"from": "2024-01-01T00:00:00+05:00", "to": "2020-01-01"}, timeout=10)
+        # Non-ASCII digits ("²".isdigit() is True) are rejected, not passed to int()
+        superscript = requests.get(f"{BASE_URL}/papers/suggest", params={"q": "test", "limit": "²"}, timeout=10)
+        mixed_ok = mixed.status_code == 200 and mixed_inverted.status_code == 400 and superscript.status_code == 400
+        log_test("Paper Search (Mixed Offsets, Non-ASCII Digits)", mixed_ok,
+                f"Offset/plain: {mixed.status_code}, inverted: {mixed_inverted.status_code}, limit=²: {superscript.status_code}")
+        return success and range_ok and mixed_ok
+
+    except Exception as e:
+        log_test("Paper Search (Filters)", False, f"Error: {e}")
+        return False
+
+def test_paper_suggest() -> bool:
+    """Test prefix autocomplete for titles and keywords"""
+    try:
+        response = requests.get(f"{BASE_URL}/papers/suggest?q=test+paper+adv", timeout=10)
+        success = response.status_code == 200
+
+        if not success:
+            log_test("Paper Suggest", False, f"Status: {response.status_code}")
+            return False
+
+        suggestions = response.json().get("suggestions", [])
+        log_test("Paper Suggest", True, f"Got {len(suggestions)} suggestions for 'test paper adv'")
+
+        # Missing prefix should be rejected
+        response = requests.get(f"{BASE_URL}/papers/suggest", timeout=10)
+        success = response.status_code == 400
+        log_test("Paper Suggest (Validation)", success, f"Status: {response.status_code}")
+        return success
+
+    except Exception as e:
+        log_test("Paper Suggest", False, f"Error: {e}")
+        return False
+
 def test_paper_detail(paper_id: str) -> bool:
     """Test paper detail endpoint with view tracking"""
     if not paper_id:
@@ -561,6 +754,44 @@ def test_admin_manual_sync() -> bool:
         log_test("Admin Manual Sync", False, f"Error: {e}")
         return False
 
+def test_admin_slow_queries() -> bool:
+    """Test the slow-query report endpoint"""
+    try:
+        response = requests.get(f"{BASE_URL}/admin/slow-queries?limit=5", timeout=10)
+        success = response.status_code == 200 and isinstance(response.json().get("shapes"), list)
+
+        invalid = requests.get(f"{BASE_URL}/admin/slow-queries?limit=0", timeout=10)
+        success = success and invalid.status_code == 400
+
+        shapes = response.json().get("shapes", []) if response.status_code == 200 else []
+        log_test("Admin Slow Queries", success,
+                f"Status: {response.status_code}, Shapes: {len(shapes)}, Invalid limit: {invalid.status_code}")
+        return success
+
+    except Exception as e:
+        log_test("Admin Slow Queries", False, f"Error: {e}")
+        return False
+
+def test_admin_index_advice() -> bool:
+    """Test the index advisor endpoint"""
+    try:
+        response = requests.get(f"{BASE_URL}/admin/index-advice", timeout=10)
+        success = response.status_code == 200
+        if success:
+            data = response.json()
+            success = isinstance(data.get("missing_indexes"), list) and isinstance(
+                data.get("unused_indexes"), list
+            )
+            log_test("Admin Index Advice", success,
+                    f"Shapes: {data.get('shapes_recorded', 0)}", data.get("message", ""))
+        else:
+            log_test("Admin Index Advice", False, f"Status: {response.status_code}")
+        return success
+
+    except Exception as e:
+        log_test("Admin Index Advice", False, f"Error: {e}")
+        return False
+
 # ===================== CACHE TESTS =====================
 
 def test_search_cache() -> bool:
@@ -602,6 +833,43 @@ def test_search_cache() -> bool:
         log_test("Search Cache", False, f"Error: {e}")
         return False
 
+def test_canonical_search() -> bool:
+    """Test that equivalent search terms return the same results"""
+    try:
+        response1 = requests.get(f"{BASE_URL}/papers/?search=Machine++Learning", timeout=10)
+        response2 = requests.get(f"{BASE_URL}/papers/?search=learning+the+machine", timeout=10)
+        response3 = requests.get(f"{BASE_URL}/papers/?search=the+of", timeout=10)
+
+        if 200 != response1.status_code or 200 != response2.status_code:
+            log_test("Canonical Search", False, "Search requests failed")
+            return False
+
+        same_results = response1.json() == response2.json()
+        stopwords_empty = response3.status_code == 200 and response3.json().get("papers") == []
+
+        success = same_results and stopwords_empty
+        log_test("Canonical Search", success,
+                f"Equivalent terms match: {same_results}, stop words only empty: {stopwords_empty}")
+        return success
+
+    except Exception as e:
+        log_test("Canonical Search", False, f"Error: {e}")
+        return False
+
+def test_search_warm() -> bool:
+    """Test warming the search cache for popular queries"""
+    try:
+        response = requests.post(f"{BASE_URL}/admin/search-warm-now", timeout=60)
+        success = response.status_code == 200 and response.json().get("status") == "success"
+
+        log_test("Search Warm", success,
+                f"Status: {response.status_code}", response.json().get("message", ""))
+        return success
+
+    except Exception as e:
+        log_test("Search Warm", False, f"Error: {e}")
+        return False
+
 def test_cache_invalidation(user_id: str) -> bool:
     """Test cache invalidation when new paper is added"""
     if not user_id:
@@ -703,6 +971,188 @@ def test_view_tracking_integration(paper_id: str) -> bool:
         log_test("View Tracking Integration", False, f"Error: {e}")
         return False
 
+def test_unique_views(user_id: str) -> bool:
+    """Test HyperLogLog unique-view counting and its sync to MongoDB"""
+    try:
+        paper_data = {
+            "title": f"Unique Reader Estimation Study {TEST_ID}",
+            "authors": ["Unique Tester"],
+            "abstract": f"Counting distinct readers of a paper with probabilistic sketches {TEST_ID}.",
+            "publication_date": "2024-02-01",
+            "keywords": ["hyperloglog"],
+            "citations": []
+        }
+        upload = requests.post(
+            f"{BASE_URL}/papers/", json=paper_data, headers={"X-User-ID": user_id}, timeout=10
+        )
+        if upload.status_code != 201:
+            log_test("Unique Views", False, f"Upload status: {upload.status_code}")
+            return False
+        paper_id = upload.json().get("paper_id", "")
+
+        # Two readers by X-User-ID (one reading twice), one anonymous reader whose
+        # spoofed X-Forwarded-For values must not make it count as several readers
+        for reader in ["reader_a", "reader_a", "reader_b"]:
+            requests.get(f"{BASE_URL}/papers/{paper_id}",
+                         headers={"X-User-ID": f"{reader}_{TEST_ID}"}, timeout=10)
+        for spoofed in ["203.0.113.1", "203.0.113.2"]:
+            requests.get(f"{BASE_URL}/papers/{paper_id}",
+                         headers={"X-Forwarded-For": spoofed, "User-Agent": f"unique-{TEST_ID}"},
+                         timeout=10)
+
+        response = requests.get(f"{BASE_URL}/papers/{paper_id}",
+                                headers={"X-User-ID": f"reader_a_{TEST_ID}"}, timeout=10)
+        live_unique = response.json().get("unique_views", 0)
+
+        sync = requests.post(f"{BASE_URL}/admin/sync-now", timeout=30)
+        synced = sync.json().get("unique_views_synced", 0) if sync.status_code == 200 else 0
+        response = requests.get(f"{BASE_URL}/papers/{paper_id}",
+                                headers={"X-User-ID": f"reader_b_{TEST_ID}"}, timeout=10)
+        header_unique = int(response.headers.get("X-Unique-Views", 0))
+
+        success = live_unique == 3 and synced >= 1 and header_unique == 3
+        log_test("Unique Views", success,
+                f"Unique readers: {live_unique}, after sync: {header_unique}, papers synced: {synced}")
+        return success
+
+    except Exception as e:
+        log_test("Unique Views", False, f"Error: {e}")
+        return False
+
+def test_detail_cache_invalidation(user_id: str, paper_id: str) -> bool:
+    """Test that a cached paper detail picks up a new citation"""
+    try:
+        response = requests.get(f"{BASE_URL}/papers/{paper_id}", timeout=10)
+        initial_count = response.json().get("citation_count", 0)
+
+        paper_data = {
+            "title": f"Detail Cache Citation Test {TEST_ID}",
+            "authors": ["Cache Tester"],
+            "abstract": f"Paper citing another paper to check cached citation counts {TEST_ID}.",
+            "publication_date": "2024-03-01",
+            "keywords": ["cache"],
+            "citations": [paper_id]
+        }
+        upload = requests.post(
+            f"{BASE_URL}/papers/", json=paper_data, headers={"X-User-ID": user_id}, timeout=10
+        )
+        if upload.status_code != 201:
+            log_test("Detail Cache Invalidation", False, f"Upload status: {upload.status_code}")
+            return False
+
+        response = requests.get(f"{BASE_URL}/papers/{paper_id}", timeout=10)
+        final_count = response.json().get("citation_count", 0)
+        success = final_count == initial_count + 1
+        log_test("Detail Cache Invalidation", success, f"Citations {initial_count} -> {final_count}")
+        return success
+
+    except Exception as e:
+        log_test("Detail Cache Invalidation", False, f"Error: {e}")
+        return False
+
+def test_conditional_get(paper_id: str) -> bool:
+    """Test ETag / If-None-Match revalidation of search and paper details"""
+    try:
+        response = requests.get(f"{BASE_URL}/papers/", params={"search": "machine"}, timeout=10)
+        etag = response.headers.get("ETag", "")
+        revalidated = requests.get(
+            f"{BASE_URL}/papers/", params={"search": "machine"},
+            headers={"If-None-Match": etag}, timeout=10
+        )
+        search_ok = bool(etag) and revalidated.status_code == 304
+
+        response = requests.get(f"{BASE_URL}/papers/{paper_id}", timeout=10)
+        etag = response.headers.get("ETag", "")
+        views = int(response.headers.get("X-Views", "0"))
+        revalidated = requests.get(
+            f"{BASE_URL}/papers/{paper_id}", headers={"If-None-Match": etag}, timeout=10
+        )
+        detail_ok = (
+            bool(etag)
+            and revalidated.status_code == 304
+            and int(revalidated.headers.get("X-Views", "0")) == views + 1
+        )
+
+        success = search_ok and detail_ok
+        log_test("Conditional GET", success, f"Search 304: {search_ok}, detail 304: {detail_ok}")
+        return success
+
+    except Exception as e:
+        log_test("Conditional GET", False, f"Error: {e}")
+        return False
+
+def test_trending_papers(paper_id: str) -> bool:
+    """Test trending papers endpoint after views were recorded"""
+    try:
+        response = requests.get(f"{BASE_URL}/papers/trending?window=7d&limit=50", timeout=10)
+        success = response.status_code == 200
+
+        if not success:
+            log_test("Trending Papers", False, f"Status: {response.status_code}")
+            return False
+
+        papers = response.json().get("papers", [])
+        ids = [p["id"] for p in papers]
+        log_test("Trending Papers", True,
+                f"Got {len(papers)} trending papers, test paper listed: {paper_id in ids}")
+
+        response = requests.get(f"{BASE_URL}/papers/trending?window=2d", timeout=10)
+        success = response.status_code == 400
+        log_test("Trending Papers (Validation)", success, f"Status: {response.status_code}")
+        return success
+
+    except Exception as e:
+        log_test("Trending Papers", False, f"Error: {e}")
+        return False
+
+def test_paper_batch(paper_id: str) -> bool:
+    """Test multi-get of paper details, with and without counting views"""
+    try:
+        missing_id = "0" * 24
+        response = requests.get(
+            f"{BASE_URL}/papers/batch",
+            params={"ids": f"{paper_id},{missing_id}", "prefetch": "true"},
+            timeout=10,
+        )
+        data = response.json()
+        success = (
+            response.status_code == 200
+            and [p["id"] for p in data.get("papers", [])] == [paper_id]
+            and data.get("not_found") == [missing_id]
+        )
+        views_before = data["papers"][0]["views"] if success else 0
+
+        response = requests.post(f"{BASE_URL}/papers/batch", json={"ids": [paper_id]}, timeout=10)
+        papers = response.json().get("papers", []) if response.status_code == 200 else []
+        success = success and len(papers) == 1 and papers[0]["views"] == views_before + 1
+        log_test("Paper Batch Get", success, f"Status: {response.status_code}, views before: {views_before}")
+        return success
+
+    except Exception as e:
+        log_test("Paper Batch Get", False, f"Error: {e}")
+        return False
+
+def test_paper_view_series(paper_id: str) -> bool:
+    """Test per-paper view time series after a manual sync"""
+    try:
+        requests.post(f"{BASE_URL}/admin/sync-now", timeout=10)
+        response = requests.get(f"{BASE_URL}/papers/{paper_id}/views?granularity=hour", timeout=10)
+        success = response.status_code == 200
+
+        if success:
+            series = response.json().get("series", [])
+            total = sum(point["views"] for point in series)
+            success = total > 0
+            log_test("Paper View Series", success, f"{len(series)} hourly buckets, {total} views")
+        else:
+            log_test("Paper View Series", False, f"Status: {response.status_code}")
+
+        return success
+
+    except Exception as e:
+        log_test("Paper View Series", False, f"Error: {e}")
+        return False
+
 def test_citation_count_integration(citing_paper_id: str, cited_paper_id: str) -> bool:
     """Test citation count calculation"""
     if not citing_paper_id or not cited_paper_id:
@@ -730,6 +1180,107 @@ def test_citation_count_integration(citing_paper_id: str, cited_paper_id: str) -
         log_test("Citation Count Integration", False, f"Error: {e}")
         return False
 
+def test_citation_graph(citing_paper_id: str, cited_paper_id: str) -> bool:
+    """Test k-hop neighborhood and shortest path over the citation graph"""
+    try:
+        response = requests.get(
+            f"{BASE_URL}/papers/{citing_paper_id}/graph/neighborhood?k=2&direction=out", timeout=10
+        )
+        if response.status_code != 200:
+            log_test("Citation Graph (Neighborhood)", False, f"Status: {response.status_code}")
+            return False
+
+        ids = [p["id"] for p in response.json().get("papers", [])]
+        success = cited_paper_id in ids
+        log_test("Citation Graph (Neighborhood)", success, f"{len(ids)} papers within 2 hops")
+
+        response = requests.get(
+            f"{BASE_URL}/papers/{citing_paper_id}/graph/path?to={cited_paper_id}", timeout=10
+        )
+        path_ok = response.status_code == 200 and response.json().get("length") == 1
+        log_test("Citation Graph (Path)", path_ok, f"Status: {response.status_code}")
+        return success and path_ok
+
+    except Exception as e:
+        log_test("Citation Graph", False, f"Error: {e}")
+        return False
+
+def test_references_and_cited_by(citing_paper_id: str, cited_paper_id: str) -> bool:
+    """Test paginated references and cited-by endpoints"""
+    try:
+        response = requests.get(f"{BASE_URL}/papers/{citing_paper_id}/references", timeout=10)
+        refs = [p["id"] for p in response.json().get("papers", [])] if response.ok else []
+        refs_ok = cited_paper_id in refs
+        log_test("References", refs_ok, f"Status: {response.status_code}, {len(refs)} references")
+
+        response = requests.get(f"{BASE_URL}/papers/{cited_paper_id}/cited-by?limit=100", timeout=10)
+        citing = [p["id"] for p in response.json().get("papers", [])] if response.ok else []
+        cited_by_ok = citing_paper_id in citing
+        log_test("Cited By", cited_by_ok, f"Status: {response.status_code}, {len(citing)} citing papers")
+        return refs_ok and cited_by_ok
+
+    except Exception as e:
+        log_test("References and Cited By", False, f"Error: {e}")
+        return False
+
+def test_related_papers(paper_id: str) -> bool:
+    """Test precomputed related papers after triggering the job"""
+    try:
+        response = requests.post(f"{BASE_URL}/admin/related-now", timeout=60)
+        if response.status_code != 200:
+            log_test("Related Papers", False, f"Job status: {response.status_code}")
+            return False
+
+        response = requests.get(f"{BASE_URL}/papers/{paper_id}/related", timeout=10)
+        success = response.status_code == 200
+        papers = response.json().get("papers", []) if success else []
+        log_test("Related Papers", success, f"Status: {response.status_code}, {len(papers)} related")
+        return success
+
+    except Exception as e:
+        log_test("Related Papers", False, f"Error: {e}")
+        return False
+
+def test_similar_papers(paper_id: str) -> bool:
+    """Test content-similar papers after refitting the TF-IDF model"""
+    try:
+        response = requests.post(f"{BASE_URL}/admin/similar-now", timeout=120)
+        if response.status_code != 200:
+            log_test("Similar Papers", False, f"Job status: {response.status_code}")
+            return False
+
+        response = requests.get(f"{BASE_URL}/papers/{paper_id}/similar", timeout=10)
+        success = response.status_code == 200
+        papers = response.json().get("papers", []) if success else []
+        if success:
+            scores = [p["score"] for p in papers]
+            success = scores == sorted(scores, reverse=True) and paper_id not in [p["id"] for p in papers]
+        log_test("Similar Papers", success, f"Status: {response.status_code}, {len(papers)} similar")
+        return success
+
+    except Exception as e:
+        log_test("Similar Papers", False, f"Error: {e}")
+        return False
+
+def test_rate_limiting() -> bool:
+    """Test that hammering the auth endpoints is answered with 429 (run last: drains the budget)"""
+    try:
+        invalid_login = {"username": TEST_USER["username"], "password": "wrong_password"}
+        for attempt in range(100):
+            response = requests.post(f"{BASE_URL}/login", json=invalid_login, timeout=10)
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After")
+                success = bool(retry_after)
+                log_test("Rate Limiting", success, f"429 after {attempt + 1} requests, Retry-After: {retry_after}")
+                return success
+
+        log_test("Rate Limiting", False, "No 429 after 100 requests")
+        return False
+
+    except Exception as e:
+        log_test("Rate Limiting", False, f"Error: {e}")
+        return False
+
 # ===================== MAIN TEST RUNNER =====================
 
 def main():
@@ -767,12 +1318,19 @@ def main():
     if active_user_id:
         upload_success, paper_id = test_paper_upload(active_user_id)
         test_results.append(upload_success)
+        if upload_success:
+            test_results.append(test_duplicate_paper_upload(active_user_id))
+        test_results.append(test_upload_ticket_not_found(active_user_id))
+        test_results.append(test_async_upload_flow(active_user_id))
     else:
         log_test("Paper Upload", False, "No valid user ID available")
         test_results.append(False)
         paper_id = ""
     
     test_results.append(test_paper_search())
+    test_results.append(test_paper_search_facets())
+    test_results.append(test_paper_search_filters())
+    test_results.append(test_paper_suggest())
     test_results.append(test_paper_validation(active_user_id))
     test_results.append(test_nonexistent_paper())
     
@@ -796,10 +1354,14 @@ def main():
     print_section("ADMIN ENDPOINTS TESTS")
     test_results.append(test_admin_sync_status())
     test_results.append(test_admin_manual_sync())
+    test_results.append(test_admin_slow_queries())
+    test_results.append(test_admin_index_advice())
     
     # Phase 5: Cache and Integration
     print_section("CACHE & INTEGRATION TESTS")
     test_results.append(test_search_cache())
+    test_results.append(test_canonical_search())
+    test_results.append(test_search_warm())
     
     if active_user_id:
         test_results.append(test_cache_invalidation(active_user_id))
@@ -809,15 +1371,30 @@ def main():
     
     if paper_id:
         test_results.append(test_view_tracking_integration(paper_id))
+        test_results.append(test_trending_papers(paper_id))
+        test_results.append(test_paper_view_series(paper_id))
+        test_results.append(test_paper_batch(paper_id))
+        test_results.append(test_conditional_get(paper_id))
+        if active_user_id:
+            test_results.append(test_detail_cache_invalidation(active_user_id, paper_id))
+            test_results.append(test_unique_views(active_user_id))
     else:
         log_test("View Tracking Integration", False, "No paper ID available")
         test_results.append(False)
     
     if citing_paper_id and paper_id:
         test_results.append(test_citation_count_integration(citing_paper_id, paper_id))
+        test_results.append(test_citation_graph(citing_paper_id, paper_id))
+        test_results.append(test_references_and_cited_by(citing_paper_id, paper_id))
+        test_results.append(test_related_papers(paper_id))
+        test_results.append(test_similar_papers(paper_id))
     else:
         log_test("Citation Count Integration", False, "Missing paper IDs")
         test_results.append(False)
+
+    # Phase 6: Rate limiting (drains the auth budget, so it runs last)
+    print_section("RATE LIMITING TESTS")
+    test_results.append(test_rate_limiting())
     
     # Final Summary
     print_section("TEST RESULTS SUMMARY")
@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+"""
+In-process tests of background internals that the HTTP suite cannot reach
+(view-event aggregation, upload queue batches, view buckets, worker view buffer,
+search term canonicalization, read routing, fork handling).
+
+Runs the app in this process against the MongoDB and Redis published by docker compose.
+It uses its own database (dropped at the end) and Redis database 15 (flushed), so the
+data of the running API is left alone.
+"""
+
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import time
+from typing import Any
+
+TEST_ID = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", f"research_db_internals_{TEST_ID}")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/15")
+os.environ["ENABLE_SCHEDULER"] = "false"
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import redis
+from bson import ObjectId
+
+from app import create_app
+from test_complete import log_test, print_section
+
+app = create_app()
+
+
+def insert_paper(title: str = "Internals test paper") -> str:
+    """Insert a bare paper document and return its ID."""
+    paper_id = ObjectId()
+    app.mongo_db.papers.insert_one({"_id": paper_id, "title": title, "views": 0})
+    return str(paper_id)
+
+
+class FailingPipelines:
+    """Redis client whose pipelines of one kind (MULTI or not) fail on execute."""
+
+    def __init__(self, client: redis.Redis, transaction: bool):
+        self._client = client
+        self._transaction = transaction
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def pipeline(self, transaction: bool = True) -> Any:
+        pipe = self._client.pipeline(transaction=transaction)
+        if transaction == self._transaction:
+
+            def fail(*args: Any, **kwargs: Any) -> None:
+                raise redis.ConnectionError("simulated Redis failure")
+
+            pipe.execute = fail
+        return pipe
+
+
+# ===================== VIEW EVENT TESTS =====================
+
+
+def test_view_events_redelivery() -> bool:
+    """Events applied but not acked are not counted again when re-delivered in other batches"""
+    from datetime import datetime
+
+    from app.services.view_events import ViewEventService
+    from app.utils.cache import VIEW_EVENTS_STREAM_KEY, CacheService
+
+    try:
+        app.config.update(VIEW_PIPELINE="stream", VIEW_EVENTS_BATCH=3)
+        paper_id = insert_paper()
+        with app.app_context():
+            pipe = app.redis.pipeline(transaction=False)
+            for _ in range(5):
+                CacheService._queue_paper_view(pipe, paper_id, datetime.utcnow())
+            pipe.execute()
+            stream_length = app.redis.xlen(VIEW_EVENTS_STREAM_KEY)
+
+            # Apply the first 3 events, then fail before acking them
+            real_client = app.redis
+            app.redis = FailingPipelines(real_client, transaction=True)
+            try:
+                crashed = ViewEventService.process_view_events()
+            finally:
+                app.redis = real_client
+            views_after_crash = app.mongo_db.papers.find_one({"_id": ObjectId(paper_id)})["views"]
+
+            # Re-deliver them in batches of 2, so the logged batch of 3 is split; a run
+            # ends at a short batch, so the last 2 new events need a second run
+            app.config["VIEW_EVENTS_BATCH"] = 2
+            result = ViewEventService.process_view_events()
+            if result["status"] == "success":
+                result = ViewEventService.process_view_events()
+
+        views = app.mongo_db.papers.find_one({"_id": ObjectId(paper_id)})["views"]
+        pending = int(app.redis.get(f"paper_views:{paper_id}") or 0)
+        success = (
+            stream_length == 5
+            and crashed["status"] == "error"
+            and views_after_crash == 3
+            and result["status"] == "success"
+            and views == 5
+            and pending == 0
+        )
+        message = (
+            f"Views after crash: {views_after_crash}, after re-delivery: {views} (expected 5), "
+            f"pending counter: {pending}"
+        )
+        log_test("View Events Re-delivery", success, message)
+        return success
+    except Exception as e:
+        log_test("View Events Re-delivery", False, f"Exception: {str(e)}")
+        return False
+    finally:
+        app.config.update(VIEW_PIPELINE="counters", VIEW_EVENTS_BATCH=1000)
+
+
+# ===================== VIEW BUCKET TESTS =====================
+
+
+class FailingDeletes:
+    """Redis client whose DEL fails, like a crash after writing a flushed bucket."""
+
+    def __init__(self, client: redis.Redis):
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def delete(self, *names: str) -> int:
+        raise redis.ConnectionError("simulated Redis failure")
+
+
+def test_view_bucket_reflush() -> bool:
+    """A bucket written to the time series but not deleted is not written again on retry"""
+    from app.services.view_sync import ViewSyncService
+
+    try:
+        # Buckets of views recorded by earlier tests
+        with app.app_context():
+            ViewSyncService.flush_view_buckets()
+        paper_ids = [insert_paper(f"Bucket test {i} {TEST_ID}") for i in range(3)]
+        bucket_key = "view_buckets:2024011513"
+        app.redis.hset(bucket_key, mapping={paper_ids[0]: 2, paper_ids[1]: 5})
+
+        real_client = app.redis
+        app.redis = FailingDeletes(real_client)
+        try:
+            with app.app_context():
+                crashed = ViewSyncService.flush_view_buckets()
+        finally:
+            app.redis = real_client
+
+        # Views of the same hour arriving after the failed flush
+        app.redis.hset(bucket_key, paper_ids[2], 1)
+        with app.app_context():
+            result = ViewSyncService.flush_view_buckets()
+
+        totals = [
+            sum(
+                point["views"]
+                for point in app.mongo_db.paper_view_series.find({"paper_id": ObjectId(p)})
+            )
+            for p in paper_ids
+        ]
+        leftover = app.redis.keys("view_buckets:*")
+        success = (
+            crashed["points"] == 2
+            and len(crashed["errors"]) == 1
+            and result["points"] == 1
+            and not result["errors"]
+            and totals == [2, 5, 1]
+            and not leftover
+        )
+        log_test(
+            "View Bucket Re-flush",
+            success,
+            f"Points: {crashed['points']} then {result['points']}, views per paper: {totals} "
+            f"(expected [2, 5, 1]), keys left: {leftover}",
+        )
+        return success
+    except Exception as e:
+        log_test("View Bucket Re-flush", False, f"Exception: {str(e)}")
+        return False
+
+
+# ===================== UPLOAD QUEUE TESTS =====================
+
+
+def signup_user() -> str:
+    """Create a user through the API and return its ID."""
+    suffix = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    response = app.test_client().post(
+        "/signup",
+        json={
+            "username": f"queue_{suffix}",
+            "password": "test_password_123",
+            "name": "Queue Tester",
+            "email": f"queue_{suffix}@example.com",
+            "department": "Computer Science",
+        },
+    )
+    return response.get_json()["user_id"]
+
+
+def queue_paper(user_id: str, title: str, abstract: str, citations: Any = ()) -> Any:
+    """Upload a paper in UPLOAD_MODE=async and return the 202 response body."""
+    response = app.test_client().post(
+        "/papers/",
+        json={
+            "title": title,
+            "authors": ["Queue Tester"],
+            "abstract": abstract,
+            "publication_date": "2024-02-01",
+            "keywords": ["queue"],
+            "citations": list(citations),
+        },
+        headers={"X-User-ID": user_id},
+    )
+    assert response.status_code == 202, response.get_json()
+    return response.get_json()
+
+
+def ticket_status(ticket_id: str) -> str:
+    return app.redis.hget(f"upload_ticket:{ticket_id}", "status") or ""
+
+
+def test_upload_batch_checks() -> bool:
+    """Queued papers are deduplicated within their batch and citing a rejected one cascades"""
+    from app.services.upload_queue import UploadQueueService
+
+    try:
+        app.config.update(UPLOAD_MODE="async", DEDUP_MODE="reject")
+        user_id = signup_user()
+        abstract = f"Batch {TEST_ID} graph neural networks for molecule property prediction"
+        original = queue_paper(user_id, f"Original {TEST_ID}", abstract)
+        duplicate = queue_paper(user_id, f"Original {TEST_ID}", abstract)
+        citing = queue_paper(
+            user_id,
+            f"Citing {TEST_ID}",
+            "Storage engines and write amplification in log structured merge trees",
+            [duplicate["paper_id"]],
+        )
+        transitive = queue_paper(
+            user_id,
+            f"Transitive {TEST_ID}",
+            "Register allocation by graph coloring in optimizing compilers revisited",
+            [citing["paper_id"], original["paper_id"]],
+        )
+        with app.app_context():
+            result = UploadQueueService.process_upload_queue()
+
+        statuses = [
+            ticket_status(queued["ticket_id"])
+            for queued in (original, duplicate, citing, transitive)
+        ]
+        stored = app.mongo_db.papers.count_documents(
+            {"_id": {"$in": [ObjectId(q["paper_id"]) for q in (duplicate, citing, transitive)]}}
+        )
+        success = (
+            result["status"] == "success"
+            and statuses == ["created", "rejected", "failed", "failed"]
+            and stored == 0
+        )
+        log_test(
+            "Upload Batch Checks",
+            success,
+            f"Ticket statuses: {statuses} (expected created, rejected, failed, failed)",
+        )
+        return success
+    except Exception as e:
+        log_test("Upload Batch Checks", False, f"Exception: {str(e)}")
+        return False
+    finally:
+        app.config.update(UPLOAD_MODE="sync", DEDUP_MODE="flag")
+
+
+def test_upload_redelivery() -> bool:
+    """A batch re-delivered after inserting but before acking creates its papers once"""
+    from app.services.upload_queue import UploadQueueService
+
+    try:
+        app.config.update(UPLOAD_MODE="async", UPLOAD_QUEUE_CLAIM_IDLE_MS=0)
+        user_id = signup_user()
+        cited = insert_paper(f"Cited by queued {TEST_ID}")
+        queued = queue_paper(
+            user_id,
+            f"Re-delivered {TEST_ID}",
+            "Consumer crashes between insert_many and XACK of the upload stream",
+            [cited],
+        )
+
+        # Insert the batch, then fail updating the tickets and acking the entries
+        real_client = app.redis
+        app.redis = FailingPipelines(real_client, transaction=False)
+        try:
+            with app.app_context():
+                crashed = UploadQueueService.process_upload_queue()
+        finally:
+            app.redis = real_client
+        with app.app_context():
+            result = UploadQueueService.process_upload_queue()
+
+        papers = app.mongo_db.papers.count_documents({"_id": ObjectId(queued["paper_id"])})
+        citations = app.mongo_db.citations.count_documents(
+            {"paper_id": ObjectId(queued["paper_id"])}
+        )
+        status = ticket_status(queued["ticket_id"])
+        success = (
+            crashed["status"] == "error"
+            and result["status"] == "success"
+            and status == "created"
+            and papers == 1
+            and citations == 1
+        )
+        log_test(
+            "Upload Re-delivery",
+            success,
+            f"Ticket: {status}, papers stored: {papers}, citations stored: {citations}",
+        )
+        return success
+    except Exception as e:
+        log_test("Upload Re-delivery", False, f"Exception: {str(e)}")
+        return False
+    finally:
+        app.config.update(UPLOAD_MODE="sync", UPLOAD_QUEUE_CLAIM_IDLE_MS=60000)
+
+
+# ===================== VIEW BUFFER TESTS =====================
+
+
+def test_view_buffer_flush_thread() -> bool:
+    """The flush thread writes buffered views to Redis every VIEW_BUFFER_FLUSH_MS"""
+    from app.utils.cache import CacheService, view_counter_buffer
+
+    try:
+        app.config.update(VIEW_BUFFER_ENABLED=True, VIEW_BUFFER_FLUSH_MS=50)
+        paper_id = insert_paper()
+        with app.app_context():
+            counts = [CacheService.increment_paper_views(paper_id) for _ in range(3)]
+
+        deadline = time.monotonic() + 5
+        stored, pending = 0, 3
+        while time.monotonic() < deadline and (stored < 3 or pending):
+            time.sleep(0.05)
+            pending = view_counter_buffer.pending([paper_id])[paper_id]
+            stored = int(app.redis.get(f"paper_views:{paper_id}") or 0)
+
+        success = counts == [1, 2, 3] and stored == 3 and pending == 0
+        log_test(
+            "View Buffer Flush Thread",
+            success,
+            f"Returned counts: {counts}, in Redis: {stored}, still buffered: {pending}",
+        )
+        return success
+    except Exception as e:
+        log_test("View Buffer Flush Thread", False, f"Exception: {str(e)}")
+        return False
+    finally:
+        app.config["VIEW_BUFFER_ENABLED"] = False
+
+
+def test_view_buffer_failed_flush() -> bool:
+    """A failed flush keeps views buffered once, and they are written by the next flush"""
+    from app.utils.cache import CacheService, view_counter_buffer
+
+    try:
+        app.config["VIEW_BUFFER_ENABLED"] = True
+        paper_id = insert_paper()
+        real_client = app.redis
+        app.redis = FailingPipelines(real_client, transaction=False)
+        try:
+            with app.app_context():
+                for _ in range(3):
+                    CacheService.increment_paper_views(paper_id)
+                failed_written = view_counter_buffer.flush()
+                pending_after_failure = view_counter_buffer.pending([paper_id])[paper_id]
+                read_after_failure = CacheService.get_paper_views_many([paper_id])[paper_id]
+        finally:
+            app.redis = real_client
+
+        view_counter_buffer.flush()  # the flush thread may have written them already
+        stored = int(app.redis.get(f"paper_views:{paper_id}") or 0)
+        pending = view_counter_buffer.pending([paper_id])[paper_id]
+
+        success = (
+            failed_written == 0
+            and pending_after_failure == 3
+            and read_after_failure == 3
+            and stored == 3
+            and pending == 0
+        )
+        message = (
+            f"After failed flush: buffered {pending_after_failure}, read {read_after_failure}; "
+            f"after retry: in Redis {stored}, buffered {pending}"
+        )
+        log_test("View Buffer Failed Flush", success, message)
+        return success
+    except Exception as e:
+        log_test("View Buffer Failed Flush", False, f"Exception: {str(e)}")
+        return False
+    finally:
+        app.config["VIEW_BUFFER_ENABLED"] = False
+
+
+def test_view_buffer_atexit() -> bool:
+    """Views still buffered when a worker exits are flushed by the atexit handler"""
+    try:
+        paper_id = insert_paper()
+        code = "\n".join(
+            [
+                "import sys",
+                f"sys.path.insert(0, {ROOT_DIR!r})",
+                "from app import create_app",
+                "from app.utils.cache import CacheService",
+                "app = create_app()",
+                "app.config.update(VIEW_BUFFER_ENABLED=True, VIEW_BUFFER_FLUSH_MS=600000)",
+                "with app.app_context():",
+                f"    for _ in range(4): CacheService.increment_paper_views({paper_id!r})",
+            ]
+        )
+        process = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, timeout=60
+        )
+        stored = int(app.redis.get(f"paper_views:{paper_id}") or 0)
+
+        success = process.returncode == 0 and stored == 4
+        message = f"Exit code: {process.returncode}, views in Redis after exit: {stored}"
+        log_test(
+            "View Buffer Flush At Exit", success, message, "" if success else process.stderr[-500:]
+        )
+        return success
+    except Exception as e:
+        log_test("View Buffer Flush At Exit", False, f"Exception: {str(e)}")
+        return False
+
+
+# ===================== SEARCH TERM TESTS =====================
+
+
+def test_canonical_negations_and_phrases() -> bool:
+    """Negated terms and quoted phrases are not sorted, deduped or stripped of stop words"""
+    from app.utils.cache import CacheService
+
+    try:
+        with app.app_context():
+            canonical = CacheService.canonicalize_search_term
+            cases = [
+                (canonical("Learning  the Machine"), "learning machine"),
+                (canonical("Machine -Learning"), "machine -learning"),
+                (canonical("learning -machine"), "learning -machine"),
+                (canonical("-the  deep"), "-the deep"),
+                (canonical('"deep learning" the'), '"deep learning" the'),
+                (canonical("state-of-the-art survey"), "state-of-the-art survey"),
+            ]
+        wrong = [(got, expected) for got, expected in cases if got != expected]
+        success = not wrong
+        log_test(
+            "Canonical Negations And Phrases",
+            success,
+            f"Mismatches (got, expected): {wrong}" if wrong else "Only plain terms reordered",
+        )
+        return success
+    except Exception as e:
+        log_test("Canonical Negations And Phrases", False, f"Exception: {str(e)}")
+        return False
+
+
+# ===================== READ ROUTING TESTS =====================
+
+
+def lagging_read_db() -> Any:
+    """A read handle that is not the primary and has none of its documents yet."""
+    return app.mongo_client[f"{os.environ['MONGODB_DB']}_lagging"]
+
+
+def test_read_primary_fallback() -> bool:
+    """Papers missing on the read handle (not replicated yet) are read from the primary"""
+    from app.models.paper import Paper
+
+    primary_read_db = app.mongo_read_db
+    try:
+        replicated_id = insert_paper("Replicated paper")
+        new_id = insert_paper("Just uploaded paper")
+        app.mongo_read_db = lagging_read_db()
+        app.mongo_read_db.papers.insert_one(
+            {"_id": ObjectId(replicated_id), "title": "Replicated paper", "views": 0}
+        )
+
+        with app.app_context():
+            single = Paper.find_by_id(new_id)
+            many = Paper.find_by_ids([replicated_id, new_id])
+
+        success = (
+            single is not None
+            and single["title"] == "Just uploaded paper"
+            and set(many) == {replicated_id, new_id}
+        )
+        message = f"find_by_id found: {single is not None}, find_by_ids found: {len(many)}/2"
+        log_test("Read Primary Fallback", success, message)
+        return success
+    except Exception as e:
+        log_test("Read Primary Fallback", False, f"Exception: {str(e)}")
+        return False
+    finally:
+        app.mongo_read_db = primary_read_db
+        app.mongo_client.drop_database(f"{os.environ['MONGODB_DB']}_lagging")
+
+
+def test_causal_read_your_writes() -> bool:
+    """A user's write time is saved at teardown and restored into their next read session"""
+    from bson import Timestamp
+
+    from app.utils.read_routing import causal_session, write_session
+
+    primary_read_db = app.mongo_read_db
+    try:
+        app.config["MONGO_CAUSAL_READS"] = True
+        app.mongo_read_db = lagging_read_db()
+        user_id = str(ObjectId())
+        headers = {"X-User-ID": user_id}
+
+        with app.test_request_context(headers=headers):
+            session = write_session()
+            app.mongo_db.papers.insert_one({"title": "Causal write", "views": 0}, session=session)
+            if session.operation_time is None:
+                # A standalone server reports no cluster or operation time; stand in for
+                # the ones a replica set primary returns
+                now = Timestamp(int(time.time()), 1)
+                session.advance_cluster_time(
+                    {"clusterTime": now, "signature": {"hash": bytes(20), "keyId": 0}}
+                )
+                session.advance_operation_time(now)
+            written_at = session.operation_time
+        saved = app.redis.get(f"causal:{user_id}")
+
+        with app.test_request_context(headers=headers):
+            read_session = causal_session()
+            restored_at = read_session.operation_time
+        with app.test_request_context(headers={"X-User-ID": str(ObjectId())}):
+            other_user_at = causal_session().operation_time
+
+        success = saved is not None and restored_at == written_at and other_user_at is None
+        message = (
+            f"Saved: {saved is not None}, write time {written_at}, "
+            f"restored {restored_at}, other user {other_user_at}"
+        )
+        log_test("Causal Read-Your-Writes", success, message)
+        return success
+    except Exception as e:
+        log_test("Causal Read-Your-Writes", False, f"Exception: {str(e)}")
+        return False
+    finally:
+        app.config["MONGO_CAUSAL_READS"] = False
+        app.mongo_read_db = primary_read_db
+
+
+# ===================== FORK HANDLING TESTS =====================
+
+
+def test_fork_resets() -> bool:
+    """A forked worker gets its own database clients and fresh per-process caches and locks"""
+    from app.extensions import init_process_clients
+    from app.services.citation_graph import citation_graph
+    from app.services.index_advisor import query_shapes
+    from app.services.similarity import similarity_index
+    from app.utils.cache import CacheService, view_counter_buffer
+
+    paper_id = insert_paper()
+    with app.app_context():
+        lru = CacheService._detail_lru()
+    parent_mongo, parent_redis = app.mongo_client, app.redis
+
+    # Fork while other threads hold the locks and the caches have state
+    lru.set(paper_id, {"title": "Cached detail"})
+    citation_graph._loaded_at = time.monotonic()
+    similarity_index._checked_at = time.monotonic()
+    held = [view_counter_buffer._flush_lock, citation_graph._lock, lru._lock]
+    for lock in held:
+        lock.acquire()
+    view_counter_buffer._counts[paper_id] = 1
+
+    read_fd, write_fd = os.pipe()
+    try:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                init_process_clients(app)
+                checks = {
+                    "new MongoDB client": app.mongo_client is not parent_mongo,
+                    "new Redis client": app.redis is not parent_redis,
+                    "MongoDB reachable": app.mongo_db.command("ping")["ok"] == 1,
+                    "Redis reachable": app.redis.ping(),
+                    "detail LRU emptied": lru.get(paper_id) is None,
+                    "view buffer emptied": view_counter_buffer.pending([paper_id])[paper_id] == 0,
+                    "view buffer lock free": view_counter_buffer._flush_lock.acquire(False),
+                    "citation graph lock free": citation_graph._lock.acquire(False),
+                    "citation graph reloads": citation_graph._loaded_at is None,
+                    "similarity index re-checked": similarity_index._checked_at is None,
+                    "query shapes emptied": not query_shapes._pending,
+                }
+                failures = [name for name, ok in checks.items() if not ok]
+            except Exception as e:
+                failures = [f"exception: {str(e)}"]
+            os.write(write_fd, json.dumps(failures).encode())
+            os._exit(0)
+
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        failures = json.loads(os.read(read_fd, 65536) or b'["no report from child"]')
+        os.close(read_fd)
+    except Exception as e:
+        failures = [f"exception: {str(e)}"]
+    finally:
+        view_counter_buffer._counts.pop(paper_id, None)
+        for lock in held:
+            lock.release()
+        citation_graph._loaded_at = None
+        similarity_index._checked_at = None
+
+    success = not failures
+    message = "Clients re-created, caches and locks reset" if success else "Failed checks"
+    log_test("Fork Handling", success, message, ", ".join(failures))
+    return success
+
+
+def main():
+    """Run all internals tests"""
+    print("🚀 Starting Research Papers Manager Internals Test Suite")
+    print(f"🎯 Test ID: {TEST_ID}")
+    app.redis.flushdb()
+
+    test_results = []
+
+    print_section("VIEW EVENT TESTS")
+    test_results.append(test_view_events_redelivery())
+
+    print_section("VIEW BUCKET TESTS")
+    test_results.append(test_view_bucket_reflush())
+
+    print_section("UPLOAD QUEUE TESTS")
+    test_results.append(test_upload_batch_checks())
+    test_results.append(test_upload_redelivery())
+
+    print_section("VIEW BUFFER TESTS")
+    test_results.append(test_view_buffer_flush_thread())
+    test_results.append(test_view_buffer_failed_flush())
+    test_results.append(test_view_buffer_atexit())
+
+    print_section("SEARCH TERM TESTS")
+    test_results.append(test_canonical_negations_and_phrases())
+
+    print_section("READ ROUTING TESTS")
+    test_results.append(test_read_primary_fallback())
+    test_results.append(test_causal_read_your_writes())
+
+    print_section("FORK HANDLING TESTS")
+    test_results.append(test_fork_resets())
+
+    print_section("TEST RESULTS SUMMARY")
+    app.mongo_client.drop_database(os.environ["MONGODB_DB"])
+    app.redis.flushdb()
+
+    passed = sum(test_results)
+    total = len(test_results)
+    print(f"📊 Overall Results: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,9 @@ import os
 # Load .env if present
 load_dotenv()
 
+# With gunicorn --preload this runs once in the master (indexes); workers re-create their
+# database clients in the post_fork hook of gunicorn.conf.py, and the scheduler runs in
+# its own process (scheduler_main.py). Run directly, the app also runs the scheduler.
 app = create_app()
 
 # Basic startup info (evaluated at import)